@@ -1,14 +1,15 @@
 # app/api/v1/endpoints/calendar.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
-import json
+from datetime import datetime, date, timedelta
+import asyncio
 
-from app.db.database import get_db
-from app.db import crud
+from app.db.database import get_db, SessionLocal
+from app.db import crud, models
+from app.services.notification_service import change_notifier, to_naive_utc, CALENDAR
 
 router = APIRouter()
 
@@ -24,91 +25,211 @@ class CalendarEventRequest(BaseModel):
     date: str  # "YYYY-MM-DD"
     events: List[CalendarEvent]
 
-# --- Helper function for JSON serialization ---
-def json_default_serializer(obj):
-    """datetime 객체를 ISO 형식 문자열로 변환하는 JSON 직렬화 헬퍼"""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f'Object of type {obj.__class__.__name__} is not JSON serializable')
+class CalendarEventUpsertRequest(BaseModel):
+    family_user_id: str
+    date: date
+    text: str
+    created_at: Optional[datetime] = None
+
+# --- Helper functions ---
+def _parse_date(date_str: str) -> date:
+    try:
+        return date.fromisoformat(date_str)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"잘못된 날짜 형식: {date_str}")
+
+def _resolve_range(month: str | None, start: date | None, end: date | None) -> tuple[date | None, date | None]:
+    """month("YYYY-MM") 또는 start/end로 조회 기간을 정합니다. 아무것도 없으면 전체 기간입니다."""
+    if month:
+        try:
+            start = datetime.strptime(month, "%Y-%m").date()
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"잘못된 월 형식: {month}")
+        end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="시작 날짜가 종료 날짜보다 늦습니다.")
+    return start, end
+
+def _format_event(event: models.CalendarEvent) -> dict:
+    return {"id": event.event_uid, "text": event.text, "created_at": event.created_at.isoformat()}
+
+def _group_events_by_date(events: list[models.CalendarEvent]) -> dict:
+    """일정 목록을 앱 캘린더가 쓰는 {날짜: {events, marked, dotColor}} 형태로 묶습니다."""
+    calendar_data = {}
+    for event in events:
+        day = calendar_data.setdefault(event.event_date.isoformat(), {
+            "events": [], "marked": True, "dotColor": "#50cebb"
+        })
+        day["events"].append(_format_event(event))
+    return calendar_data
+
+def _get_senior_user(db: Session, senior_user_id: str, detail: str = "사용자를 찾을 수 없습니다") -> models.User:
+    user = crud.get_user_by_user_id_str(db, senior_user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail=detail)
+    return user
+
+def _publish_calendar_update(background_tasks: BackgroundTasks, db: Session, user: models.User, event_date: date):
+    """커밋 직후 어르신 앱의 WebSocket으로 변경된 날짜의 일정만 푸시합니다."""
+    events = crud.get_calendar_events_in_range(db, user, event_date, event_date)
+    background_tasks.add_task(change_notifier.publish, user.user_id_str, CALENDAR, {
+        "date": event_date.isoformat(),
+        "events": [_format_event(event) for event in events],
+        "last_updated_by": user.calendar_updated_by,
+        "update_time": user.calendar_updated_at.isoformat(),
+    })
 
 # --- API Endpoints ---
 @router.post("/events/update")
-def update_calendar_events(request: CalendarEventRequest, db: Session = Depends(get_db)):
-    """가족이 어르신의 캘린더 일정을 수정합니다."""
-    senior_user = crud.get_user_by_user_id_str(db, request.senior_user_id)
-    if not senior_user:
-        raise HTTPException(status_code=404, detail="어르신 사용자를 찾을 수 없습니다")
-    
-    # 기존 캘린더 데이터를 불러옵니다.
-    try:
-        calendar_data = json.loads(senior_user.calendar_data) if senior_user.calendar_data else {}
-    except (json.JSONDecodeError, TypeError):
-        calendar_data = {}
-    
-    # 요청받은 날짜의 데이터를 업데이트합니다.
-    events_data = [event.model_dump() for event in request.events]
-
-    if events_data:
-        calendar_data[request.date] = {
-            "events": events_data,
-            "marked": True,
-            "dotColor": "#50cebb"
-        }
-    elif request.date in calendar_data:
-        del calendar_data[request.date]
-        
-    # 🔽 datetime 객체를 처리할 수 있도록 default 핸들러 추가 (FIX) 🔽
-    calendar_json = json.dumps(calendar_data, ensure_ascii=False, default=json_default_serializer) # ◀️ FIX
-    
-    crud.update_calendar_data(db, 
-        senior_user_id_str=request.senior_user_id,
-        family_user_id_str=request.family_user_id,
-        calendar_json=calendar_json
+def update_calendar_events(request: CalendarEventRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """가족이 어르신의 캘린더에서 한 날짜의 일정을 통째로 교체하고, 어르신 앱에 변경 이벤트를 푸시합니다."""
+    senior_user = _get_senior_user(db, request.senior_user_id, "어르신 사용자를 찾을 수 없습니다")
+    event_date = _parse_date(request.date)
+
+    # 요청받은 날짜의 일정만 교체합니다. (빈 목록이면 그 날짜의 일정이 삭제됩니다)
+    events_data = [
+        {"id": event.id, "text": event.text, "created_at": to_naive_utc(event.created_at)}
+        for event in request.events
+    ]
+    affected_dates = crud.replace_calendar_events_for_date(
+        db, senior_user, event_date, events_data, updated_by=request.family_user_id
     )
-    
+    for affected_date in sorted(affected_dates):
+        _publish_calendar_update(background_tasks, db, senior_user, affected_date)
+
     return {"status": "success", "message": "캘린더 일정이 업데이트되었습니다."}
 
+@router.put("/events/{senior_user_id}/{event_id}")
+def upsert_calendar_event(
+    senior_user_id: str,
+    event_id: str,
+    request: CalendarEventUpsertRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """일정 하나를 추가하거나 수정합니다."""
+    senior_user = _get_senior_user(db, senior_user_id, "어르신 사용자를 찾을 수 없습니다")
+    existing = crud.get_calendar_event(db, senior_user, event_id)
+    previous_date = existing.event_date if existing else None
+
+    event = crud.upsert_calendar_event(
+        db, senior_user, event_uid=event_id, event_date=request.date, text=request.text,
+        created_at=to_naive_utc(request.created_at), updated_by=request.family_user_id
+    )
+    if previous_date and previous_date != request.date:
+        _publish_calendar_update(background_tasks, db, senior_user, previous_date)
+    _publish_calendar_update(background_tasks, db, senior_user, request.date)
+
+    return {"status": "success", "event": {**_format_event(event), "date": event.event_date.isoformat()}}
+
+@router.delete("/events/{senior_user_id}/{event_id}")
+def delete_calendar_event(
+    senior_user_id: str,
+    event_id: str,
+    family_user_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """일정 하나를 삭제합니다."""
+    senior_user = _get_senior_user(db, senior_user_id, "어르신 사용자를 찾을 수 없습니다")
+    event_date = crud.delete_calendar_event(db, senior_user, event_id, updated_by=family_user_id)
+    if event_date is None:
+        raise HTTPException(status_code=404, detail="일정을 찾을 수 없습니다")
+
+    _publish_calendar_update(background_tasks, db, senior_user, event_date)
+    return {"status": "success", "message": "일정이 삭제되었습니다."}
 
 @router.get("/events/{senior_user_id}")
-def get_calendar_events(senior_user_id: str, db: Session = Depends(get_db)):
-    """어르신의 모든 캘린더 일정을 조회합니다."""
-    user = crud.get_user_by_user_id_str(db, senior_user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
-    
-    try:
-        calendar_data = json.loads(user.calendar_data) if user.calendar_data else {}
-    except (json.JSONDecodeError, TypeError):
-        calendar_data = {}
+def get_calendar_events(
+    senior_user_id: str,
+    month: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    어르신의 캘린더 일정을 조회합니다.
+    `month=YYYY-MM` 또는 `start`/`end`로 기간을 지정하면 그 기간의 일정만 반환합니다. (생략 시 전체)
+    """
+    user = _get_senior_user(db, senior_user_id)
+    start, end = _resolve_range(month, start, end)
+    events = crud.get_calendar_events_in_range(db, user, start, end)
 
     return {
         "senior_user_id": senior_user_id,
-        "calendar_data": calendar_data,
+        "calendar_data": _group_events_by_date(events),
+        "range": {"start": start, "end": end},
         "last_updated": user.calendar_updated_at,
         "last_updated_by": user.calendar_updated_by
     }
 
 @router.get("/check-updates/{senior_user_id}")
-def check_calendar_updates(senior_user_id: str, db: Session = Depends(get_db)):
-    """어르신 앱에서 캘린더 업데이트를 확인합니다."""
-    user = crud.get_user_by_user_id_str(db, senior_user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
+def check_calendar_updates(
+    senior_user_id: str,
+    month: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """어르신 앱에서 캘린더 업데이트를 확인합니다. (구버전 앱 호환용, 신규 앱은 WebSocket 푸시 또는 /wait-updates 사용)"""
+    user = _get_senior_user(db, senior_user_id)
+    start, end = _resolve_range(month, start, end)
 
     response_data = {"has_update": False}
-    
-    if user.calendar_updated_at and (not user.last_calendar_check or user.calendar_updated_at > user.last_calendar_check):
-        try:
-            calendar_data = json.loads(user.calendar_data) if user.calendar_data else {}
-        except (json.JSONDecodeError, TypeError):
-            calendar_data = {}
 
+    if user.calendar_updated_at and (not user.last_calendar_check or user.calendar_updated_at > user.last_calendar_check):
+        events = crud.get_calendar_events_in_range(db, user, start, end)
         response_data.update({
             "has_update": True,
-            "calendar_data": calendar_data,
+            "calendar_data": _group_events_by_date(events),
             "last_updated_by": user.calendar_updated_by,
             "update_time": user.calendar_updated_at.isoformat() # ◀️ FIX
         })
         crud.update_user_last_calendar_check(db, senior_user_id)
 
-    return response_data
\ No newline at end of file
+    return response_data
+
+@router.get("/wait-updates/{senior_user_id}")
+async def wait_calendar_updates(
+    senior_user_id: str,
+    since: Optional[datetime] = None,
+    timeout: float = Query(25, ge=1, le=60),
+    month: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    """
+    WebSocket을 쓸 수 없을 때의 롱폴링 대체 경로입니다.
+    `since`(마지막으로 받은 update_time) 이후 변경이 생기거나 timeout이 지날 때까지 응답을 보류합니다.
+    확인 시각을 DB에 기록하지 않으므로 폴링이 users 테이블 쓰기를 만들지 않습니다.
+    """
+    since = to_naive_utc(since)
+    start, end = _resolve_range(month, start, end)
+    # DB 확인 전에 이벤트를 먼저 잡아야 그 사이의 변경을 놓치지 않습니다.
+    change_event = change_notifier.current_event(senior_user_id, CALENDAR)
+
+    response_data = await asyncio.to_thread(_read_calendar_update, senior_user_id, since, start, end)
+    if response_data["has_update"]:
+        return response_data
+
+    if await change_notifier.wait_for_change(change_event, timeout):
+        return await asyncio.to_thread(_read_calendar_update, senior_user_id, since, start, end)
+    return response_data
+
+def _read_calendar_update(senior_user_id: str, since: datetime | None, start: date | None, end: date | None) -> dict:
+    """since 이후 캘린더가 변경되었으면 기간 내 일정을 담아 반환합니다."""
+    db = SessionLocal()
+    try:
+        user = _get_senior_user(db, senior_user_id)
+        if not user.calendar_updated_at or (since and user.calendar_updated_at <= since):
+            return {"has_update": False}
+
+        events = crud.get_calendar_events_in_range(db, user, start, end)
+        return {
+            "has_update": True,
+            "calendar_data": _group_events_by_date(events),
+            "last_updated_by": user.calendar_updated_by,
+            "update_time": user.calendar_updated_at.isoformat()
+        }
+    finally:
+        db.close()
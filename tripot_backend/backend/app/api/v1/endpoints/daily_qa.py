@@ -1,12 +1,16 @@
 # app/api/v1/endpoints/daily_qa.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from datetime import date
+from typing import List, Literal, Optional
+from datetime import date, datetime
 
 from app.db.database import get_db
 from app.db import crud
+from app.core.time_utils import today_kst
+from app.services.daily_question_cache import daily_question_cache
+from app.services.report_cache import report_cache
 
 router = APIRouter()
 
@@ -18,25 +22,67 @@ class DailyQuestionResponse(BaseModel):
 
 class FamilyAnswerRequest(BaseModel):
     answer_text: str
+    user_id_str: Optional[str] = None
+
+class DailyAnswer(BaseModel):
+    id: int
+    author_role: str
+    answer_text: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class DailyAnswerPage(BaseModel):
+    daily_date: date
+    items: List[DailyAnswer]
+    next_cursor: Optional[int] = None
 
 # --- 엔드포인트 ---
 
 @router.get("/", response_model=DailyQuestionResponse)
 def get_today_daily_question(db: Session = Depends(get_db)):
-    """오늘 날짜의 '오늘의 질문'을 가져옵니다."""
-    today = date.today()
-    question = crud.get_daily_question(db, target_date=today)
+    """오늘(한국 시간) 날짜의 '오늘의 질문'을 가져옵니다."""
+    question = daily_question_cache.get(db, today_kst())
     if not question:
         raise HTTPException(status_code=404, detail="오늘의 질문을 찾을 수 없습니다.")
-    return question
+    return question.to_dict()
 
 @router.post("/family-answer")
 def post_family_answer(request: FamilyAnswerRequest, db: Session = Depends(get_db)):
     """오늘 질문에 대한 가족의 답변을 추가합니다."""
-    today = date.today()
-    question = crud.get_daily_question(db, target_date=today)
+    question = daily_question_cache.get(db, today_kst())
     if not question:
         raise HTTPException(status_code=404, detail="오늘의 질문이 없어 답변을 등록할 수 없습니다.")
-    
-    crud.add_family_answer_to_daily_question(db, target_date=today, answer_text=request.answer_text)
-    return {"status": "success", "message": "가족 답변이 성공적으로 등록되었습니다."}
+
+    answer = crud.add_daily_qa_answer(
+        db, question.id, crud.FAMILY_ROLE, request.answer_text, user_id_str=request.user_id_str
+    )
+    report_cache.invalidate_report_date(question.daily_date)  # 이 날짜 리포트의 '오늘의 질문' 답변이 바뀝니다.
+    return {"status": "success", "message": "가족 답변이 성공적으로 등록되었습니다.", "answer_id": answer.id}
+
+@router.get("/{daily_date}/answers", response_model=DailyAnswerPage)
+def get_daily_answers(
+    daily_date: date,
+    role: Optional[Literal["family", "elderly"]] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    특정 날짜 질문의 답변을 작성 순서대로 페이지 단위로 조회합니다.
+    응답의 `next_cursor`를 다음 요청의 `cursor`로 넘기면 이어서 조회합니다.
+    """
+    question = daily_question_cache.get(db, daily_date)
+    if not question:
+        raise HTTPException(status_code=404, detail="해당 날짜의 질문을 찾을 수 없습니다.")
+
+    answers = crud.get_daily_qa_answers(db, question.id, author_role=role, after_id=cursor, limit=limit)
+    next_cursor = answers[-1].id if len(answers) == limit else None
+    return {"daily_date": daily_date, "items": answers, "next_cursor": next_cursor}
+
+@router.post("/cache/refresh")
+def refresh_daily_question_cache():
+    """'오늘의 질문' 캐시를 비웁니다. (scripts/insert_data.py가 새 질문을 적재한 뒤 호출)"""
+    daily_question_cache.invalidate()
+    return {"status": "success", "message": "오늘의 질문 캐시를 갱신했습니다."}
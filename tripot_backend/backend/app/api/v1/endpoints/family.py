@@ -1,15 +1,19 @@
 # app/api/v1/endpoints/family.py
 
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Response
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Response, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict
-import traceback # 상세 오류 출력을 위해 추가
+from typing import List, Dict, Literal, Optional
+from datetime import date
+import logging
 
 from app.db.database import get_db
 from app.db import crud
-from app.services import report_service, photo_service
+from app.services import report_service, photo_service, conversation_history
 from app import schemas
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # --- Reports (변경 없음) ---
@@ -27,6 +31,57 @@ def get_full_detail_report(senior_user_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="해당 사용자의 상세 리포트를 찾을 수 없습니다.")
     return report_data
 
+@router.post("/reports/{senior_user_id}/refresh")
+def refresh_reports(senior_user_id: str, db: Session = Depends(get_db)):
+    """캐시된 홈/상세 리포트 응답을 비우고 다시 만듭니다. (리포트를 다시 생성한 뒤 바로 반영할 때)"""
+    return report_service.refresh_reports(db, senior_user_id)
+
+# --- Conversation History ---
+def _get_senior_or_404(db: Session, senior_user_id: str, start_date: date | None, end_date: date | None):
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="시작 날짜가 종료 날짜보다 늦습니다.")
+    user = crud.get_user_by_user_id_str(db, senior_user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+    return user
+
+@router.get("/conversations/{senior_user_id}", response_model=schemas.ConversationHistoryPage)
+def get_conversation_history(
+    senior_user_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    order: Literal["desc", "asc"] = "desc",
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """
+    어르신의 대화 기록을 기간(양 끝 포함)으로 걸러 페이지 단위로 조회합니다. (기본: 최신순)
+    응답의 `next_cursor`를 다음 요청의 `cursor`로 넘기면 이어서 조회합니다.
+    """
+    user = _get_senior_or_404(db, senior_user_id, start_date, end_date)
+    try:
+        return conversation_history.get_page(db, user.id, start_date, end_date, cursor, limit, descending=order == "desc")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/conversations/{senior_user_id}/export")
+def export_conversation_history(
+    senior_user_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    db: Session = Depends(get_db)
+):
+    """어르신의 대화 기록을 시간순으로 NDJSON 또는 CSV 파일로 내려받습니다. (읽는 대로 바로 전송)"""
+    user = _get_senior_or_404(db, senior_user_id, start_date, end_date)
+    period = f"{start_date or 'begin'}_{end_date or 'now'}"
+    return StreamingResponse(
+        conversation_history.export_rows(user.id, start_date, end_date, export_format),
+        media_type=conversation_history.EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="conversations_{senior_user_id}_{period}.{export_format}"'},
+    )
+
 # --- Family Yard (Photos & Comments) ---
 
 # 🔽🔽🔽 사진 업로드 함수를 아래 내용으로 전체 교체해주세요 🔽🔽🔽
@@ -37,53 +92,37 @@ async def upload_photo(
     uploaded_by: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    print("--- 📸 사진 업로드 API 시작 ---")
     try:
         # 1. 사용자 확인
-        print(f"1. 사용자 조회 시도: {user_id_str}")
         user = crud.get_user_by_user_id_str(db, user_id_str)
         if not user:
-            print(f"❌ 사용자 없음: {user_id_str}")
+            logger.warning(f"사진 업로드 대상 사용자 없음: {user_id_str}")
             raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
-        print(f"✅ 사용자 확인 완료: ID={user.id}")
 
         # 2. 파일 경로 생성
-        print("2. 파일 저장 경로 생성 시도...")
         file_path, unique_filename = photo_service.generate_file_path(file.filename)
-        print(f"✅ 파일 경로 생성 완료: {file_path}")
 
         # 3. 파일 내용 읽기
-        print("3. 파일 내용 읽기 시도...")
         contents = await file.read()
         file_size = len(contents)
-        print(f"✅ 파일 내용 읽기 완료: {file_size} bytes")
         
         # 4. 파일 시스템에 저장
-        print("4. 파일 시스템에 저장 시도...")
         with open(file_path, "wb") as buffer:
             buffer.write(contents)
-        print("✅ 파일 시스템에 저장 완료")
+        logger.debug(f"사진 파일 저장 완료: {file_path} ({file_size} bytes)")
 
         # 5. 데이터베이스에 메타데이터 저장
-        print("5. DB에 메타데이터 저장 시도...")
         photo = crud.create_photo(
             db=db, user_id=user.id, filename=unique_filename,
             original_name=file.filename, file_path=file_path,
             file_size=file_size, # file.size 대신 실제 읽은 크기 사용 (버그 수정)
             uploaded_by=uploaded_by
         )
-        print(f"✅ DB 저장 완료: Photo ID={photo.id}")
-        
-        print("--- ✅ 사진 업로드 API 성공 ---")
+        logger.info("사진 업로드 완료", extra={"photo_id": photo.id, "file_size": file_size})
         return {"status": "success", "photo_id": photo.id}
 
     except Exception as e:
-        print(f"--- ❌ 사진 업로드 API 오류 발생 ---")
-        print(f"오류 타입: {type(e).__name__}")
-        print(f"오류 메시지: {e}")
-        print("--- 상세 Traceback ---")
-        traceback.print_exc()
-        print("--------------------")
+        logger.exception(f"사진 업로드 API 오류 발생 ({type(e).__name__}): {e}")
         raise HTTPException(status_code=500, detail=f"서버 내부 오류: {e}")
 
 
@@ -1,14 +1,16 @@
 # app/api/v1/endpoints/schedule.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, time
+import asyncio
 
-from app.db.database import get_db
-from app.db import crud
+from app.db.database import get_db, SessionLocal
+from app.db import crud, models
 from app.services.schedule_service import scheduler_service
+from app.services.notification_service import change_notifier, to_naive_utc, SCHEDULE
 
 router = APIRouter()
 
@@ -44,16 +46,25 @@ def _format_schedules_for_response(schedules: list) -> List[dict]:
         for s in schedules
     ]
 
+def _publish_schedule_update(background_tasks: BackgroundTasks, user: models.User, schedules: list):
+    """커밋 직후 어르신 앱의 WebSocket으로 변경된 스케줄을 푸시합니다."""
+    background_tasks.add_task(change_notifier.publish, user.user_id_str, SCHEDULE, {
+        "schedules": _format_schedules_for_response(schedules),
+        "last_updated_by": user.schedule_updated_by,
+        "update_time": user.schedule_updated_at.isoformat(),
+    })
+
 # --- API Endpoints ---
 
 @router.post("/set")
-def set_user_schedule(request: ScheduleRequest, db: Session = Depends(get_db)):
+def set_user_schedule(request: ScheduleRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """어르신 본인이 스케줄을 설정합니다."""
     parsed_times = _validate_and_parse_times(request.call_times)
-    crud.set_schedules(db, user_id_str=request.user_id_str, call_times=parsed_times)
+    senior_user = crud.set_schedules(db, user_id_str=request.user_id_str, call_times=parsed_times)
     scheduler_service.setup_daily_schedules()
     
     updated_schedules = crud.get_schedules_by_user_id_str(db, request.user_id_str)
+    _publish_schedule_update(background_tasks, senior_user, updated_schedules)
     return {
         "status": "success",
         "message": "정시 대화 시간이 설정되었습니다.",
@@ -61,10 +72,10 @@ def set_user_schedule(request: ScheduleRequest, db: Session = Depends(get_db)):
     }
 
 @router.post("/family/set")
-def set_family_schedule(request: FamilyScheduleRequest, db: Session = Depends(get_db)):
-    """가족이 어르신의 스케줄을 설정합니다."""
+def set_family_schedule(request: FamilyScheduleRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """가족이 어르신의 스케줄을 설정하고, 어르신 앱에 변경 이벤트를 푸시합니다."""
     parsed_times = _validate_and_parse_times(request.call_times)
-    crud.set_schedules(
+    senior_user = crud.set_schedules(
         db,
         user_id_str=request.senior_user_id,
         call_times=parsed_times,
@@ -73,6 +84,7 @@ def set_family_schedule(request: FamilyScheduleRequest, db: Session = Depends(ge
     scheduler_service.setup_daily_schedules()
 
     updated_schedules = crud.get_schedules_by_user_id_str(db, request.senior_user_id)
+    _publish_schedule_update(background_tasks, senior_user, updated_schedules)
     return {
         "status": "success",
         "message": "가족이 어르신의 스케줄을 설정했습니다.",
@@ -80,10 +92,14 @@ def set_family_schedule(request: FamilyScheduleRequest, db: Session = Depends(ge
     }
 
 @router.delete("/remove-all/{user_id_str}")
-def remove_all_user_schedules(user_id_str: str, db: Session = Depends(get_db)):
+def remove_all_user_schedules(user_id_str: str, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """사용자의 모든 스케줄을 제거합니다."""
     deleted_count = crud.delete_schedules_by_user_id_str(db, user_id_str)
     scheduler_service.setup_daily_schedules()
+
+    user = crud.get_user_by_user_id_str(db, user_id_str)
+    if user:
+        _publish_schedule_update(background_tasks, user, [])
     return {"status": "success", "message": f"{deleted_count}개의 스케줄이 제거되었습니다."}
 
 
@@ -97,6 +113,7 @@ def get_user_schedule(user_id_str: str, db: Session = Depends(get_db)):
 
 @router.get("/family/check/{senior_user_id}")
 def check_schedule_update(senior_user_id: str, db: Session = Depends(get_db)):
+    """어르신 앱에서 스케줄 업데이트를 확인합니다. (구버전 앱 호환용, 신규 앱은 WebSocket 푸시 또는 /family/wait 사용)"""
     user = crud.get_user_by_user_id_str(db, senior_user_id)
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
@@ -118,4 +135,46 @@ def check_schedule_update(senior_user_id: str, db: Session = Depends(get_db)):
         crud.update_user_last_schedule_check(db, senior_user_id)
 
     response_data["has_update"] = has_update
-    return response_data
\ No newline at end of file
+    return response_data
+
+@router.get("/family/wait/{senior_user_id}")
+async def wait_schedule_update(
+    senior_user_id: str,
+    since: Optional[datetime] = None,
+    timeout: float = Query(25, ge=1, le=60),
+):
+    """
+    WebSocket을 쓸 수 없을 때의 롱폴링 대체 경로입니다.
+    `since`(마지막으로 받은 update_time) 이후 변경이 생기거나 timeout이 지날 때까지 응답을 보류합니다.
+    """
+    since = to_naive_utc(since)
+    change_event = change_notifier.current_event(senior_user_id, SCHEDULE)
+
+    response_data = await asyncio.to_thread(_read_schedule_update, senior_user_id, since)
+    if response_data["has_update"]:
+        return response_data
+
+    if await change_notifier.wait_for_change(change_event, timeout):
+        return await asyncio.to_thread(_read_schedule_update, senior_user_id, since)
+    return response_data
+
+def _read_schedule_update(senior_user_id: str, since: datetime | None) -> dict:
+    """since 이후 스케줄이 변경되었으면 변경 내용을 담아 반환합니다."""
+    db = SessionLocal()
+    try:
+        user = crud.get_user_by_user_id_str(db, senior_user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+
+        if not user.schedule_updated_at or (since and user.schedule_updated_at <= since):
+            return {"has_update": False}
+
+        schedules = crud.get_schedules_by_user_id_str(db, senior_user_id)
+        return {
+            "has_update": True,
+            "schedules": _format_schedules_for_response(schedules),
+            "last_updated_by": user.schedule_updated_by,
+            "update_time": user.schedule_updated_at.isoformat(),
+        }
+    finally:
+        db.close()
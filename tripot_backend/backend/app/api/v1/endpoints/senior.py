@@ -1,135 +1,208 @@
 # app/api/v1/endpoints/senior.py
 
+import logging
 import json
 import os
 import asyncio
 import base64
 import tempfile
+import time
+import uuid
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
 from sqlalchemy.orm import Session
 
 # --- 통합된 모듈 임포트 ---
-from app.services import ai_service, vector_db_service
-from app.services.quiz_manager import QuizManager
+from app.services import ai_service, audio_vad, senior_session, vector_db_service
+from app.services.quiz_bank import quiz_bank
+from app.services.response_cache import response_cache
+from app.services.report_cache import report_cache
 from app.services.connection_manager import manager # 분리된 매니저 사용
 from app.db import crud
+from app.core import logging_config, metrics
 from app.core.config import settings
 from app.db.database import SessionLocal
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-# --- 각 사용자 세션을 관리하는 딕셔너리 ---
-# (퀴즈 관리자 인스턴스와 대화 로그를 포함)
-user_sessions = {}
+# 세션 상태(퀴즈 진행 상태, 대화 로그)는 세션 저장소에 보관되며, 재접속하면 senior_session이 이어받습니다.
+
+@router.post("/quiz-bank/refresh")
+async def refresh_quiz_bank():
+    """DB의 퀴즈를 다시 읽어 공유 퀴즈 은행을 교체합니다. (서버 재시작 불필요)"""
+    count = await asyncio.to_thread(quiz_bank.load)
+    return {"status": "success", "quiz_count": count, "topics": quiz_bank.topics()}
 
-# --- 서버 시작 시 퀴즈 데이터와 프롬프트 경로 미리 준비 ---
-ALL_QUIZZES_DF = crud.fetch_quizzes_as_df()
-PROMPTS_FILE_PATH = os.path.join(settings.PROMPTS_DIR, 'quiz_prompts.json')
+@router.get("/response-cache/stats")
+async def get_response_cache_stats():
+    """짧은 발화 응답 캐시의 적중률과 절약된 시간(추정)을 반환합니다."""
+    return response_cache.stats()
 
 # --- 웹소켓 엔드포인트 ---
 
 @router.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: str):
-    await manager.connect(websocket, user_id)
-    
-    # --- 1. 사용자 세션 초기화 ---
-    user_sessions[user_id] = {
-        "quiz_manager": QuizManager(ALL_QUIZZES_DF, PROMPTS_FILE_PATH, ai_service),
-        "conversation_log": []
-    }
-    print(f"✅ 클라이언트 [{user_id}] 연결됨. 세션 초기화 완료.")
-
-    # --- 2. 시작 메시지 전송 ---
-    # TODO: 시작 메시지를 talk_prompts.json에서 동적으로 불러오도록 개선
-    start_question = "안녕하세요! 오늘은 어떤 재미있는 이야기를 나눠볼까요?"
-    await manager.send_json({"type": "ai_message", "content": start_question}, user_id)
-    
-    # 세션 로그에 시작 메시지 기록
-    user_sessions[user_id]["conversation_log"].append(f"AI: {start_question}")
+    connection = await manager.connect(websocket, user_id)
+    if connection is None:
+        return  # 연결 제한으로 거절됨
+    # 이 연결에서 남기는 모든 로그에 user_id와 연결 ID가 붙습니다.
+    logging_config.user_id_var.set(user_id)
+    logging_config.request_id_var.set(f"ws-{uuid.uuid4().hex[:12]}")
     
+    # --- 1. 사용자 세션 초기화 (유예 시간 안에 재접속했으면 이전 세션을 이어 감) ---
+    session = None
+    try:
+        session, resumed = await senior_session.open_session(user_id)
+    except Exception as e:
+        logger.exception(f"[{user_id}] 세션 상태를 불러오지 못해 새 세션으로 시작합니다: {e}")
+        session, resumed = senior_session.SeniorSession(user_id), False
+    logger.info(f"클라이언트 [{user_id}] 연결됨. 세션 {'이어받기' if resumed else '초기화'} 완료.")
+
     # DB 세션 생성
     db: Session = SessionLocal()
     try:
+        # --- 2. 시작 메시지 전송 ---
+        if resumed:
+            # 진행 중이던 퀴즈가 있으면 현재 문제를 다시 들려줍니다.
+            current_question = session.quiz_manager.current_question() if session.quiz_manager.is_active() else None
+            resume_message = "다시 연결됐어요. 하던 이야기를 이어서 해요."
+            if current_question:
+                resume_message = f"다시 연결됐어요. 풀던 문제를 다시 들려드릴게요.\n{current_question}"
+            await manager.send_json({"type": "ai_message", "content": resume_message}, user_id)
+        else:
+            # TODO: 시작 메시지를 talk_prompts.json에서 동적으로 불러오도록 개선
+            start_question = "안녕하세요! 오늘은 어떤 재미있는 이야기를 나눠볼까요?"
+            await manager.send_json({"type": "ai_message", "content": start_question}, user_id)
+            # 세션 로그에 시작 메시지 기록
+            session.conversation_log.append(f"AI: {start_question}")
+
         # --- 3. 메시지 수신 및 처리 루프 ---
         while True:
-            audio_base64 = await websocket.receive_text()
+            # 하트비트 응답(pong)은 매니저가 처리하며, 서버가 연결을 닫으면 WebSocketDisconnect가 발생합니다.
+            audio_base64 = await manager.receive_text(connection)
+            # 수신 대기 시간은 어르신이 말하는 시간이므로 턴 지연에서 빼고, 프레임 크기만 기록합니다.
+            turn_started = time.perf_counter()
+            metrics.TURN_PAYLOAD_BYTES.observe(len(audio_base64))
             
             # 3-1. STT (Speech-to-Text)
             user_message = await _audio_to_text(audio_base64)
             if not user_message:
-                await manager.send_json({"type": "ai_message", "content": "음, 잘 못 들었어요. 다시 말씀해주시겠어요?"}, user_id)
+                with metrics.stage_timer("send"):
+                    await manager.send_json({"type": "ai_message", "content": "음, 잘 못 들었어요. 다시 말씀해주시겠어요?"}, user_id)
+                metrics.TURN_SECONDS.observe(time.perf_counter() - turn_started, kind="unrecognized")
                 continue
             
             # 사용자 메시지 화면에 표시
-            await manager.send_json({"type": "user_message", "content": user_message}, user_id)
+            with metrics.stage_timer("send"):
+                await manager.send_json({"type": "user_message", "content": user_message}, user_id)
 
             # 3-2. 비즈니스 로직 처리 (퀴즈/일반대화)
-            quiz_manager = user_sessions[user_id]["quiz_manager"]
+            quiz_manager = session.quiz_manager
             response_text = ""
+            turn_kind = "chat"
 
             if quiz_manager.is_active():
                 # 퀴즈 진행 중일 때: 사용자 입력을 정답으로 간주
-                response_text, result_to_save = await quiz_manager.process_answer(user_message)
+                turn_kind = "quiz"
+                with metrics.stage_timer("quiz_grading"):
+                    response_text, result_to_save = await quiz_manager.process_answer(user_message)
                 if result_to_save:
-                    crud.save_quiz_result(db, result_to_save)
+                    with metrics.stage_timer("db_save"):
+                        crud.save_quiz_result(db, result_to_save)
+                    report_cache.invalidate(user_id)  # 상세 리포트의 인지 퀴즈 집계가 바뀝니다.
             else:
                 # 일반 대화 상태일 때: 명령어 확인 후 처리
                 command = await ai_service.check_quiz_command(user_message)
                 if command:
+                    turn_kind = "command"
                     if command["action"] == "start_quiz":
                         start_msg, first_question = quiz_manager.start_quiz(user_id)
                         response_text = f"{start_msg}\n{first_question}" if first_question else start_msg
                     elif command["action"] == "stop_quiz":
                         response_text = quiz_manager.stop_quiz()
                 else:
-                    # 일반 대화 처리
-                    _, response_text = await ai_service.process_user_audio(user_id, audio_base64)
+                    # 일반 대화 처리 (위에서 변환한 텍스트를 그대로 사용해 STT를 다시 호출하지 않습니다.)
+                    response_text = await _generate_chat_response(user_id, user_message)
             
             # 3-3. 최종 응답 전송 및 저장 (통합된 부분)
-            await manager.send_json({"type": "ai_message", "content": response_text}, user_id)
+            with metrics.stage_timer("send"):
+                await manager.send_json({"type": "ai_message", "content": response_text}, user_id)
             
             # 모든 대화를 conversations 테이블에 저장
-            crud.save_conversation(db, user_id, user_message, response_text)
+            with metrics.stage_timer("db_save"):
+                session.add_conversation_ids(*crud.save_conversation(db, user_id, user_message, response_text))
+            metrics.TURN_SECONDS.observe(time.perf_counter() - turn_started, kind=turn_kind)
             
-            # 모든 대화를 Pinecone 요약용 세션 로그에 추가
-            user_sessions[user_id]["conversation_log"].append(f"사용자: {user_message}")
-            user_sessions[user_id]["conversation_log"].append(f"AI: {response_text}")
+            # 모든 대화를 Pinecone 요약용 세션 로그에 추가하고, 재접속에 대비해 세션 상태를 저장
+            session.conversation_log.append(f"사용자: {user_message}")
+            session.conversation_log.append(f"AI: {response_text}")
+            with metrics.stage_timer("session_save"):
+                await senior_session.save(session)
 
-    except WebSocketDisconnect:
-        print(f"🔌 클라이언트 [{user_id}] 연결이 끊어졌습니다.")
+    except WebSocketDisconnect as e:
+        logger.info(f"클라이언트 [{user_id}] 연결이 끊어졌습니다. (코드 {e.code}, {connection.close_reason or '클라이언트 종료'})")
     except Exception as e:
-        print(f"❌ WebSocket 처리 중 오류 발생: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"WebSocket 처리 중 오류 발생: {e}")
     finally:
         # --- 4. 연결 종료 시 후처리 ---
-        if user_id in user_sessions:
-            session_log = user_sessions[user_id].get("conversation_log", [])
-            if session_log:
-                # 대화 기록을 Pinecone에 기억으로 저장
-                await vector_db_service.create_memory_for_pinecone(user_id, session_log)
-            del user_sessions[user_id]
-        
-        manager.disconnect(user_id)
-        db.close()
-        print(f"⏹️ [{user_id}] 클라이언트 세션 정리 완료.")
+        # 바로 요약하지 않고 끊김만 표시합니다. 유예 시간 안에 돌아오지 않으면 세션 정리 작업이 기억으로 요약합니다.
+        # 같은 사용자의 새 연결로 대체된 경우에도 끊김을 먼저 표시한 뒤 연결을 놓습니다. 새 연결은 이전 연결이 놓일 때까지
+        # 기다렸다가 세션을 열므로, 마지막 턴이 오래전이어도 (반쯤 열린 연결) 이 표시 덕분에 세션을 이어 갑니다.
+        # 새 연결이 이미 자리를 잡았으면(대기 시간 초과) 그 연결의 세션 상태를 덮어쓰지 않습니다.
+        replaced = connection.close_reason == "replaced"
+        try:
+            if session is not None and not manager.is_superseded(user_id, connection):
+                try:
+                    await senior_session.mark_disconnected(session)
+                except Exception as e:
+                    if replaced:
+                        logger.error(f"[{user_id}] 대체된 연결의 세션 상태 저장 실패: {e}")
+                    else:
+                        logger.error(f"[{user_id}] 세션 상태 저장 실패, 바로 기억으로 요약합니다: {e}")
+                        if session.conversation_log:
+                            await vector_db_service.create_memory_for_pinecone(user_id, session.conversation_log)
+                            senior_session.schedule_report_fragment(user_id, session.to_state())
+        finally:
+            manager.disconnect(user_id, connection)
+            db.close()
+        logger.info(f"[{user_id}] 클라이언트 세션 정리 완료.")
+
+async def _generate_chat_response(user_id: str, user_message: str) -> str:
+    """일반 대화 응답을 생성하는 헬퍼 함수 (오류가 나도 세션은 유지합니다.)"""
+    try:
+        return await ai_service.generate_chat_response(user_id, user_message)
+    except Exception as e:
+        logger.error(f"대화 응답 생성 오류: {e}")
+        return "죄송합니다. 응답을 만드는 중 문제가 발생했어요."
 
 async def _audio_to_text(audio_base64: str) -> str | None:
-    """오디오 데이터를 텍스트로 변환하는 헬퍼 함수"""
+    """오디오 데이터를 텍스트로 변환하는 헬퍼 함수 (무음을 자르고, 말소리가 없으면 STT 없이 None)"""
     temp_audio_path = None
     try:
-        audio_data = base64.b64decode(audio_base64)
+        with metrics.stage_timer("decode"):
+            audio_data = base64.b64decode(audio_base64)
+
+        if settings.VAD_ENABLED:
+            with metrics.stage_timer("vad"):
+                vad_result = await asyncio.to_thread(audio_vad.process, audio_data)
+            if vad_result.rejected:
+                logger.debug(f"말소리가 없는 음성({vad_result.outcome}, {vad_result.input_seconds:.1f}초)이라 STT를 건너뜁니다.")
+                return None
+            audio_data = vad_result.audio
+
         with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
             temp_audio.write(audio_data)
             temp_audio_path = temp_audio.name
         
-        user_message = await ai_service.get_transcript_from_audio(temp_audio_path)
+        with metrics.stage_timer("stt"):
+            user_message = await ai_service.get_transcript_from_audio(temp_audio_path)
         
         if not user_message.strip() or "시청해주셔서 감사합니다" in user_message:
             return None
         return user_message
     except Exception as e:
-        print(f"STT 처리 오류: {e}")
+        logger.error(f"STT 처리 오류: {e}")
         return None
     finally:
         if temp_audio_path and os.path.exists(temp_audio_path):
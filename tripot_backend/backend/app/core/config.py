@@ -15,9 +15,11 @@ class Settings(BaseSettings):
     )
 
     # --- API Keys & Vector DB ---
-    OPENAI_API_KEY: str
+    OPENAI_API_KEY: str | None = None    # AI_PROVIDER="openai"일 때만 필요합니다.
     PINECONE_API_KEY: str
     PINECONE_INDEX_NAME: str = "long-term-memory"
+    OPENAI_BASE_URL: str | None = None   # OpenAI 호환 서버 주소 (부하 테스트용 로컬 대역 서버 등)
+    VECTOR_DB_BACKEND: str = "pinecone"  # "pinecone" 또는 "memory" (프로세스 내 인덱스, 재시작하면 사라짐)
 
     # --- MySQL Database ---
     MYSQL_USER: str
@@ -27,11 +29,92 @@ class Settings(BaseSettings):
     MYSQL_PORT: int = 3306
     MYSQL_ROOT_PASSWORD: str
 
+    # --- AI 제공자 ---
+    AI_PROVIDER: str = "openai"              # "openai" 또는 "local" (결정적 로컬 응답, 오프라인 프로파일링/부하 테스트용)
+    LOCAL_AI_STT_LATENCY_MS: float = 0.0     # 로컬 제공자에 주입할 호출 종류별 평균 지연
+    LOCAL_AI_EMBEDDING_LATENCY_MS: float = 0.0
+    LOCAL_AI_CHAT_LATENCY_MS: float = 0.0
+    LOCAL_AI_LATENCY_JITTER: float = 0.0     # 지연 변동 폭 비율 (0.2면 ±20%)
+    LOCAL_AI_FAILURE_RATE: float = 0.0       # 실패시킬 호출 비율
+    # AI 호출 승인 제어 (우선순위: interactive > grading > memory > batch)
+    AI_MAX_CONCURRENT_CALLS: int = 16        # 프로세스 전체의 동시 AI 호출 수
+    AI_INTERACTIVE_RESERVED_CALLS: int = 4   # 그중 실시간 대화 턴만 쓸 수 있는 자리 수
+    AI_ADMISSION_LIMITS: str = "interactive=16/0,grading=8/0,memory=4/60000,batch=2/30000"  # 등급=동시 호출 수/분당 토큰 수(0은 무제한)
+
+    # --- 외부 호출 제한 시간과 재시도 (시도 한 번 기준, 재시도 포함 전체는 2배까지) ---
+    AI_STT_TIMEOUT_SECONDS: float = 15.0
+    AI_EMBEDDING_TIMEOUT_SECONDS: float = 5.0
+    AI_CHAT_TIMEOUT_SECONDS: float = 20.0
+    AI_REPORT_TIMEOUT_SECONDS: float = 120.0
+    VECTOR_QUERY_TIMEOUT_SECONDS: float = 3.0
+    VECTOR_UPSERT_TIMEOUT_SECONDS: float = 10.0
+    EXTERNAL_CALL_MAX_RETRIES: int = 2       # 멱등 호출의 최대 재시도 횟수
+    HEDGE_REQUESTS_ENABLED: bool = True      # 최근 p95를 넘긴 임베딩/STT/벡터 검색에 같은 요청을 하나 더 보냅니다.
+    VECTOR_BREAKER_FAILURE_THRESHOLD: int = 5  # 벡터 DB가 연속으로 이만큼 실패하면 기억 검색을 건너뜁니다.
+    VECTOR_BREAKER_RESET_SECONDS: float = 30.0 # 그 뒤 이 시간이 지나면 시험 호출로 회복을 확인합니다.
+
+    # --- STT 전 음성 구간 검출 (무음 자르기, 말소리 없는 녹음 거르기) ---
+    VAD_ENABLED: bool = True
+    VAD_THRESHOLD_DB: float = 12.0         # 배경 소음 수준보다 이만큼 큰 프레임을 말소리로 봅니다.
+    VAD_CONTINUATION_DB: float = 6.0       # 말소리에 이어지는 프레임은 이만큼만 커도 말소리로 봅니다. (작게 말한 부분 보존)
+    VAD_MIN_SPEECH_SECONDS: float = 0.3    # 말소리가 이보다 짧으면 STT를 호출하지 않습니다.
+    VAD_PADDING_SECONDS: float = 0.2       # 말소리 앞뒤로 남기는 여유
+    VAD_MAX_PAUSE_SECONDS: float = 0.8     # 문장 사이의 쉼은 이 길이까지만 남깁니다.
+
+    # --- 어르신 대화 세션 상태 (재접속 시 이어서 진행) ---
+    SESSION_STORE_BACKEND: str = "memory"          # "memory", "sqlite"(같은 호스트 워커 공유), "redis"(redis 패키지 필요)
+    SESSION_STORE_SQLITE_PATH: str = "/tmp/tripot_sessions.sqlite3"
+    SESSION_STORE_REDIS_URL: str = "redis://localhost:6379/0"
+    SESSION_RESUME_GRACE_SECONDS: int = 120        # 끊긴 뒤 이 시간 안에 다시 접속하면 세션을 이어 갑니다.
+    SESSION_TTL_SECONDS: int = 6 * 60 * 60         # 저장된 세션 상태의 최대 보관 시간 (이후에는 정리 대상)
+
+    # --- 웹소켓 전송 ---
+    WS_SEND_QUEUE_SIZE: int = 64          # 연결마다 전송을 기다릴 수 있는 최대 메시지 수 (넘으면 알림부터 버리고, 그래도 차면 연결 종료)
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0 # 메시지 한 개 전송이 이 시간을 넘기면 멈춘 클라이언트로 보고 연결을 끊습니다.
+    WS_MAX_CONNECTIONS: int = 2000        # 워커 하나가 받는 최대 연결 수
+    WS_MAX_CONNECTS_PER_USER_PER_MINUTE: int = 20  # 사용자별 1분간 최대 접속 횟수 (재접속 폭주 방지)
+    WS_DUPLICATE_CONNECTION_POLICY: str = "replace" # 같은 사용자 재접속 시 "replace"(이전 연결 닫기) 또는 "reject"(새 연결 거절)
+    WS_HEARTBEAT_INTERVAL_SECONDS: float = 20.0     # ping 전송 주기 (0이면 하트비트와 유휴 연결 정리를 끕니다.)
+    WS_HEARTBEAT_TIMEOUT_SECONDS: float = 60.0      # pong에 응답하던 클라이언트가 이 시간 동안 조용하면 반쯤 열린 연결로 보고 닫습니다.
+    WS_IDLE_TIMEOUT_SECONDS: float = 30 * 60        # 사용자 입력이 이 시간 동안 없으면 연결을 닫습니다.
+
+    # --- 서버 시작 ---
+    STARTUP_WAIT_SECONDS: float = 10.0   # startup에서 필수 의존성 준비를 기다리는 최대 시간 (이후에는 백그라운드 재시도)
+
+    # --- 로깅 ---
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""                 # 모듈별 레벨, 예: "app.db.crud=WARNING,app.services.ai_service=DEBUG"
+    LOG_FORMAT: str = "json"             # "json" 또는 "text"
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1   # DEBUG 로그를 남길 비율 (1.0이면 모두)
+
+    # --- LLM 입력 토큰 예산 (넘으면 우선순위가 낮은 섹션부터 줄입니다.) ---
+    CHAT_PROMPT_TOKEN_BUDGET: int = 2500
+    MEMORY_SUMMARY_TOKEN_BUDGET: int = 6000
+    REPORT_PROMPT_TOKEN_BUDGET: int = 30000
+    REPORT_CHUNK_TOKEN_BUDGET: int = 6000  # 대화가 이보다 길면 턴 단위로 나눠 동시에 분석한 뒤 합칩니다.
+    REPORT_MAX_CHUNKS: int = 6             # 나누는 최대 개수 (넘으면 조각을 키우고, 조각마다 입력 예산으로 줄입니다.)
+
+    # --- 짧은 발화 응답 캐시 (기본값: 꺼짐) ---
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_SIMILARITY: float = 0.93        # 이 이상 코사인 유사도면 같은 발화로 봅니다.
+    RESPONSE_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2000
+    RESPONSE_CACHE_MAX_UTTERANCE_CHARS: int = 15   # 공백/문장부호를 뺀 글자 수 기준
+    RESPONSE_CACHE_VARIANTS: int = 3               # 항목당 모아 두는 응답 변형 수
+
+    # --- 가족 앱 리포트 응답 캐시 ---
+    REPORT_CACHE_MAX_ENTRIES: int = 5000     # (사용자, 홈/상세) 항목 수
+    REPORT_CACHE_TTL_SECONDS: int = 10 * 60  # 리포트 스크립트(별도 프로세스)가 저장한 새 리포트가 늦어도 이 시간 안에 보입니다.
+
     # --- Paths (경로 수정) ---
     # config.py -> core -> app -> backend (세 단계 위로 이동)
     BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     PROMPTS_DIR: str = os.path.join(BASE_DIR, "prompts")
 
+    # --- 오래된 데이터 보관 (scripts/archive_old_data.py) ---
+    ARCHIVE_DIR: str = os.path.join(BASE_DIR, "archive")  # 월별 gzip JSONL 파일을 두는 곳 (API 서버도 읽을 수 있어야 합니다.)
+    ARCHIVE_RETENTION_MONTHS: int = 6    # 이번 달을 포함해 이만큼의 달은 운영 테이블에 남깁니다.
+
     @property
     def DATABASE_URL(self) -> str:
         """SQLAlchemy에서 사용할 데이터베이스 연결 URL을 생성합니다."""
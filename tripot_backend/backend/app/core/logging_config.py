@@ -0,0 +1,136 @@
+# app/core/logging_config.py
+# 이벤트 루프를 막지 않는 구조화(JSON) 로깅 설정
+#
+# - 로그 호출은 큐에 레코드를 넣기만 하고, 실제 출력은 백그라운드 스레드(QueueListener)가 담당합니다.
+# - 각 레코드에는 contextvars로 전달된 user_id / request_id가 자동으로 붙습니다.
+# - 모듈별 로그 레벨(LOG_LEVELS)과 DEBUG 로그 샘플링(LOG_DEBUG_SAMPLE_RATE)을 설정할 수 있습니다.
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import traceback
+from datetime import datetime, timezone
+
+from app.core import metrics
+from app.core.config import settings
+
+# 현재 처리 중인 사용자/요청 ID (REST 미들웨어와 웹소켓 핸들러에서 설정합니다.)
+user_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("user_id", default=None)
+request_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_id", default=None)
+
+# 큐가 가득 차면 (출력이 밀리면) 요청 처리를 막는 대신 로그를 버립니다.
+LOG_QUEUE_SIZE = 10_000
+
+LOG_RECORDS_DROPPED = metrics.registry.counter(
+    "tripot_log_records_dropped_total", "로그 큐가 가득 차서 버려진 로그 레코드 수")
+
+_STANDARD_ATTRS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+class ContextFilter(logging.Filter):
+    """레코드에 user_id / request_id를 붙입니다. (extra로 직접 넘긴 값이 우선)"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "user_id", None) is None:
+            record.user_id = user_id_var.get()
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return True
+
+class DebugSamplingFilter(logging.Filter):
+    """DEBUG 레코드는 rate 비율만큼만 남깁니다. (INFO 이상은 항상 남김)"""
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 하나의 JSON 객체로 레코드를 출력합니다."""
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and key not in payload and not key.startswith("_") and value is not None:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    메시지와 예외를 호출 스레드에서 문자열로 만든 뒤 큐에 넣습니다. 큐가 가득 차면 버립니다.
+    예외는 exc_text에 담으므로 JSON/텍스트 형식 모두 트레이스백을 출력합니다.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+_listener: logging.handlers.QueueListener | None = None
+
+def _parse_module_levels(raw: str) -> dict[str, str]:
+    """'app.db.crud=WARNING,app.services.ai_service=DEBUG' 형식을 딕셔너리로 바꿉니다."""
+    levels = {}
+    for item in raw.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def setup_logging():
+    """루트 로거를 큐 기반 구조화 로깅으로 설정합니다. 여러 번 호출해도 한 번만 적용됩니다."""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(user_id)s] %(message)s"))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = _NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in _parse_module_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 출력하고 백그라운드 스레드를 멈춥니다."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,301 @@
+# app/core/metrics.py
+# 프로세스 내 지표(카운터/게이지/히스토그램)를 모아 Prometheus 텍스트 형식으로 내보내는 모듈
+#
+# 외부 라이브러리 없이 동작하며, main.py의 /metrics 엔드포인트가 registry.render()를 반환합니다.
+# - 어르신 대화 턴의 단계별 지연 시간: stage_timer("stt") 등
+# - REST 라우트, crud 함수, OpenAI/Pinecone 호출 지연 시간과 오류 수
+# - 프로세스 메모리/CPU 사용량
+
+import functools
+import inspect
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+# 지연 시간 히스토그램의 기본 구간(초). 대화 턴은 수 초 단위까지 걸리므로 넉넉하게 잡습니다.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 레이블 {self.labelnames}이(가) 필요합니다. (받은 값: {tuple(labels)})")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    """누적 값만 늘어나는 지표. callback을 주면 다른 곳에서 세는 누적 값을 수집 시점에 읽어 옵니다."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 callback: Callable[[], float] | None = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self) -> list[str]:
+        if self._callback is not None:
+            try:
+                self._values[()] = self._callback()
+            except Exception:
+                pass
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+class Gauge(_Metric):
+    """현재 값을 나타내는 지표. callback을 주면 수집 시점에 값을 읽어 옵니다."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 callback: Callable[[], float] | None = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self) -> list[str]:
+        if self._callback is not None:
+            try:
+                self._values[()] = self._callback()
+            except Exception:
+                pass
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # labels -> [구간별 개수..., 합계, 전체 개수]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self, **labels) -> tuple[int, float]:
+        """(관측 횟수, 합계)를 반환합니다."""
+        state = self._values.get(self._key(labels))
+        return (int(state[-1]), state[-2]) if state else (0, 0.0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = self.header()
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {int(state[-1])}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing  # 모듈이 다시 임포트되어도 같은 지표를 공유합니다.
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = (), callback=None) -> Counter:
+        return self._register(Counter(name, documentation, labelnames, callback))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (), callback=None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """모든 지표를 Prometheus 텍스트 형식(0.0.4)으로 반환합니다."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+# 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
+registry = MetricsRegistry()
+
+# --- 어르신 대화 턴 ---
+TURN_STAGE_SECONDS = registry.histogram(
+    "tripot_turn_stage_seconds", "어르신 대화 턴의 단계별 처리 시간(초)", ["stage"])
+TURN_STAGE_ERRORS = registry.counter(
+    "tripot_turn_stage_errors_total", "어르신 대화 턴의 단계별 오류 수", ["stage"])
+TURN_SECONDS = registry.histogram(
+    "tripot_turn_seconds", "음성 수신부터 응답 전송까지 한 턴의 전체 처리 시간(초)", ["kind"])
+TURN_PAYLOAD_BYTES = registry.histogram(
+    "tripot_turn_payload_bytes", "수신한 음성 프레임 크기(바이트)", [],
+    buckets=(16_000, 64_000, 256_000, 1_000_000, 4_000_000, 16_000_000))
+
+# --- REST / DB / 외부 API ---
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "tripot_http_request_seconds", "REST 요청 처리 시간(초)", ["method", "route", "status"])
+DB_CALL_SECONDS = registry.histogram(
+    "tripot_db_call_seconds", "crud 함수 실행 시간(초)", ["operation"])
+DB_CALL_ERRORS = registry.counter(
+    "tripot_db_call_errors_total", "crud 함수 오류 수", ["operation"])
+EXTERNAL_CALL_SECONDS = registry.histogram(
+    "tripot_external_call_seconds", "외부 API 호출 시간(초)", ["service", "operation"])
+EXTERNAL_CALL_ERRORS = registry.counter(
+    "tripot_external_call_errors_total", "외부 API 호출 오류 수", ["service", "operation"])
+
+@contextmanager
+def stage_timer(stage: str):
+    """대화 턴의 한 단계를 측정합니다. 예외가 나면 오류 수를 올리고 그대로 다시 던집니다."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        TURN_STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        TURN_STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+
+@contextmanager
+def external_call(service: str, operation: str):
+    """OpenAI/Pinecone 등 외부 API 호출 한 번을 측정합니다."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        EXTERNAL_CALL_ERRORS.inc(service=service, operation=operation)
+        raise
+    finally:
+        EXTERNAL_CALL_SECONDS.observe(time.perf_counter() - started, service=service, operation=operation)
+
+def _timed_db_call(func):
+    operation = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            DB_CALL_ERRORS.inc(operation=operation)
+            raise
+        finally:
+            DB_CALL_SECONDS.observe(time.perf_counter() - started, operation=operation)
+    return wrapper
+
+def instrument_db_module(namespace: dict):
+    """
+    모듈(crud)에 정의된 공개 함수를 모두 실행 시간/오류 측정 함수로 감쌉니다.
+    제너레이터 함수(iter_conversations 등)는 호출 시점에 쿼리를 실행하지 않으므로 감싸지 않습니다.
+    (읽는 동안 호출한 쪽이 멈추는 시간까지 섞이므로 반복 시간도 재지 않습니다.)
+    """
+    module_name = namespace["__name__"]
+    for name, value in list(namespace.items()):
+        if (not name.startswith("_") and inspect.isfunction(value)
+                and value.__module__ == module_name and not inspect.iscoroutinefunction(value)
+                and not inspect.isgeneratorfunction(value)):
+            namespace[name] = _timed_db_call(value)
+
+# --- 프로세스 자원 ---
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _resident_memory_bytes() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        # /proc이 없는 환경(macOS 등)에서는 최대 사용량으로 대신합니다. (macOS는 바이트, Linux는 KB 단위)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def _open_fds() -> float:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return 0
+
+_PROCESS_START = time.time()
+
+registry.gauge("process_resident_memory_bytes", "프로세스 상주 메모리(바이트)", callback=_resident_memory_bytes)
+registry.counter("process_cpu_seconds_total", "프로세스가 사용한 CPU 시간(초)", callback=_cpu_seconds)
+registry.gauge("process_open_fds", "열린 파일 디스크립터 수", callback=_open_fds)
+registry.gauge("process_start_time_seconds", "프로세스 시작 시각(유닉스 시간)", callback=lambda: _PROCESS_START)
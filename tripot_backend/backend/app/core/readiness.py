@@ -0,0 +1,120 @@
+# app/core/readiness.py
+# 외부 의존성(DB, 벡터 DB, 퀴즈 데이터 등)의 지연·재시도 초기화와 준비 상태 관리
+#
+# 모듈을 임포트할 때는 외부에 연결하지 않고, 서버 startup 훅에서 등록된 초기화 함수를 실행합니다.
+# 실패한 초기화는 백그라운드에서 지수 백오프로 계속 다시 시도하므로, 의존성이 잠깐 내려가 있어도 서버는 뜹니다.
+# /health/ready는 필수(required) 의존성이 모두 준비되어야 200을 반환합니다.
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+PENDING, READY, FAILED = "pending", "ready", "failed"
+
+DEPENDENCY_READY = metrics.registry.gauge(
+    "tripot_dependency_ready", "의존성 준비 여부 (1: 준비됨)", ["dependency"])
+DEPENDENCY_INIT_SECONDS = metrics.registry.histogram(
+    "tripot_dependency_init_seconds", "의존성 초기화 시도 시간(초)", ["dependency", "outcome"])
+
+class Dependency:
+    """초기화 함수 하나와 그 상태"""
+    def __init__(self, name: str, init: Callable[[], object], required: bool):
+        self.name = name
+        self.init = init
+        self.required = required
+        self.status = PENDING
+        self.attempts = 0
+        self.last_error: str | None = None
+        self.ready_at: datetime | None = None
+        self.init_seconds: float | None = None
+
+    def report(self) -> dict:
+        return {
+            "status": self.status,
+            "required": self.required,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "ready_at": self.ready_at.isoformat() if self.ready_at else None,
+            "init_seconds": round(self.init_seconds, 3) if self.init_seconds is not None else None,
+        }
+
+class ReadinessRegistry:
+    """등록된 의존성을 초기화하고, 실패한 것은 준비될 때까지 백그라운드에서 다시 시도합니다."""
+    def __init__(self, initial_delay: float = 1.0, max_delay: float = 60.0):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self._dependencies: dict[str, Dependency] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def register(self, name: str, init: Callable[[], object], required: bool = True):
+        """블로킹 초기화 함수를 등록합니다. (스레드에서 실행되며, 실패하면 예외를 던져야 합니다.)"""
+        self._dependencies[name] = Dependency(name, init, required)
+        DEPENDENCY_READY.set(0, dependency=name)
+
+    async def start(self, wait_seconds: float = 10.0):
+        """
+        모든 의존성의 초기화를 시작하고, 최대 wait_seconds 동안 필수 의존성이 준비되기를 기다립니다.
+        기다리는 시간이 지나도 서버 시작은 막지 않으며, 준비되지 않은 의존성은 계속 재시도됩니다.
+        """
+        for dependency in self._dependencies.values():
+            if dependency.status != READY:
+                self._tasks.append(asyncio.create_task(self._initialize(dependency)))
+
+        deadline = time.monotonic() + wait_seconds
+        while not self.is_ready() and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        if not self.is_ready():
+            pending = [d.name for d in self._dependencies.values() if d.required and d.status != READY]
+            logger.warning(f"필수 의존성이 아직 준비되지 않았습니다: {pending} (백그라운드에서 재시도)")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _initialize(self, dependency: Dependency):
+        delay = self.initial_delay
+        while True:
+            dependency.attempts += 1
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(dependency.init)
+            except Exception as e:
+                elapsed = time.perf_counter() - started
+                DEPENDENCY_INIT_SECONDS.observe(elapsed, dependency=dependency.name, outcome="error")
+                dependency.status = FAILED
+                dependency.last_error = f"{type(e).__name__}: {e}"
+                logger.warning(
+                    f"'{dependency.name}' 초기화 실패 ({dependency.attempts}회째), {delay:.0f}초 후 다시 시도합니다: {e}")
+                await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+                delay = min(delay * 2, self.max_delay)
+                continue
+
+            dependency.init_seconds = time.perf_counter() - started
+            DEPENDENCY_INIT_SECONDS.observe(dependency.init_seconds, dependency=dependency.name, outcome="ok")
+            DEPENDENCY_READY.set(1, dependency=dependency.name)
+            dependency.status = READY
+            dependency.last_error = None
+            dependency.ready_at = datetime.now(timezone.utc)
+            logger.info(f"'{dependency.name}' 준비 완료 ({dependency.init_seconds:.2f}초, {dependency.attempts}회째 시도)")
+            return
+
+    def is_ready(self) -> bool:
+        return all(d.status == READY for d in self._dependencies.values() if d.required)
+
+    def report(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "dependencies": {name: dependency.report() for name, dependency in self._dependencies.items()},
+        }
+
+# 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
+readiness = ReadinessRegistry()
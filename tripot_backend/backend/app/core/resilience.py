@@ -0,0 +1,220 @@
+# app/core/resilience.py
+# 외부 호출(OpenAI, Pinecone)을 감싸는 탄력성 계층
+#
+# - 시도마다 제한 시간을 두고, 전체 제한 시간 안에서 지터를 섞은 지수 백오프로 재시도합니다. (멱등 호출만)
+# - 헤지(hedge): 호출이 최근 p95 지연을 넘기면 같은 요청을 하나 더 보내 먼저 끝난 결과를 씁니다.
+#   꼬리 지연을 줄이기 위한 것이므로 결과가 같고 비용이 작은 호출(임베딩, STT, 벡터 검색)에만 켭니다.
+# - 서킷 브레이커: 연속 실패가 쌓이면 일정 시간 호출을 건너뛰고, 그 뒤 한 번 시험 호출해 회복을 확인합니다.
+# 블로킹 함수는 asyncio.to_thread로 실행합니다. 제한 시간이 지나도 스레드는 끝날 때까지 돌지만 턴은 기다리지 않습니다.
+# 그래서 함수가 요청별 제한 시간을 받으면(timeout_arg) 시도마다 남은 시간을 넘겨, 포기한 요청의 스레드도 곧 끝나게 합니다.
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+CALL_RETRIES = metrics.registry.counter(
+    "tripot_external_call_retries_total", "외부 호출 재시도 수", ["service", "operation"])
+CALL_TIMEOUTS = metrics.registry.counter(
+    "tripot_external_call_timeouts_total", "제한 시간을 넘긴 외부 호출 시도 수", ["service", "operation"])
+CALL_HEDGES = metrics.registry.counter(
+    "tripot_external_call_hedges_total", "헤지 요청 수 (outcome: won이면 헤지 요청이 먼저 끝남)", ["service", "operation", "outcome"])
+CIRCUIT_STATE = metrics.registry.gauge(
+    "tripot_circuit_breaker_open", "서킷 브레이커가 열려 호출을 건너뛰는 중인지 (1: 열림)", ["breaker"])
+CIRCUIT_REJECTED = metrics.registry.counter(
+    "tripot_circuit_breaker_rejected_total", "서킷 브레이커가 열려 건너뛴 호출 수", ["breaker"])
+
+# 4xx 중 다시 보내도 결과가 같은 요청 오류는 재시도하지 않습니다. (요청 시간 초과, 충돌, 속도 제한은 재시도)
+RETRYABLE_CLIENT_STATUSES = {408, 409, 429}
+
+class CircuitOpenError(RuntimeError):
+    """서킷 브레이커가 열려 있어 호출하지 않았음"""
+
+class CircuitBreaker:
+    """연속 실패 수 기반 서킷 브레이커 (closed → open → half-open)"""
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        CIRCUIT_STATE.set(0, breaker=name)
+
+    def is_open(self) -> bool:
+        """호출을 건너뛰어야 하는지 (상태는 바꾸지 않습니다.)"""
+        with self._lock:
+            return self._opened_at is not None and (
+                self._probing or time.monotonic() - self._opened_at < self.reset_timeout)
+
+    def allow(self) -> bool:
+        """호출해도 되는지. 열린 뒤 reset_timeout이 지나면 시험 호출 하나만 허용합니다."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._probing and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._probing = True
+                return True
+        CIRCUIT_REJECTED.inc(breaker=self.name)
+        return False
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"서킷 브레이커 '{self.name}'가 회복되어 닫혔습니다.")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+        CIRCUIT_STATE.set(0, breaker=self.name)
+
+    def abandon_probe(self):
+        """결과를 남기지 못하고 끝난 호출(취소 등) 뒤에 부릅니다. 시험 호출이었으면 다음 호출이 다시 시험합니다."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+                logger.warning(f"서킷 브레이커 '{self.name}'가 열렸습니다. ({self._failures}회 연속 실패, "
+                               f"{self.reset_timeout:.0f}초 동안 호출을 건너뜁니다.)")
+                self._opened_at = time.monotonic()
+            self._probing = False
+        if self._opened_at is not None:
+            CIRCUIT_STATE.set(1, breaker=self.name)
+
+class LatencyTracker:
+    """최근 호출 지연을 보관해 헤지 기준(p95)을 계산합니다."""
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> float | None:
+        """표본이 충분하지 않으면 None (헤지하지 않음)"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+_trackers: dict[tuple[str, str], LatencyTracker] = {}
+
+def _tracker(service: str, operation: str) -> LatencyTracker:
+    key = (service, operation)
+    tracker = _trackers.get(key)
+    if tracker is None:
+        tracker = _trackers.setdefault(key, LatencyTracker())
+    return tracker
+
+def is_retryable(error: BaseException) -> bool:
+    """다시 보내면 성공할 수 있는 오류인지 (잘못된 요청·인증 오류 등 4xx는 제외)"""
+    if isinstance(error, (ValueError, TypeError, CircuitOpenError)):
+        return False
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if isinstance(status, int) and 400 <= status < 500:
+        return status in RETRYABLE_CLIENT_STATUSES
+    return True
+
+def backoff_delay(attempt: int, base: float = 0.2, cap: float = 2.0) -> float:
+    """지터를 섞은 지수 백오프 (attempt는 1부터)"""
+    return min(cap, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+async def _attempt(func: Callable, args: tuple, kwargs: dict, service: str, operation: str,
+                   timeout: float, hedge: bool, timeout_arg: str | None):
+    """한 번의 시도. hedge=True면 p95를 넘겼을 때 같은 요청을 하나 더 보내 먼저 끝난 결과를 씁니다."""
+    tracker = _tracker(service, operation)
+    started = time.perf_counter()
+
+    def start():
+        call_kwargs = kwargs
+        if timeout_arg is not None:
+            # 요청 자체의 제한 시간을 이 시도의 남은 시간으로 맞춥니다.
+            call_kwargs = {**kwargs, timeout_arg: max(0.1, timeout - (time.perf_counter() - started))}
+        return asyncio.ensure_future(asyncio.to_thread(func, *args, **call_kwargs))
+
+    with metrics.external_call(service, operation):
+        primary = start()
+        pending = {primary}
+        hedged = False
+        try:
+            hedge_after = tracker.p95() if hedge else None
+            if hedge_after is not None and hedge_after < timeout:
+                done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                if not done:
+                    pending.add(start())
+                    hedged = True
+            while True:
+                remaining = timeout - (time.perf_counter() - started)
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, remaining),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    CALL_TIMEOUTS.inc(service=service, operation=operation)
+                    raise asyncio.TimeoutError(f"{service} {operation} 호출이 {timeout:.1f}초를 넘겼습니다.")
+                task = done.pop()
+                if task.exception() is not None and pending:
+                    continue  # 다른 요청이 아직 진행 중이면 그 결과를 기다립니다.
+                if hedged:
+                    CALL_HEDGES.inc(service=service, operation=operation,
+                                    outcome="lost" if task is primary else "won")
+                result = task.result()  # 실패했으면 여기서 예외가 다시 발생합니다.
+                tracker.observe(time.perf_counter() - started)
+                return result
+        finally:
+            for task in pending:
+                # 남은 요청은 스레드에서 끝까지 돌지만 결과는 버립니다. (예외가 로그에 남지 않게 회수)
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+async def call(func: Callable, *args, service: str, operation: str, timeout: float,
+               retries: int = 0, hedge: bool = False, deadline: float | None = None,
+               breaker: CircuitBreaker | None = None, timeout_arg: str | None = None, **kwargs):
+    """
+    블로킹 함수 func(*args, **kwargs)를 탄력성 정책에 따라 호출합니다.
+    - timeout: 시도 한 번의 제한 시간, deadline: 재시도를 포함한 전체 제한 시간 (기본값은 timeout의 2배)
+    - retries: 멱등 호출만 지정합니다. 재시도할 수 없는 오류나 전체 제한 시간을 넘기면 바로 예외를 던집니다.
+    - breaker: 열려 있으면 호출하지 않고 CircuitOpenError를 던집니다.
+    - timeout_arg: func가 받는 요청별 제한 시간 인자 이름. 주면 시도마다 남은 시간을 그 인자로 넘깁니다.
+    """
+    if breaker is not None and not breaker.allow():
+        raise CircuitOpenError(f"서킷 브레이커 '{breaker.name}'가 열려 있어 {operation} 호출을 건너뜁니다.")
+
+    deadline_at = time.perf_counter() + (deadline if deadline is not None else timeout * 2)
+    attempt = 0
+    recorded = False
+    try:
+        while True:
+            attempt += 1
+            attempt_timeout = min(timeout, deadline_at - time.perf_counter())
+            try:
+                result = await _attempt(func, args, kwargs, service, operation, attempt_timeout, hedge, timeout_arg)
+            except Exception as e:
+                delay = backoff_delay(attempt)
+                if attempt > retries or not is_retryable(e) or time.perf_counter() + delay >= deadline_at:
+                    if breaker is not None:
+                        breaker.record_failure()
+                        recorded = True
+                    raise
+                CALL_RETRIES.inc(service=service, operation=operation)
+                logger.debug(f"{service} {operation} 호출 실패, {delay:.2f}초 뒤 다시 시도합니다. ({attempt}/{retries}): {e!r}")
+                await asyncio.sleep(delay)
+                continue
+            if breaker is not None:
+                breaker.record_success()
+                recorded = True
+            return result
+    finally:
+        # 취소(CancelledError)로 끝나면 성공도 실패도 남지 않습니다. 시험 호출이 걸린 채 브레이커가 계속 열려 있지 않게 합니다.
+        if breaker is not None and not recorded:
+            breaker.abandon_probe()
@@ -0,0 +1,21 @@
+# app/core/time_utils.py
+# 서비스 기준 시간대(한국 시간) 관련 유틸리티
+
+from datetime import datetime, date, time, timedelta
+import pytz
+
+KST = pytz.timezone('Asia/Seoul')
+
+def now_kst() -> datetime:
+    """현재 한국 시간을 반환합니다."""
+    return datetime.now(KST)
+
+def today_kst() -> date:
+    """한국 시간 기준 오늘 날짜를 반환합니다. (서버 로컬 시간대와 무관)"""
+    return now_kst().date()
+
+def next_kst_midnight(now: datetime | None = None) -> datetime:
+    """다음 한국 시간 자정 시각을 반환합니다."""
+    now = now or now_kst()
+    tomorrow = now.astimezone(KST).date() + timedelta(days=1)
+    return KST.localize(datetime.combine(tomorrow, time.min))
@@ -1,12 +1,15 @@
 # app/db/crud.py
 
+import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, and_, or_
 from datetime import date, datetime, timedelta, time
 import json
-import pandas as pd
 
-from . import models, database
+from app.core import metrics
+from . import models
+
+logger = logging.getLogger(__name__)
 
 # --- User CRUD ---
 
@@ -31,14 +34,23 @@ def get_or_create_user(db: Session, user_id_str: str, name: str = None) -> model
 
 # --- Conversation & Summary CRUD ---
 
-def save_conversation(db: Session, user_id_str: str, user_message: str, ai_message: str):
-    """실시간 대화를 DB에 저장합니다."""
+def save_conversation(db: Session, user_id_str: str, user_message: str, ai_message: str) -> tuple[int, int]:
+    """실시간 대화를 DB에 저장하고 (사용자 발화 id, AI 응답 id)를 반환합니다."""
     user = get_or_create_user(db, user_id_str)
     user_convo = models.Conversation(user_id=user.id, speaker='user', message=user_message)
     ai_convo = models.Conversation(user_id=user.id, speaker='ai', message=ai_message)
     db.add(user_convo)
     db.add(ai_convo)
+    db.flush()  # 커밋 뒤에 id를 읽으면 행을 다시 조회하므로 미리 받아 둡니다.
+    conversation_ids = (user_convo.id, ai_convo.id)
     db.commit()
+    return conversation_ids
+
+def get_conversation_times(db: Session, conversation_ids: list[int]) -> dict[int, datetime]:
+    """대화 id별 created_at(DB 시계 기준)을 반환합니다."""
+    rows = db.query(models.Conversation.id, models.Conversation.created_at).filter(
+        models.Conversation.id.in_(conversation_ids)).all()
+    return dict(rows)
 
 def save_summary(db: Session, user_id_str: str, report_date: date, summary_json: dict):
     """분석된 리포트를 DB에 저장 또는 업데이트합니다."""
@@ -57,23 +69,130 @@ def get_latest_summary(db: Session, user_id_str: str) -> models.Summary | None:
     if not user: return None
     return db.query(models.Summary).filter_by(user_id=user.id).order_by(models.Summary.report_date.desc()).first()
 
+def _day_range(column, start_date: date, end_date: date | None = None):
+    """column이 start_date부터 end_date(생략 시 start_date)까지인 조건. DATE() 대신 시각 범위로 비교해 인덱스를 탑니다."""
+    end_date = end_date or start_date
+    return and_(column >= datetime.combine(start_date, time.min),
+                column < datetime.combine(end_date + timedelta(days=1), time.min))
+
 def get_user_ids_with_convos_on_date(db: Session, target_date: date) -> list[str]:
     """특정 날짜에 대화한 모든 사용자 ID 목록을 반환합니다."""
     user_ids = db.query(models.User.user_id_str).join(models.Conversation).filter(
-        func.date(models.Conversation.created_at) == target_date
+        _day_range(models.Conversation.created_at, target_date)
     ).distinct().all()
     return [uid[0] for uid in user_ids]
 
+def get_conversations_by_date(db: Session, user_id_str: str, target_date: date) -> list[models.Conversation]:
+    """특정 사용자의 하루치 대화를 시간순으로 반환합니다."""
+    return db.query(models.Conversation).join(models.User).filter(
+        models.User.user_id_str == user_id_str,
+        _day_range(models.Conversation.created_at, target_date)
+    ).order_by(models.Conversation.created_at.asc(), models.Conversation.id.asc()).all()
+
 def fetch_conversations_text_by_date(db: Session, user_id_str: str, target_date: date) -> str:
     """특정 사용자의 하루치 대화 내용을 리포트용 텍스트로 조합하여 반환합니다."""
-    conversations = db.query(models.Conversation).join(models.User).filter(
-        models.User.user_id_str == user_id_str,
-        func.date(models.Conversation.created_at) == target_date
-    ).order_by(models.Conversation.created_at.asc()).all()
+    conversations = get_conversations_by_date(db, user_id_str, target_date)
     if not conversations: return ""
     formatted = [f"{'사용자' if c.speaker == 'user' else 'AI'}: {c.message}" for c in conversations]
     return "\n".join(formatted)
 
+def _conversation_history_query(db: Session, user_id: int, start_date: date | None, end_date: date | None, *entities):
+    """기간(한쪽만 지정 가능, 양 끝 포함) 안의 대화 조회. 인덱스를 타도록 날짜 함수 대신 시각 범위로 비교합니다."""
+    query = db.query(*(entities or (models.Conversation,))).filter(models.Conversation.user_id == user_id)
+    if start_date:
+        query = query.filter(models.Conversation.created_at >= datetime.combine(start_date, time.min))
+    if end_date:
+        query = query.filter(models.Conversation.created_at < datetime.combine(end_date + timedelta(days=1), time.min))
+    return query
+
+def get_conversation_page(db: Session, user_id: int, start_date: date | None = None, end_date: date | None = None,
+                          after: tuple[datetime, int] | None = None, limit: int = 50,
+                          descending: bool = True) -> list[models.Conversation]:
+    """대화를 (created_at, id) 순서로 after 다음부터 limit개 조회합니다. (키셋 페이지네이션)"""
+    created_at, conversation_id = models.Conversation.created_at, models.Conversation.id
+    query = _conversation_history_query(db, user_id, start_date, end_date)
+    if after:
+        after_created_at, after_id = after
+        if descending:
+            query = query.filter(or_(created_at < after_created_at,
+                                     and_(created_at == after_created_at, conversation_id < after_id)))
+        else:
+            query = query.filter(or_(created_at > after_created_at,
+                                     and_(created_at == after_created_at, conversation_id > after_id)))
+    order = (created_at.desc(), conversation_id.desc()) if descending else (created_at.asc(), conversation_id.asc())
+    return query.order_by(*order).limit(limit).all()
+
+def iter_conversations(db: Session, user_id: int, start_date: date | None = None, end_date: date | None = None,
+                       batch_size: int = 500):
+    """
+    기간 안의 대화를 시간순으로 (id, created_at, speaker, message) 행으로 하나씩 돌려줍니다.
+    ORM 객체 대신 컬럼만 서버 측 커서로 batch_size개씩 읽으므로 기록이 아무리 많아도 메모리 사용량이 늘지 않습니다. (내보내기용)
+    """
+    conversation = models.Conversation
+    query = _conversation_history_query(
+        db, user_id, start_date, end_date,
+        conversation.id, conversation.created_at, conversation.speaker, conversation.message,
+    ).order_by(conversation.created_at.asc(), conversation.id.asc()).yield_per(batch_size)
+    yield from query
+
+# --- Archive CRUD ---
+
+def get_archive_partitions(db: Session, table_name: str, start: datetime | None = None,
+                           end: datetime | None = None, user_id: int | None = None) -> list[models.ArchivePartition]:
+    """보관 파일 중 [start, end) 시각 범위와 겹치는 것(user_id를 주면 그 사용자의 파일만)을 오래된 순서로 반환합니다."""
+    query = db.query(models.ArchivePartition).filter(models.ArchivePartition.table_name == table_name)
+    if user_id is not None:
+        query = query.filter(models.ArchivePartition.user_id == user_id)
+    if start:
+        query = query.filter(models.ArchivePartition.max_created_at >= start)
+    if end:
+        query = query.filter(models.ArchivePartition.min_created_at < end)
+    return query.order_by(models.ArchivePartition.month.asc(), models.ArchivePartition.part.asc()).all()
+
+def next_archive_part(db: Session, table_name: str, month: date) -> int:
+    last = db.query(func.max(models.ArchivePartition.part)).filter_by(table_name=table_name, month=month).scalar()
+    return (last or 0) + 1
+
+def save_report_fragment(db: Session, user_id_str: str, session_id: str, report_date: date, fragment_json: dict,
+                         conversation_lines: int, session_started_at: datetime, session_ended_at: datetime,
+                         first_conversation_id: int | None = None, last_conversation_id: int | None = None) -> bool:
+    """세션 리포트 조각을 저장합니다. 같은 세션의 조각이 이미 있으면 저장하지 않고 False를 반환합니다."""
+    user = get_or_create_user(db, user_id_str)
+    if db.query(models.ReportFragment.id).filter_by(session_id=session_id).first():
+        return False
+    db.add(models.ReportFragment(
+        user_id=user.id, session_id=session_id, report_date=report_date, fragment_json=fragment_json,
+        conversation_lines=conversation_lines, session_started_at=session_started_at, session_ended_at=session_ended_at,
+        first_conversation_id=first_conversation_id, last_conversation_id=last_conversation_id,
+    ))
+    db.commit()
+    return True
+
+def get_report_fragment_ranges(db: Session, user_id_str: str, first_conversation_id: int,
+                               last_conversation_id: int) -> list[tuple[int, int]]:
+    """대화 id 범위와 겹치는 사용자 조각의 (첫 대화 id, 마지막 대화 id) 목록 (날짜와 무관, 자정을 넘긴 세션 포함)"""
+    return [tuple(row) for row in db.query(
+        models.ReportFragment.first_conversation_id, models.ReportFragment.last_conversation_id,
+    ).join(models.User).filter(
+        models.User.user_id_str == user_id_str,
+        models.ReportFragment.last_conversation_id >= first_conversation_id,
+        models.ReportFragment.first_conversation_id <= last_conversation_id,
+    ).all()]
+
+def get_report_fragments(db: Session, user_id_str: str, report_date: date) -> list[models.ReportFragment]:
+    """사용자의 하루치 리포트 조각을 세션이 끝난 순서대로 반환합니다."""
+    return db.query(models.ReportFragment).join(models.User).filter(
+        models.User.user_id_str == user_id_str,
+        models.ReportFragment.report_date == report_date,
+    ).order_by(models.ReportFragment.session_ended_at.asc(), models.ReportFragment.id.asc()).all()
+
+def get_user_ids_with_fragments_on_date(db: Session, target_date: date) -> list[str]:
+    """특정 날짜의 리포트 조각이 있는 모든 사용자 ID 목록을 반환합니다."""
+    user_ids = db.query(models.User.user_id_str).join(
+        models.ReportFragment, models.ReportFragment.user_id == models.User.id
+    ).filter(models.ReportFragment.report_date == target_date).distinct().all()
+    return [uid[0] for uid in user_ids]
+
 # --- Photo & Comment CRUD ---
 
 def create_photo(db: Session, user_id: int, filename: str, original_name: str, file_path: str, file_size: int, uploaded_by: str) -> models.FamilyPhoto:
@@ -109,7 +228,7 @@ def get_schedules_by_user_id_str(db: Session, user_id_str: str) -> list[models.C
     if not user: return []
     return db.query(models.ConversationSchedule).filter_by(user_id=user.id).order_by(models.ConversationSchedule.call_time.asc()).all()
 
-def set_schedules(db: Session, user_id_str: str, call_times: list[time], family_user_id_str: str = None):
+def set_schedules(db: Session, user_id_str: str, call_times: list[time], family_user_id_str: str = None) -> models.User:
     senior_user = get_or_create_user(db, user_id_str)
     family_user_id = None
     if family_user_id_str:
@@ -128,6 +247,7 @@ def set_schedules(db: Session, user_id_str: str, call_times: list[time], family_
     senior_user.schedule_updated_at = datetime.utcnow()
     senior_user.schedule_updated_by = family_user_id_str or user_id_str
     db.commit()
+    return senior_user
 
 def update_user_last_schedule_check(db: Session, user_id_str: str):
     user = get_user_by_user_id_str(db, user_id_str)
@@ -147,13 +267,123 @@ def get_all_active_schedules(db: Session) -> list[tuple[str, str]]:
 
 # --- Calendar CRUD ---
 
-def update_calendar_data(db: Session, senior_user_id_str: str, family_user_id_str: str, calendar_json: str):
-    user = get_user_by_user_id_str(db, senior_user_id_str)
-    if user:
-        user.calendar_data = calendar_json
-        user.calendar_updated_at = datetime.utcnow()
-        user.calendar_updated_by = family_user_id_str
-        db.commit()
+def _touch_calendar(user: models.User, updated_by: str):
+    user.calendar_updated_at = datetime.utcnow()
+    user.calendar_updated_by = updated_by
+
+def get_calendar_events_in_range(db: Session, senior_user: models.User, start_date: date = None, end_date: date = None) -> list[models.CalendarEvent]:
+    """기간(양 끝 포함) 내 일정을 날짜순으로 조회합니다. 기간을 생략하면 전체를 조회합니다."""
+    query = db.query(models.CalendarEvent).filter(models.CalendarEvent.senior_user_id == senior_user.id)
+    if start_date:
+        query = query.filter(models.CalendarEvent.event_date >= start_date)
+    if end_date:
+        query = query.filter(models.CalendarEvent.event_date <= end_date)
+    return query.order_by(models.CalendarEvent.event_date.asc(), models.CalendarEvent.created_at.asc()).all()
+
+def get_calendar_event(db: Session, senior_user: models.User, event_uid: str) -> models.CalendarEvent | None:
+    return db.query(models.CalendarEvent).filter_by(senior_user_id=senior_user.id, event_uid=event_uid).first()
+
+def replace_calendar_events_for_date(db: Session, senior_user: models.User, event_date: date, events: list[dict], updated_by: str) -> set[date]:
+    """
+    한 날짜의 일정을 통째로 교체합니다. (events: id, text, created_at 키를 가진 dict 목록)
+    같은 id가 여러 번 있으면 마지막 것을 씁니다. (예전 JSON 저장 방식처럼 요청을 받아들입니다.)
+    변경된 날짜들(다른 날짜에서 옮겨 온 일정의 원래 날짜 포함)을 반환합니다.
+    """
+    events = list({event["id"]: event for event in events}.values())
+    event_uids = [event["id"] for event in events]
+    affected_dates = {event_date}
+    if event_uids:
+        affected_dates.update(row[0] for row in db.query(models.CalendarEvent.event_date).filter(
+            models.CalendarEvent.senior_user_id == senior_user.id,
+            models.CalendarEvent.event_uid.in_(event_uids)
+        ).all())
+    # 다른 날짜에서 옮겨 온 일정도 있을 수 있으므로 같은 id의 기존 일정도 함께 지웁니다.
+    db.query(models.CalendarEvent).filter(
+        models.CalendarEvent.senior_user_id == senior_user.id,
+        (models.CalendarEvent.event_date == event_date) | (models.CalendarEvent.event_uid.in_(event_uids))
+    ).delete(synchronize_session=False)
+
+    for event in events:
+        db.add(models.CalendarEvent(
+            senior_user_id=senior_user.id, event_uid=event["id"], event_date=event_date,
+            text=event["text"], created_at=event["created_at"], updated_by=updated_by
+        ))
+
+    _touch_calendar(senior_user, updated_by)
+    db.commit()
+    return affected_dates
+
+def upsert_calendar_event(db: Session, senior_user: models.User, event_uid: str, event_date: date, text: str, created_at: datetime, updated_by: str) -> models.CalendarEvent:
+    """일정 하나를 추가하거나 수정합니다."""
+    event = get_calendar_event(db, senior_user, event_uid)
+    if event:
+        event.event_date = event_date
+        event.text = text
+        event.updated_by = updated_by
+    else:
+        event = models.CalendarEvent(
+            senior_user_id=senior_user.id, event_uid=event_uid, event_date=event_date,
+            text=text, created_at=created_at or datetime.utcnow(), updated_by=updated_by
+        )
+        db.add(event)
+
+    _touch_calendar(senior_user, updated_by)
+    db.commit()
+    db.refresh(event)
+    return event
+
+def delete_calendar_event(db: Session, senior_user: models.User, event_uid: str, updated_by: str) -> date | None:
+    """일정 하나를 삭제하고, 삭제된 일정의 날짜를 반환합니다. 없으면 None을 반환합니다."""
+    event = get_calendar_event(db, senior_user, event_uid)
+    if not event:
+        return None
+
+    event_date = event.event_date
+    db.delete(event)
+    _touch_calendar(senior_user, updated_by)
+    db.commit()
+    return event_date
+
+def migrate_calendar_blob(db: Session, user: models.User) -> int:
+    """
+    (구) users.calendar_data JSON을 calendar_events 테이블로 옮기고 원본을 비웁니다. (scripts/migrate_db.py에서 실행)
+    이미 옮겨진 사용자는 아무 작업도 하지 않으며, 옮긴 일정 수를 반환합니다.
+    이전 전에 새 API로 저장된 일정과 id가 같은 JSON 일정은 새 일정을 남기고 건너뜁니다.
+    """
+    if not user.calendar_data:
+        return 0
+
+    try:
+        calendar_data = json.loads(user.calendar_data)
+    except (json.JSONDecodeError, TypeError):
+        calendar_data = {}
+
+    count = 0
+    seen_uids = {row[0] for row in db.query(models.CalendarEvent.event_uid).filter_by(senior_user_id=user.id).all()}
+    for date_str, day in (calendar_data or {}).items():
+        try:
+            event_date = date.fromisoformat(date_str)
+        except (TypeError, ValueError):
+            continue
+        for event in (day or {}).get("events", []):
+            event_uid = str(event.get("id") or f"{date_str}-{count}")
+            if event_uid in seen_uids:
+                continue
+            seen_uids.add(event_uid)
+            try:
+                created_at = datetime.fromisoformat(str(event.get("created_at")).replace("Z", "+00:00")).replace(tzinfo=None)
+            except ValueError:
+                created_at = datetime.utcnow()
+            db.add(models.CalendarEvent(
+                senior_user_id=user.id, event_uid=event_uid, event_date=event_date,
+                text=event.get("text", ""), created_at=created_at, updated_by=user.calendar_updated_by
+            ))
+            count += 1
+
+    user.calendar_data = None
+    db.commit()
+    logger.info(f"[{user.user_id_str}] 캘린더 JSON의 일정 {count}개를 calendar_events로 옮겼습니다.")
+    return count
 
 def update_user_last_calendar_check(db: Session, user_id_str: str):
     user = get_user_by_user_id_str(db, user_id_str)
@@ -166,21 +396,83 @@ def update_user_last_calendar_check(db: Session, user_id_str: str):
 def get_daily_question(db: Session, target_date: date) -> models.DailyQA | None:
     return db.query(models.DailyQA).filter(models.DailyQA.daily_date == target_date).first()
 
-def add_family_answer_to_daily_question(db: Session, target_date: date, answer_text: str):
+# 답변 작성자 역할
+FAMILY_ROLE = "family"
+ELDERLY_ROLE = "elderly"
+
+def add_daily_qa_answer(db: Session, question_id: int, author_role: str, answer_text: str, user_id_str: str = None) -> models.DailyQAAnswer:
+    """'오늘의 질문'에 답변 한 건을 추가합니다. 기존 답변을 읽지 않는 단순 INSERT라 동시에 답변해도 유실되지 않습니다."""
+    user_id = None
+    if user_id_str:
+        user = get_user_by_user_id_str(db, user_id_str)
+        if user: user_id = user.id
+
+    answer = models.DailyQAAnswer(
+        daily_qa_id=question_id, user_id=user_id, author_role=author_role, answer_text=answer_text
+    )
+    db.add(answer)
+    db.commit()
+    db.refresh(answer)
+    return answer
+
+def add_family_answer_to_daily_question(db: Session, target_date: date, answer_text: str, user_id_str: str = None) -> models.DailyQAAnswer | None:
     question = get_daily_question(db, target_date)
     if question:
-        current_answers = question.family_answer_content or ""
-        new_answers = f"{current_answers}\n{answer_text}".strip()
-        question.family_answer_content = new_answers
-        db.commit()
+        return add_daily_qa_answer(db, question.id, FAMILY_ROLE, answer_text, user_id_str)
+    return None
 
-def update_elderly_answer_log(db: Session, target_date: date, new_log_entry: str):
+def update_elderly_answer_log(db: Session, target_date: date, new_log_entry: str, user_id_str: str = None) -> models.DailyQAAnswer | None:
     question = get_daily_question(db, target_date)
     if question:
-        current_log = question.elderly_answer_content or ""
-        new_log = f"{current_log}\n{new_log_entry}".strip()
-        question.elderly_answer_content = new_log
-        db.commit()
+        return add_daily_qa_answer(db, question.id, ELDERLY_ROLE, new_log_entry, user_id_str)
+    return None
+
+def get_daily_qa_answers(db: Session, question_id: int, author_role: str = None, after_id: int = None, limit: int = 20) -> list[models.DailyQAAnswer]:
+    """답변을 작성 순서대로 조회합니다. after_id 이후부터 limit개를 가져오는 키셋 페이지네이션입니다."""
+    query = db.query(models.DailyQAAnswer).filter(models.DailyQAAnswer.daily_qa_id == question_id)
+    if author_role:
+        query = query.filter(models.DailyQAAnswer.author_role == author_role)
+    if after_id:
+        query = query.filter(models.DailyQAAnswer.id > after_id)
+    return query.order_by(models.DailyQAAnswer.id.asc()).limit(limit).all()
+
+def get_daily_qa_answer_texts(db: Session, question) -> dict[str, list[str]]:
+    """
+    질문의 모든 답변 텍스트를 역할별로 모아 반환합니다. (이전 전의 누적 텍스트 컬럼도 포함)
+    question은 DailyQA 행 또는 캐시 스냅샷이며 id만 사용합니다. 누적 텍스트 컬럼은 이전 스크립트가 비우므로
+    캐시된 값이 아니라 항상 DB에서 읽습니다. (이전 뒤 같은 답변이 두 번 보이지 않도록)
+    """
+    answer_texts = {FAMILY_ROLE: [], ELDERLY_ROLE: []}
+    legacy = db.query(models.DailyQA.family_answer_content, models.DailyQA.elderly_answer_content).filter(
+        models.DailyQA.id == question.id).first()
+    for role, legacy_content in zip((FAMILY_ROLE, ELDERLY_ROLE), legacy or (None, None)):
+        if legacy_content:
+            answer_texts[role].extend(line for line in legacy_content.split("\n") if line.strip())
+
+    rows = db.query(models.DailyQAAnswer.author_role, models.DailyQAAnswer.answer_text).filter(
+        models.DailyQAAnswer.daily_qa_id == question.id
+    ).order_by(models.DailyQAAnswer.created_at.asc(), models.DailyQAAnswer.id.asc()).all()
+    for role, text in rows:
+        answer_texts.setdefault(role, []).append(text)
+    return answer_texts
+
+def migrate_daily_qa_answer_log(db: Session, question: models.DailyQA) -> int:
+    """(구) 누적 텍스트 컬럼의 답변을 daily_qa_answers 행으로 옮기고 원본을 비웁니다. 옮긴 답변 수를 반환합니다."""
+    count = 0
+    for role, column in ((FAMILY_ROLE, "family_answer_content"), (ELDERLY_ROLE, "elderly_answer_content")):
+        legacy_content = getattr(question, column)
+        if not legacy_content:
+            continue
+        for line in legacy_content.split("\n"):
+            if line.strip():
+                db.add(models.DailyQAAnswer(
+                    daily_qa_id=question.id, author_role=role, answer_text=line,
+                    created_at=question.updated_at or question.created_at
+                ))
+                count += 1
+        setattr(question, column, None)
+    db.commit()
+    return count
 
 # --- Quiz & Quiz Result CRUD ---
 
@@ -196,16 +488,11 @@ def save_quiz_result(db: Session, result_data: dict):
     db.add(new_result)
     db.commit()
 
-def fetch_quizzes_as_df() -> pd.DataFrame:
-    """DB에서 모든 퀴즈를 불러와 DataFrame으로 반환합니다."""
-    try:
-        engine = database.engine
-        query = "SELECT id, topic, question_text, answer FROM quiz"
-        df = pd.read_sql(query, engine)
-        return df
-    except Exception as e:
-        print(f"❌ 퀴즈 DB 데이터 로드 중 오류 발생: {e}")
-        return pd.DataFrame()
+def fetch_all_quizzes(db: Session) -> list[tuple[int, str, str, str]]:
+    """DB에서 모든 퀴즈를 (id, topic, question_text, answer) 튜플 목록으로 반환합니다."""
+    return [tuple(row) for row in db.query(
+        models.Quiz.id, models.Quiz.topic, models.Quiz.question_text, models.Quiz.answer
+    ).order_by(models.Quiz.id.asc()).all()]
 
 def fetch_quiz_results_with_topic(db: Session, user_id_str: str, start_date: date, end_date: date) -> list:
     """기간 내 사용자의 퀴즈 결과와 주제를 함께 가져옵니다."""
@@ -219,7 +506,7 @@ def fetch_quiz_results_with_topic(db: Session, user_id_str: str, start_date: dat
         models.Quiz, models.QuizResult.quiz_id == models.Quiz.id
     ).filter(
         models.QuizResult.user_id == user.id,
-        func.date(models.QuizResult.created_at).between(start_date, end_date)
+        _day_range(models.QuizResult.created_at, start_date, end_date)
     ).all()
 
 def delete_schedules_by_user_id_str(db: Session, user_id_str: str) -> int:
@@ -236,4 +523,7 @@ def delete_schedules_by_user_id_str(db: Session, user_id_str: str) -> int:
     user.schedule_updated_by = user_id_str # 스스로 삭제했음을 기록
     db.commit()
     
-    return deleted_count
\ No newline at end of file
+    return deleted_count
+
+# --- 계측: 위에 정의된 모든 공개 crud 함수의 실행 시간과 오류 수를 기록합니다. (/metrics) ---
+metrics.instrument_db_module(globals())
@@ -1,12 +1,15 @@
 # app/database.py
 
+import logging
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import settings
 
-# 데이터베이스 연결 설정
-engine = create_engine(settings.DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+# 데이터베이스 연결 설정 (엔진 생성만으로는 연결하지 않습니다. 재시작된 DB의 끊긴 연결은 pre_ping으로 걸러 냄)
+engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -16,18 +19,21 @@ def init_db():
     """
     try:
         # DB가 없으면 생성 (최초 실행 시 필요)
-        server_engine = create_engine(settings.SERVER_DATABASE_URL, echo=True)
-        with server_engine.connect() as connection:
-            connection.execute(text(f"CREATE DATABASE IF NOT EXISTS {settings.MYSQL_DATABASE} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"))
+        server_engine = create_engine(settings.SERVER_DATABASE_URL)
+        try:
+            with server_engine.connect() as connection:
+                connection.execute(text(f"CREATE DATABASE IF NOT EXISTS {settings.MYSQL_DATABASE} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"))
+        finally:
+            server_engine.dispose()
         
         # models.py에 정의된 모든 테이블을 생성
         # Base.metadata.create_all()이 이미 존재하는 테이블은 건너뜁니다.
         from . import models # models.py를 임포트하여 Base에 테이블 정보가 등록되도록 함
         Base.metadata.create_all(bind=engine)
         
-        print("✅ 데이터베이스 및 모든 테이블이 성공적으로 준비되었습니다.")
+        logger.info("데이터베이스 및 모든 테이블이 성공적으로 준비되었습니다.")
     except Exception as e:
-        print(f"❌ 데이터베이스 설정 중 오류 발생: {e}")
+        logger.error(f"데이터베이스 설정 중 오류 발생: {e}")
         raise
 
 def get_db():
@@ -1,7 +1,7 @@
 # app/db/models.py
 
 from sqlalchemy import (Column, Integer, String, DateTime, ForeignKey, Text, 
-                        Boolean, Time, Date, JSON)
+                        Boolean, Time, Date, JSON, Index, UniqueConstraint)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -15,7 +15,7 @@ class User(Base):
     schedule_updated_at = Column(DateTime, nullable=True)
     schedule_updated_by = Column(String(255), nullable=True)
     last_schedule_check = Column(DateTime, nullable=True)
-    calendar_data = Column(Text, nullable=True)
+    calendar_data = Column(Text, nullable=True)  # (구) 캘린더 JSON 통째 저장, calendar_events로 이전 후 비워집니다.
     calendar_updated_at = Column(DateTime, nullable=True)
     calendar_updated_by = Column(String(255), nullable=True)
     last_calendar_check = Column(DateTime, nullable=True)
@@ -28,6 +28,7 @@ class User(Base):
     conversations = relationship("Conversation", back_populates="user_rel")
     summaries = relationship("Summary", back_populates="user_rel")
     quiz_results = relationship("QuizResult", back_populates="user_rel")
+    calendar_events = relationship("CalendarEvent", back_populates="senior_user")
 
 class FamilyPhoto(Base):
     __tablename__ = "family_photos"
@@ -69,8 +70,29 @@ class ConversationSchedule(Base):
     user = relationship("User", foreign_keys=[user_id], back_populates="schedules")
     family_user = relationship("User", foreign_keys=[family_user_id], back_populates="family_set_schedules")
 
+class CalendarEvent(Base):
+    __tablename__ = "calendar_events"
+    __table_args__ = (
+        Index("ix_calendar_events_senior_date", "senior_user_id", "event_date"),
+        UniqueConstraint("senior_user_id", "event_uid", name="uq_calendar_events_senior_uid"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    senior_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    event_uid = Column(String(255), nullable=False)  # 앱에서 생성한 일정 id
+    event_date = Column(Date, nullable=False)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)  # 앱에서 일정을 만든 시각
+    updated_by = Column(String(255), nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    senior_user = relationship("User", back_populates="calendar_events")
+
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # 대화 기록 조회/내보내기의 키셋 페이지네이션 (user_id, created_at, id) 순서
+        Index("ix_conversations_user_created_id", "user_id", "created_at", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     speaker = Column(String(50), nullable=False)
@@ -89,6 +111,47 @@ class Summary(Base):
     
     user_rel = relationship("User", back_populates="summaries")
 
+class ArchivePartition(Base):
+    """운영 테이블에서 압축 파일로 옮긴 사용자별·월별 데이터 목록 (보관 파일의 매니페스트)"""
+    __tablename__ = "archive_partitions"
+    __table_args__ = (
+        UniqueConstraint("table_name", "month", "user_id", "part", name="uq_archive_partitions_table_month_user_part"),
+        Index("ix_archive_partitions_table_user_month", "table_name", "user_id", "month"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String(64), nullable=False)
+    user_id = Column(Integer, nullable=False)    # 파일에 담긴 행의 user_id (사용자가 지워져도 매니페스트는 남습니다.)
+    month = Column(Date, nullable=False)         # 그 달의 1일
+    part = Column(Integer, nullable=False)       # 같은 달을 여러 번 옮긴 경우의 순번 (1부터)
+    path = Column(String(512), nullable=False)   # ARCHIVE_DIR 기준 상대 경로
+    row_count = Column(Integer, nullable=False)
+    min_id = Column(Integer, nullable=False)
+    max_id = Column(Integer, nullable=False)
+    min_created_at = Column(DateTime, nullable=False)
+    max_created_at = Column(DateTime, nullable=False)
+    sha256 = Column(String(64), nullable=False)  # 압축 파일의 체크섬
+    archived_at = Column(DateTime, server_default=func.now())
+
+class ReportFragment(Base):
+    """세션이 끝날 때마다 만드는 리포트 조각 (summaries와 같은 JSON 구조, 밤에 하루치를 합쳐 summaries에 저장)"""
+    __tablename__ = "report_fragments"
+    __table_args__ = (
+        Index("ix_report_fragments_user_date", "user_id", "report_date"),
+        Index("ix_report_fragments_user_last_conversation", "user_id", "last_conversation_id"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    report_date = Column(Date, nullable=False)           # 마지막 대화의 (DB 시계 기준) 날짜
+    session_id = Column(String(64), nullable=False, unique=True)  # 같은 세션으로 두 번 만들지 않도록
+    fragment_json = Column(JSON, nullable=False)
+    conversation_lines = Column(Integer, nullable=False)
+    session_started_at = Column(DateTime, nullable=False)
+    session_ended_at = Column(DateTime, nullable=False)  # 하루치를 합칠 때 순서 기준
+    # 조각에 담긴 conversations 행의 id 범위 (조각에 담기지 않은 대화를 찾는 기준, 배포 전 세션은 NULL)
+    first_conversation_id = Column(Integer, nullable=True)
+    last_conversation_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+
 class Quiz(Base):
     __tablename__ = "quiz"
     id = Column(Integer, primary_key=True, index=True)
@@ -116,7 +179,23 @@ class DailyQA(Base):
     id = Column(Integer, primary_key=True, index=True)
     daily_date = Column(Date, nullable=False, unique=True)
     question_text = Column(Text, nullable=False)
-    family_answer_content = Column(Text)
-    elderly_answer_content = Column(Text)
+    family_answer_content = Column(Text)  # (구) 답변 누적 텍스트, daily_qa_answers로 이전 후 비워집니다.
+    elderly_answer_content = Column(Text)  # (구) 답변 누적 텍스트, daily_qa_answers로 이전 후 비워집니다.
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    answers = relationship("DailyQAAnswer", back_populates="question")
+
+class DailyQAAnswer(Base):
+    __tablename__ = "daily_qa_answers"
+    __table_args__ = (
+        Index("ix_daily_qa_answers_question_id", "daily_qa_id", "id"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    daily_qa_id = Column(Integer, ForeignKey("daily_qa.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # 작성자 (알 수 없으면 NULL)
+    author_role = Column(String(20), nullable=False)  # 'family' 또는 'elderly'
+    answer_text = Column(Text, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+
+    question = relationship("DailyQA", back_populates="answers")
\ No newline at end of file
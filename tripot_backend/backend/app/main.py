@@ -1,13 +1,26 @@
 # app/main.py
 
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 import asyncio
+import time
+import uuid
+
+# --- 로깅 설정 (다른 모듈이 임포트 시점에 남기는 로그도 잡도록 가장 먼저 설정) ---
+from app.core import logging_config
+logging_config.setup_logging()
 
 # --- 우리가 만든 모듈들을 임포트 ---
+from app.core import metrics
+from app.core.config import settings
+from app.core.readiness import readiness
 from app.db import database
 from app.api.v1.api import api_router
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="Tripot API",
     description="트라이팟 서비스의 통합 API 서버입니다.",
@@ -23,44 +36,126 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- 요청 ID 부여 (로그 레코드에 request_id로 붙습니다.) ---
+@app.middleware("http")
+async def bind_request_id(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+    token = logging_config.request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        logging_config.request_id_var.reset(token)
+
+# --- REST 요청 지연 시간 측정 ---
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """요청마다 처리 시간을 라우트 경로 템플릿(예: /api/v1/calendar/{senior_user_id}) 기준으로 기록합니다."""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=_route_template(request),
+            status=str(status),
+        )
+
+def _route_template(request: Request) -> str:
+    """
+    요청과 일치한 라우트의 경로 템플릿을 반환합니다. (사용자 ID마다 레이블이 따로 생기지 않도록 하기 위함)
+    일치한 라우트가 없으면 'unmatched'입니다.
+    FastAPI 버전에 따라 포함된 라우터의 route.path에 prefix가 빠져 있으므로, 템플릿과 일치하는 경로 뒷부분을 찾아
+    그 앞의 prefix(고정 문자열)를 붙입니다.
+    """
+    route = request.scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    path = request.scope.get("path", "")
+    path_regex = getattr(route, "path_regex", None)
+    if path_regex is not None:
+        for index, char in enumerate(path):
+            if char == "/" and path_regex.match(path[index:]):
+                return path[:index] + template
+    return template
+
 # --- API 라우터 포함 ---
 app.include_router(api_router, prefix="/api/v1")
 
 # --- 서버 시작/종료 이벤트 처리 ---
 @app.on_event("startup")
 async def startup_event():
-    """서버가 시작될 때 실행됩니다."""
-    try:
-        print("🚀 서버 시작 - 데이터베이스 및 스케줄러 초기화...")
-        
-        # 1. 데이터베이스 초기화
-        database.init_db()
-        
-        # 2. 정시 대화 스케줄러 시작
-        from app.services.schedule_service import scheduler_service
-        # 🔽🔽🔽 함수 이름 수정 🔽🔽🔽
-        asyncio.create_task(scheduler_service.start()) 
-        
-        print("✅ 서버가 성공적으로 시작되었습니다.")
-        
-    except Exception as e:
-        print(f"❌ 서버 시작 중 오류 발생: {e}")
-        raise RuntimeError("서버 시작 실패") from e
+    """
+    서버가 시작될 때 실행됩니다.
+    외부 의존성은 준비 상태 관리자가 재시도하며 초기화하므로, 잠깐 내려가 있어도 서버 시작이 실패하지 않습니다.
+    """
+    logger.info("서버 시작 - 의존성 초기화 및 스케줄러 시작...")
+    from app.services import vector_db_service
+    from app.services.quiz_bank import quiz_bank
+
+    # 1. 의존성 초기화 (DB만 필수, 벡터 DB와 퀴즈 데이터는 없어도 대화는 가능)
+    readiness.register("database", database.init_db, required=True)
+    readiness.register("vector_db", vector_db_service.init_index, required=False)
+    readiness.register("quiz_bank", quiz_bank.load, required=False)
+    await readiness.start(wait_seconds=settings.STARTUP_WAIT_SECONDS)
+
+    # 2. 정시 대화 스케줄러와 세션 정리 작업(재접속 유예 시간이 지난 세션 요약) 시작
+    from app.services.schedule_service import scheduler_service
+    from app.services.senior_session import session_finalizer
+    from app.services.connection_manager import manager
+    asyncio.create_task(scheduler_service.start())
+    asyncio.create_task(session_finalizer.start())
+    asyncio.create_task(manager.start())  # 웹소켓 하트비트와 유휴 연결 정리
+
+    logger.info("서버가 시작되었습니다." if readiness.is_ready() else "서버가 시작되었지만 아직 준비 중입니다. (/health/ready 참고)")
 
 @app.on_event("shutdown") 
 async def shutdown_event():
     """서버가 종료될 때 실행됩니다."""
     try:
-        print("⏹️ 서버 종료 - 스케줄러 정리 중...")
+        logger.info("서버 종료 - 스케줄러 정리 중...")
         from app.services.schedule_service import scheduler_service
         # 🔽🔽🔽 함수 이름 수정 🔽�🔽
         scheduler_service.stop()
-        print("✅ 스케줄러가 정상적으로 종료되었습니다.")
+        logger.info("스케줄러가 정상적으로 종료되었습니다.")
     except Exception as e:
-        print(f"❌ 스케줄러 종료 중 오류 발생: {e}")
+        logger.error(f"스케줄러 종료 중 오류 발생: {e}")
+    finally:
+        # 남은 웹소켓 연결을 닫고, 세션 정리 작업과 아직 재시도 중인 의존성 초기화를 멈추고, 큐에 남은 로그를 모두 출력합니다.
+        from app.services.senior_session import session_finalizer
+        from app.services.connection_manager import manager
+        await manager.stop()
+        try:
+            await session_finalizer.stop()
+        except Exception as e:
+            logger.error(f"세션 정리 작업 종료 중 오류 발생: {e}")
+        await readiness.stop()
+        logging_config.shutdown_logging()
 
 # --- 기본 엔드포인트 ---
 @app.get("/", tags=["Root"])
 def read_root():
     """서버 상태 확인용 루트 경로"""
-    return {"message": "Welcome to Tripot Integrated Backend!"}
\ No newline at end of file
+    return {"message": "Welcome to Tripot Integrated Backend!"}
+
+@app.get("/health/live", tags=["Root"])
+def health_live():
+    """프로세스가 살아 있는지 확인합니다. (의존성 상태와 무관)"""
+    return {"status": "alive"}
+
+@app.get("/health/ready", tags=["Root"])
+def health_ready():
+    """의존성별 준비 상태를 반환합니다. 필수 의존성이 준비되지 않았으면 503을 반환합니다."""
+    report = readiness.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+@app.get("/metrics", tags=["Root"], response_class=PlainTextResponse)
+def read_metrics():
+    """Prometheus 형식의 서버 지표 (대화 턴 단계별 지연, REST/DB/외부 API 지연, 프로세스 자원)"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
\ No newline at end of file
@@ -41,6 +41,20 @@ class SeniorReportSummary(BaseModel):
     stats: SeniorReportStats
     ranking: List[SeniorReportRanking]
 
+# --- Conversation History Schemas ---
+class ConversationHistoryItem(BaseModel):
+    id: int
+    speaker: str
+    message: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ConversationHistoryPage(BaseModel):
+    items: List[ConversationHistoryItem]
+    next_cursor: Optional[str] = None
+
 # --- Photo & Comment Schemas ---
 class PhotoCommentBase(BaseModel):
     comment_text: str
@@ -0,0 +1,190 @@
+# app/services/ai_admission.py
+# AI 제공자 호출의 프로세스 전역 승인(admission) 제어
+#
+# 모든 AI 호출은 우선순위 등급 중 하나로 들어와 자리를 얻은 뒤에 실행됩니다.
+#   interactive(실시간 대화 턴) > grading(퀴즈 채점) > memory(세션 종료 후 기억 요약) > batch(일일 리포트)
+# - 전체 동시 호출 수(AI_MAX_CONCURRENT_CALLS) 중 AI_INTERACTIVE_RESERVED_CALLS개는 interactive만 쓸 수 있습니다.
+# - 등급마다 동시 호출 수와 분당 토큰 수(토큰 버킷) 제한이 있습니다. (AI_ADMISSION_LIMITS)
+# - 자리가 나면 항상 높은 등급의 대기열부터 승인합니다. 같은 등급 안에서는 먼저 온 순서입니다.
+#   높은 등급이 자기 등급 제한에 걸려 기다리는 동안에는 낮은 등급이 남는 자리를 쓸 수 있습니다.
+# 제어는 이 프로세스 안에서만 적용됩니다. (별도 프로세스로 도는 리포트 스크립트는 자기 batch 제한을 따릅니다.)
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+GRADING = "grading"
+MEMORY = "memory"
+BATCH = "batch"
+PRIORITY_CLASSES = (INTERACTIVE, GRADING, MEMORY, BATCH)  # 앞쪽이 우선
+
+ADMISSION_WAIT_SECONDS = metrics.registry.histogram(
+    "tripot_ai_admission_wait_seconds", "AI 호출이 승인될 때까지 기다린 시간(초)", ["priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300))
+ADMISSION_QUEUE_DEPTH = metrics.registry.gauge(
+    "tripot_ai_admission_queue_depth", "승인을 기다리는 AI 호출 수", ["priority"])
+ADMISSION_IN_FLIGHT = metrics.registry.gauge(
+    "tripot_ai_admission_in_flight", "실행 중인 AI 호출 수", ["priority"])
+ADMISSION_TOKENS = metrics.registry.counter(
+    "tripot_ai_admission_tokens_total", "승인된 AI 호출의 추정 토큰 수", ["priority"])
+
+@dataclass(frozen=True)
+class ClassLimits:
+    max_concurrency: int
+    tokens_per_minute: int = 0  # 0이면 토큰 제한 없음
+
+class _TokenBucket:
+    """분당 토큰 수 제한. 한 번에 최대 1분치까지 모아 둘 수 있습니다."""
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: int) -> float:
+        """amount만큼 쓸 수 있을 때까지 남은 시간(초). 1분치보다 큰 요청은 1분치가 찼을 때 보냅니다."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: int):
+        self.tokens -= min(amount, self.capacity)
+
+class _Waiter:
+    __slots__ = ("future", "tokens")
+
+    def __init__(self, future: asyncio.Future, tokens: int):
+        self.future = future
+        self.tokens = tokens
+
+class AdmissionController:
+    """우선순위 등급별 대기열을 가진 AI 호출 승인 관리자 (이벤트 루프 안에서만 사용)"""
+    def __init__(self, max_concurrency: int, reserved_for_interactive: int, limits: dict[str, ClassLimits]):
+        self.max_concurrency = max_concurrency
+        self.reserved_for_interactive = min(reserved_for_interactive, max_concurrency - 1)
+        self.limits = {name: limits.get(name, ClassLimits(max_concurrency)) for name in PRIORITY_CLASSES}
+        self._buckets = {name: _TokenBucket(limit.tokens_per_minute)
+                         for name, limit in self.limits.items() if limit.tokens_per_minute > 0}
+        self._queues: dict[str, deque[_Waiter]] = {name: deque() for name in PRIORITY_CLASSES}
+        self._in_flight = {name: 0 for name in PRIORITY_CLASSES}
+        self._total_in_flight = 0
+        self._timer: asyncio.TimerHandle | None = None
+
+    @asynccontextmanager
+    async def slot(self, priority: str, tokens: int = 0):
+        """승인을 받을 때까지 기다린 뒤 블록을 실행하고, 끝나면 자리를 돌려줍니다."""
+        if priority not in self._queues:
+            raise ValueError(f"알 수 없는 우선순위 등급입니다: {priority}")
+        started = time.perf_counter()
+        await self._acquire(priority, tokens)
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started, priority=priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    async def _acquire(self, priority: str, tokens: int):
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), tokens)
+        self._queues[priority].append(waiter)
+        ADMISSION_QUEUE_DEPTH.inc(priority=priority)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(priority)  # 승인과 취소가 겹쳤으면 받은 자리를 돌려줍니다.
+            else:
+                self._remove(priority, waiter)
+            raise
+
+    def _remove(self, priority: str, waiter: _Waiter):
+        try:
+            self._queues[priority].remove(waiter)
+            ADMISSION_QUEUE_DEPTH.dec(priority=priority)
+        except ValueError:
+            pass
+        self._dispatch()
+
+    def _release(self, priority: str):
+        self._in_flight[priority] -= 1
+        self._total_in_flight -= 1
+        ADMISSION_IN_FLIGHT.dec(priority=priority)
+        self._dispatch()
+
+    def _dispatch(self):
+        """높은 등급부터 승인할 수 있는 대기 호출을 모두 승인합니다."""
+        retry_after = None
+        for priority in PRIORITY_CLASSES:
+            queue = self._queues[priority]
+            limit = self.limits[priority]
+            bucket = self._buckets.get(priority)
+            capacity = self.max_concurrency - (0 if priority == INTERACTIVE else self.reserved_for_interactive)
+            while queue:
+                if self._total_in_flight >= capacity:
+                    # 전체 자리가 없으면 낮은 등급도 승인할 수 없습니다.
+                    return self._schedule(retry_after)
+                if self._in_flight[priority] >= limit.max_concurrency:
+                    break  # 이 등급만 막혔으니 다음 등급을 봅니다.
+                waiter = queue[0]
+                if bucket is not None:
+                    wait = bucket.wait_time(waiter.tokens)
+                    if wait > 0:
+                        retry_after = wait if retry_after is None else min(retry_after, wait)
+                        break
+                    bucket.take(waiter.tokens)
+                queue.popleft()
+                ADMISSION_QUEUE_DEPTH.dec(priority=priority)
+                self._in_flight[priority] += 1
+                self._total_in_flight += 1
+                ADMISSION_IN_FLIGHT.inc(priority=priority)
+                ADMISSION_TOKENS.inc(waiter.tokens, priority=priority)
+                waiter.future.set_result(None)
+        self._schedule(retry_after)
+
+    def _schedule(self, delay: float | None):
+        """토큰 버킷이 찰 때까지 기다리는 호출이 있으면 그때 다시 승인을 시도합니다."""
+        if delay is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def stats(self) -> dict:
+        return {
+            priority: {"waiting": len(self._queues[priority]), "in_flight": self._in_flight[priority]}
+            for priority in PRIORITY_CLASSES
+        }
+
+def _parse_limits(raw: str) -> dict[str, ClassLimits]:
+    """'interactive=16/0,memory=4/60000' (등급=동시 호출 수/분당 토큰 수) 형식을 딕셔너리로 바꿉니다."""
+    limits = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, value = (part.strip() for part in item.split("=", 1))
+        if name not in PRIORITY_CLASSES:
+            raise ValueError(f"AI_ADMISSION_LIMITS에 알 수 없는 등급이 있습니다: {name}")
+        concurrency, _, tokens_per_minute = value.partition("/")
+        limits[name] = ClassLimits(int(concurrency), int(tokens_per_minute or 0))
+    return limits
+
+# 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
+admission = AdmissionController(
+    max_concurrency=settings.AI_MAX_CONCURRENT_CALLS,
+    reserved_for_interactive=settings.AI_INTERACTIVE_RESERVED_CALLS,
+    limits=_parse_limits(settings.AI_ADMISSION_LIMITS),
+)
@@ -0,0 +1,154 @@
+# app/services/ai_provider.py
+# ai_service가 사용하는 AI 제공자(STT, 임베딩, 대화/JSON 완성) 인터페이스와 구현
+#
+# AI_PROVIDER 설정으로 고릅니다.
+# - "openai": OpenAI API (클라이언트는 처음 호출할 때 만들므로 키 없이도 서버는 뜹니다.)
+# - "local":  네트워크 없이 결정적인 결과를 돌려주는 로컬 구현 (지연/실패 주입 가능)
+#             외부 호출 시간을 빼고 백엔드 자체의 처리 비용을 재거나 부하 테스트할 때 사용합니다.
+# 모든 메서드는 블로킹 함수이며, ai_service에서 asyncio.to_thread로 호출합니다.
+# timeout은 요청 하나의 제한 시간(초)으로, resilience 계층이 시도마다 남은 시간을 넘깁니다.
+
+import logging
+import random
+import threading
+import time
+
+from app.core.config import settings
+from . import local_ai
+
+logger = logging.getLogger(__name__)
+
+class ProviderError(RuntimeError):
+    """AI 제공자 호출 실패 (설정 누락, 로컬 구현의 실패 주입 등)"""
+
+class AIProvider:
+    """AI 제공자 인터페이스"""
+    name = "base"
+
+    def transcribe(self, audio_file_path: str, language: str = "ko", timeout: float | None = None) -> str:
+        raise NotImplementedError
+
+    def embed(self, text: str, model: str, timeout: float | None = None) -> list[float]:
+        raise NotImplementedError
+
+    def chat(self, messages: list[dict], model: str, max_tokens: int | None = None,
+             temperature: float | None = None, json_mode: bool = False, timeout: float | None = None) -> str:
+        """대화 완성 결과 문자열을 반환합니다. json_mode=True면 JSON 객체 문자열을 반환합니다."""
+        raise NotImplementedError
+
+class OpenAIProvider(AIProvider):
+    """OpenAI API 구현 (OPENAI_BASE_URL로 OpenAI 호환 서버를 지정할 수 있습니다.)"""
+    name = "openai"
+
+    def __init__(self, api_key: str | None, base_url: str | None = None):
+        self._api_key = api_key
+        self._base_url = base_url
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    if not self._api_key:
+                        raise ProviderError("OPENAI_API_KEY가 설정되지 않아 OpenAI를 호출할 수 없습니다.")
+                    import openai
+                    # 재시도와 호출별 제한 시간은 resilience 계층이 맡고, 요청마다 timeout으로 넘깁니다.
+                    # 클라이언트 제한 시간은 timeout 없이 호출했을 때의 상한입니다.
+                    self._client = openai.OpenAI(
+                        api_key=self._api_key, base_url=self._base_url,
+                        max_retries=0, timeout=settings.AI_REPORT_TIMEOUT_SECONDS,
+                    )
+        return self._client
+
+    @staticmethod
+    def _timeout_option(timeout: float | None) -> dict:
+        return {"timeout": timeout} if timeout is not None else {}
+
+    def transcribe(self, audio_file_path: str, language: str = "ko", timeout: float | None = None) -> str:
+        with open(audio_file_path, "rb") as audio_file:
+            return self.client.audio.transcriptions.create(
+                model="whisper-1", file=audio_file, language=language, **self._timeout_option(timeout)).text
+
+    def embed(self, text: str, model: str, timeout: float | None = None) -> list[float]:
+        return self.client.embeddings.create(input=text, model=model, **self._timeout_option(timeout)).data[0].embedding
+
+    def chat(self, messages: list[dict], model: str, max_tokens: int | None = None,
+             temperature: float | None = None, json_mode: bool = False, timeout: float | None = None) -> str:
+        options = self._timeout_option(timeout)
+        if max_tokens is not None:
+            options["max_tokens"] = max_tokens
+        if temperature is not None:
+            options["temperature"] = temperature
+        if json_mode:
+            options["response_format"] = {"type": "json_object"}
+        response = self.client.chat.completions.create(model=model, messages=messages, **options)
+        return response.choices[0].message.content
+
+class LocalAIProvider(AIProvider):
+    """
+    결정적인 로컬 구현. 같은 입력이면 항상 같은 결과를 돌려줍니다. (내용은 local_ai 모듈 참고)
+    latency_ms: 호출 종류('transcription', 'embedding', 'chat')별 평균 지연(ms), jitter: 지연 변동 폭 비율
+    failure_rate: ProviderError를 일으킬 호출 비율
+    """
+    name = "local"
+
+    def __init__(self, latency_ms: dict[str, float] | None = None, jitter: float = 0.0,
+                 failure_rate: float = 0.0, seed: int | None = None):
+        self.latency_ms = latency_ms or {}
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _simulate(self, operation: str, timeout: float | None = None):
+        with self._rng_lock:
+            variation = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+            failed = self.failure_rate > 0 and self._rng.random() < self.failure_rate
+        delay = self.latency_ms.get(operation, 0.0) / 1000 * (1 + variation)
+        if timeout is not None and delay > timeout:
+            # 실제 클라이언트처럼 제한 시간에 요청을 포기합니다. (스레드를 지연만큼 붙잡지 않음)
+            time.sleep(timeout)
+            raise TimeoutError(f"로컬 AI 제공자 제한 시간 초과 ({operation}, {timeout:.1f}초)")
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            raise ProviderError(f"로컬 AI 제공자 실패 주입 ({operation})")
+
+    def transcribe(self, audio_file_path: str, language: str = "ko", timeout: float | None = None) -> str:
+        with open(audio_file_path, "rb") as audio_file:
+            data = audio_file.read()
+        self._simulate("transcription", timeout)
+        return local_ai.transcribe(data)
+
+    def embed(self, text: str, model: str, timeout: float | None = None) -> list[float]:
+        self._simulate("embedding", timeout)
+        return local_ai.embedding(text)
+
+    def chat(self, messages: list[dict], model: str, max_tokens: int | None = None,
+             temperature: float | None = None, json_mode: bool = False, timeout: float | None = None) -> str:
+        self._simulate("chat", timeout)
+        return local_ai.completion(messages, json_mode=json_mode)
+
+def create_provider() -> AIProvider:
+    """설정(AI_PROVIDER)에 맞는 제공자를 만듭니다."""
+    if settings.AI_PROVIDER == "local":
+        logger.info("로컬 AI 제공자를 사용합니다. (결정적 응답, 외부 호출 없음)")
+        return LocalAIProvider(
+            latency_ms={
+                "transcription": settings.LOCAL_AI_STT_LATENCY_MS,
+                "embedding": settings.LOCAL_AI_EMBEDDING_LATENCY_MS,
+                "chat": settings.LOCAL_AI_CHAT_LATENCY_MS,
+            },
+            jitter=settings.LOCAL_AI_LATENCY_JITTER,
+            failure_rate=settings.LOCAL_AI_FAILURE_RATE,
+        )
+    if settings.AI_PROVIDER != "openai":
+        raise ValueError(f"알 수 없는 AI_PROVIDER입니다: {settings.AI_PROVIDER}")
+    if not settings.OPENAI_API_KEY:
+        logger.warning("OPENAI_API_KEY가 없습니다. AI 기능을 호출하면 오류가 발생합니다.")
+    return OpenAIProvider(settings.OPENAI_API_KEY, settings.OPENAI_BASE_URL)
+
+# 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
+provider = create_provider()
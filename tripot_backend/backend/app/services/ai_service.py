@@ -1,42 +1,59 @@
 # app/services/ai_service.py
 
-import openai
 import asyncio
 import json
+import math
 import os
-import base64
-import tempfile
-import traceback
+import hashlib
+import logging
+import time
 
+from app.core import metrics, resilience
 from app.core.config import settings
-from . import vector_db_service
+from . import report_merge, token_budget, vector_db_service
+from .ai_admission import admission, INTERACTIVE, GRADING, BATCH
+from .ai_provider import provider
+from .response_cache import response_cache
 
-# OpenAI 클라이언트 초기화
-client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+logger = logging.getLogger(__name__)
+
+# STT/임베딩/대화 호출은 모두 AI 제공자(AI_PROVIDER 설정)를 거치며,
+# 호출 전에 우선순위 등급(ai_admission)별 승인을 받아 실시간 대화가 배치 작업보다 먼저 처리되게 합니다.
+# 호출 자체는 resilience 계층이 제한 시간, 재시도, 헤지를 적용합니다. (대화 완성은 비용이 커서 헤지하지 않습니다.)
+EMBEDDING_MODEL = "text-embedding-3-small"
+REPORT_OUTPUT_TOKEN_ESTIMATE = 1500  # max_tokens 없이 호출하는 리포트 응답의 토큰 수 추정치
 
 # --- 1. Core AI Utilities ---
 
-async def get_embedding(text: str) -> list[float]:
+def _estimate_tokens(messages: list[dict], max_tokens: int | None) -> int:
+    """승인 제어의 분당 토큰 제한에 쓰는 호출 한 번의 토큰 수 추정치 (입력 + 최대 출력)"""
+    return sum(token_budget.count_tokens(message["content"]) for message in messages) + (max_tokens or 0)
+
+async def get_embedding(text: str, priority: str = INTERACTIVE) -> list[float]:
     """텍스트를 받아 임베딩 벡터를 반환합니다."""
-    response = await asyncio.to_thread(
-        client.embeddings.create, input=text, model="text-embedding-3-small"
-    )
-    return response.data[0].embedding
+    async with admission.slot(priority, token_budget.count_tokens(text)):
+        return await resilience.call(
+            provider.embed, text, EMBEDDING_MODEL, service=provider.name, operation="embedding",
+            timeout=settings.AI_EMBEDDING_TIMEOUT_SECONDS, retries=settings.EXTERNAL_CALL_MAX_RETRIES,
+            hedge=settings.HEDGE_REQUESTS_ENABLED, timeout_arg="timeout",
+        )
 
 async def get_transcript_from_audio(audio_file_path: str) -> str:
     """오디오 파일 경로를 받아 STT(Speech-to-Text) 결과를 반환합니다."""
-    with open(audio_file_path, "rb") as audio_file:
-        transcript_response = await asyncio.to_thread(
-            client.audio.transcriptions.create, model="whisper-1", file=audio_file, language="ko"
+    async with admission.slot(INTERACTIVE):
+        return await resilience.call(
+            provider.transcribe, audio_file_path, "ko", service=provider.name, operation="transcription",
+            timeout=settings.AI_STT_TIMEOUT_SECONDS, retries=settings.EXTERNAL_CALL_MAX_RETRIES,
+            hedge=settings.HEDGE_REQUESTS_ENABLED, timeout_arg="timeout",
         )
-    return transcript_response.text
 
 async def get_ai_chat_completion(
     prompt: str = None, 
     messages: list[dict] = None, 
     model: str = "gpt-4o", 
     max_tokens: int = 150, 
-    temperature: float = 0.7
+    temperature: float = 0.7,
+    priority: str = INTERACTIVE,
 ) -> str:
     """주어진 프롬프트나 메시지 리스트에 대한 AI 챗봇의 응답을 반환합니다."""
     if messages is None:
@@ -46,11 +63,12 @@ async def get_ai_chat_completion(
             {"role": "system", "content": "당신은 주어진 규칙과 페르소나를 완벽하게 따르는 AI 어시스턴트입니다."},
             {"role": "user", "content": prompt}
         ]
-    chat_response = await asyncio.to_thread(
-        client.chat.completions.create,
-        model=model, messages=messages, max_tokens=max_tokens, temperature=temperature
-    )
-    return chat_response.choices[0].message.content
+    async with admission.slot(priority, _estimate_tokens(messages, max_tokens)):
+        return await resilience.call(
+            provider.chat, messages, model=model, max_tokens=max_tokens, temperature=temperature,
+            service=provider.name, operation="chat", timeout=settings.AI_CHAT_TIMEOUT_SECONDS, retries=1,
+            timeout_arg="timeout",
+        )
 
 # --- 2. Main Conversation Logic ---
 
@@ -59,45 +77,94 @@ def _load_prompt_config(filename: str, key: str):
     prompt_file_path = os.path.join(settings.PROMPTS_DIR, filename)
     try:
         with open(prompt_file_path, 'r', encoding='utf-8') as f:
-            print(f"✅ 프롬프트 로드 성공: {prompt_file_path}")
+            logger.info(f"프롬프트 로드 성공: {prompt_file_path}")
             return json.load(f).get(key)
     except Exception as e:
-        print(f"❌ 프롬프트 로드 실패 ({prompt_file_path}): {e}")
+        logger.error(f"프롬프트 로드 실패 ({prompt_file_path}): {e}")
         return None
 
 PROMPTS_CONFIG = _load_prompt_config('talk_prompts.json', 'main_chat_prompt')
 
-async def process_user_audio(user_id: str, audio_base64: str) -> tuple[str | None, str]:
-    """사용자의 음성 데이터를 처리하고 AI의 일반 대화 응답을 생성합니다."""
-    try:
-        audio_data = base64.b64decode(audio_base64)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
-            temp_audio.write(audio_data)
-            temp_audio_path = temp_audio.name
+CHAT_MODEL = "gpt-4o"
+
+def _prompt_version(config) -> str:
+    """프롬프트 설정과 모델이 바뀌면 달라지는 버전 문자열 (응답 캐시 키에 사용)"""
+    raw = json.dumps({"provider": provider.name, "model": CHAT_MODEL, "prompt": config}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+CHAT_PROMPT_VERSION = _prompt_version(PROMPTS_CONFIG)
 
+def _build_chat_prompt(user_message: str, relevant_memories: list[str]) -> str:
+    """
+    대화 프롬프트를 조립합니다. 입력 예산(CHAT_PROMPT_TOKEN_BUDGET)을 넘으면
+    대화 예시를 먼저, 그다음 관련도가 낮은 기억부터 덜어 냅니다.
+    """
+    sections = token_budget.fit_sections([
+        token_budget.PromptSection("persona", PROMPTS_CONFIG['system_message_base'], required=True),
+        token_budget.PromptSection("rules", [
+            "# 핵심 대화 규칙", *PROMPTS_CONFIG['core_conversation_rules'],
+            "# 응답 가이드라인", *PROMPTS_CONFIG['guidelines_and_reactions'],
+            "# 절대 금지사항", *PROMPTS_CONFIG['strict_prohibitions'],
+        ], required=True),
+        token_budget.PromptSection(
+            "examples",
+            [f"상황: {ex['situation']}\n사용자 입력: {ex['user_input']}\nAI 응답: {ex['ai_response']}" for ex in PROMPTS_CONFIG['examples']],
+            priority=2, separator="\n\n",
+        ),
+        token_budget.PromptSection("memories", list(relevant_memories), priority=1),
+        token_budget.PromptSection("user_message", [user_message], required=True),
+    ], budget=settings.CHAT_PROMPT_TOKEN_BUDGET, label="chat")
+
+    memories_text = sections["memories"] or "이전 대화 기록이 없습니다."
+    return (
+        f"# 페르소나\n{sections['persona']}\n{sections['rules']}\n"
+        f"# 성공적인 대화 예시\n{sections['examples']}\n---\n이제 실제 대화를 시작합니다.\n"
+        f"--- 과거 대화 핵심 기억 ---\n{memories_text}\n--------------------\n"
+        f"현재 사용자 메시지: \"{sections['user_message']}\"\nAI 답변:"
+    )
+
+async def generate_chat_response(user_id: str, user_message: str) -> str:
+    """
+    STT가 끝난 사용자 발화에 대한 일반 대화 응답을 생성합니다.
+    짧은 발화는 응답 캐시(켜져 있을 때)를 먼저 확인하고, 임베딩은 기억 검색과 함께 한 번만 계산합니다.
+    임베딩이나 기억 검색이 실패하면 사과 메시지 대신 기억 없이 응답합니다.
+    """
+    if not PROMPTS_CONFIG:
+        return "대화 프롬프트 설정 파일을 불러올 수 없습니다."
+
+    query_embedding = None
+    cacheable = response_cache.is_cacheable(user_message)
+    if cacheable or vector_db_service.memory_search_available():
+        # 임베딩은 캐시 조회와 기억 검색에서 함께 쓰도록 한 번만 계산합니다.
         try:
-            user_message = await get_transcript_from_audio(temp_audio_path)
-            if not user_message.strip() or "시청해주셔서 감사합니다" in user_message:
-                return None, "음, 잘 알아듣지 못했어요. 혹시 다시 한번 말씀해주시겠어요?"
-
-            relevant_memories = await vector_db_service.search_memories(user_id, user_message)
-
-            if not PROMPTS_CONFIG:
-                return user_message, "대화 프롬프트 설정 파일을 불러올 수 없습니다."
-
-            system_message = "\n".join(PROMPTS_CONFIG['system_message_base'])
-            examples_text = "\n\n".join([f"상황: {ex['situation']}\n사용자 입력: {ex['user_input']}\nAI 응답: {ex['ai_response']}" for ex in PROMPTS_CONFIG['examples']])
-            
-            final_prompt = f"""# 페르소나\n{system_message}\n# 핵심 대화 규칙\n{"\n".join(PROMPTS_CONFIG['core_conversation_rules'])}\n# 응답 가이드라인\n{"\n".join(PROMPTS_CONFIG['guidelines_and_reactions'])}\n# 절대 금지사항\n{"\n".join(PROMPTS_CONFIG['strict_prohibitions'])}\n# 성공적인 대화 예시\n{examples_text}\n---\n이제 실제 대화를 시작합니다.\n--- 과거 대화 핵심 기억 ---\n{relevant_memories if relevant_memories else "이전 대화 기록이 없습니다."}\n--------------------\n현재 사용자 메시지: "{user_message}"\nAI 답변:"""
-            
-            ai_response = await get_ai_chat_completion(prompt=final_prompt)
-            return user_message, ai_response
-        finally:
-            os.unlink(temp_audio_path)
-            
-    except Exception as e:
-        print(f"❌ AI 서비스 전체 오류: {str(e)}\n{traceback.format_exc()}")
-        return None, "죄송합니다. 음성 처리 중 문제가 발생했어요."
+            with metrics.stage_timer("embedding"):
+                query_embedding = await get_embedding(user_message)
+        except Exception as e:
+            logger.warning(f"[{user_id}] 임베딩 실패, 캐시와 기억 검색 없이 응답합니다: {e!r}")
+            cacheable = False
+    if cacheable:
+        cached_response = response_cache.lookup(user_id, query_embedding, CHAT_PROMPT_VERSION)
+        if cached_response:
+            logger.debug(f"[{user_id}] 응답 캐시 적중: \"{user_message}\"")
+            return cached_response
+
+    started = time.perf_counter()
+    relevant_memories = []
+    if query_embedding is not None:
+        with metrics.stage_timer("vector_query"):
+            relevant_memories = await vector_db_service.search_memories(user_id, user_message, query_embedding=query_embedding)
+    final_prompt = _build_chat_prompt(user_message, relevant_memories)
+
+    with metrics.stage_timer("llm"):
+        ai_response = await get_ai_chat_completion(prompt=final_prompt, model=CHAT_MODEL)
+
+    if cacheable:
+        # 기억이 반영된 응답은 해당 사용자에게만, 아니면 모든 사용자가 공유합니다.
+        response_cache.store(
+            user_id if relevant_memories else None, query_embedding, ai_response,
+            CHAT_PROMPT_VERSION, time.perf_counter() - started
+        )
+    return ai_response
 
 # --- 3. Quiz & Command Logic ---
 
@@ -122,12 +189,14 @@ async def get_quiz_feedback(question: str, user_answer: str, correct_answer: str
         {"role": "user", "content": f"문제: {question}\n어르신 답변: {user_answer}\n정답: {correct_answer}"}
     ]
     try:
-        raw_llm_response = await get_ai_chat_completion(messages=prompt_messages, max_tokens=100, temperature=0.5)
+        raw_llm_response = await get_ai_chat_completion(
+            messages=prompt_messages, max_tokens=100, temperature=0.5, priority=GRADING
+        )
         is_correct = "TRUE" in raw_llm_response.upper()
         feedback_text = raw_llm_response.upper().replace("TRUE", "").replace("FALSE", "").strip()
         return feedback_text, is_correct
     except Exception as e:
-        print(f"❌ LLM 퀴즈 피드백 생성 오류: {e}")
+        logger.error(f"LLM 퀴즈 피드백 생성 오류: {e}")
         if str(correct_answer).lower() in str(user_answer).lower():
             return "정답이에요! 정말 대단하세요!", True
         else:
@@ -135,29 +204,96 @@ async def get_quiz_feedback(question: str, user_answer: str, correct_answer: str
 
 # --- 4. Report Generation Logic ---
 
-def generate_summary_report(conversation_text: str) -> dict | None:
-    """대화 내용을 분석하여 JSON 형식의 리포트를 생성합니다."""
-    report_prompt_template = _load_prompt_config('report_prompts.json', 'report_analysis_prompt')
-    if not conversation_text or not report_prompt_template:
-        return None
+def _split_turns(lines: list[str]) -> list[list[str]]:
+    """대화 줄을 턴(어르신 발화 + 이어지는 AI 발화) 단위로 묶습니다."""
+    turns: list[list[str]] = []
+    for line in lines:
+        if not turns or line.startswith("사용자:"):
+            turns.append([line])
+        else:
+            turns[-1].append(line)
+    return turns
 
+def _chunk_transcript(lines: list[str]) -> list[list[str]]:
+    """
+    대화를 턴 경계에서 REPORT_CHUNK_TOKEN_BUDGET 안팎의 조각으로 나눕니다.
+    조각 수는 REPORT_MAX_CHUNKS를 넘지 않도록 하여, 대화가 아무리 길어도 분석 시간이 일정 범위 안에 머물게 합니다.
+    """
+    turns = _split_turns(lines)
+    turn_tokens = [token_budget.count_tokens("\n".join(turn)) + 1 for turn in turns]
+    total = sum(turn_tokens)
+    if total <= settings.REPORT_CHUNK_TOKEN_BUDGET:
+        return [lines]
+    chunk_count = min(settings.REPORT_MAX_CHUNKS, math.ceil(total / settings.REPORT_CHUNK_TOKEN_BUDGET))
+    target = total / chunk_count
+
+    chunks: list[list[str]] = [[]]
+    used = 0
+    for turn, tokens in zip(turns, turn_tokens):
+        if chunks[-1] and used + tokens > target and len(chunks) < chunk_count:
+            chunks.append([])
+            used = 0
+        chunks[-1].extend(turn)
+        used += tokens
+    return chunks
+
+async def _analyze_transcript(lines: list[str], report_prompt_template: dict, label: str) -> dict | None:
+    """대화 한 덩어리를 한 번의 호출로 분석합니다."""
     persona = report_prompt_template.get('persona', '당신은 전문 대화 분석 AI입니다.')
     instructions = "\n".join(report_prompt_template.get('instructions', []))
     output_format_example = json.dumps(report_prompt_template.get('OUTPUT_FORMAT', {}), ensure_ascii=False, indent=2)
 
     system_prompt = f"{persona}\n\n### 지시사항\n{instructions}\n\n### 출력 형식\n모든 결과는 아래와 같은 JSON 형식으로만 출력해야 합니다. JSON 외의 텍스트는 절대 포함하지 마세요.\n{output_format_example}"
-    user_prompt = f"### 분석할 대화 전문\n---\n{conversation_text}\n---"
+
+    # 하루 대화가 입력 예산을 넘으면 AI 발화를 먼저 줄이고, 그래도 넘치면 앞선 대화부터 생략합니다.
+    sections = token_budget.fit_sections([
+        token_budget.PromptSection("system", [system_prompt], required=True),
+        token_budget.PromptSection(
+            "conversation", list(lines), priority=1, keep="tail",
+            omitted_marker="(앞선 대화 {count}줄 생략)", compress=token_budget.compress_ai_turns,
+        ),
+    ], budget=settings.REPORT_PROMPT_TOKEN_BUDGET, label=label)
+    user_prompt = f"### 분석할 대화 전문\n---\n{sections['conversation']}\n---"
     
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o",
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-        )
-        return json.loads(completion.choices[0].message.content)
+        async with admission.slot(BATCH, _estimate_tokens(messages, REPORT_OUTPUT_TOKEN_ESTIMATE)):
+            content = await resilience.call(
+                provider.chat, messages, model="gpt-4o", json_mode=True, service=provider.name, operation="report",
+                timeout=settings.AI_REPORT_TIMEOUT_SECONDS, retries=settings.EXTERNAL_CALL_MAX_RETRIES,
+                timeout_arg="timeout",
+            )
+        report = json.loads(content)
+        return report if isinstance(report, dict) else None
     except Exception as e:
-        print(f"AI 리포트 생성 중 오류 발생: {e}")
-        return None
\ No newline at end of file
+        logger.error(f"AI 리포트 생성 중 오류 발생 ({label}): {e}")
+        return None
+
+async def generate_summary_report(conversation_text: str) -> dict | None:
+    """
+    대화 내용을 분석하여 JSON 형식의 리포트를 생성합니다. (batch 등급으로 실시간 대화보다 뒤에 처리)
+    긴 대화는 턴 단위 조각으로 나눠 동시에 분석(map)하고, 부분 리포트를 규칙대로 합칩니다(reduce).
+    일부 조각만 실패하면 나머지로 리포트를 만듭니다.
+    """
+    report_prompt_template = _load_prompt_config('report_prompts.json', 'report_analysis_prompt')
+    if not conversation_text or not report_prompt_template:
+        return None
+
+    chunks = _chunk_transcript(conversation_text.split("\n"))
+    if len(chunks) == 1:
+        return await _analyze_transcript(chunks[0], report_prompt_template, "report")
+
+    logger.info(f"긴 대화를 {len(chunks)}개 조각으로 나눠 분석합니다. (대화 {sum(map(len, chunks))}줄)")
+    results = await asyncio.gather(*(
+        _analyze_transcript(chunk, report_prompt_template, f"report_chunk_{i + 1}/{len(chunks)}")
+        for i, chunk in enumerate(chunks)
+    ))
+    partials = [(report, len(chunk)) for report, chunk in zip(results, chunks) if report]
+    if not partials:
+        return None
+    if len(partials) < len(chunks):
+        logger.warning(f"리포트 조각 {len(chunks)}개 중 {len(chunks) - len(partials)}개 분석 실패, 나머지로 합칩니다.")
+    return report_merge.merge_fragments([r for r, _ in partials], [n for _, n in partials])
\ No newline at end of file
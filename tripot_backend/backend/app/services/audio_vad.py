@@ -0,0 +1,210 @@
+# app/services/audio_vad.py
+# STT 전에 PCM WAV의 무음을 잘라 내고, 말소리가 없는 녹음은 걸러 내는 음성 구간 검출(VAD)
+#
+# - 30ms 프레임의 에너지(dBFS)를 구하고, 녹음마다 배경 소음 수준(하위 10% 에너지)보다
+#   VAD_THRESHOLD_DB 이상 큰 프레임을 말소리로 봅니다. (TV 소리처럼 꾸준한 배경음은 소음 수준에 포함됩니다.)
+#   말소리에 이어지는 프레임은 더 낮은 기준(VAD_CONTINUATION_DB)으로 판단합니다. (히스테리시스)
+# - 말소리 앞뒤로 VAD_PADDING_SECONDS만큼 여유를 두고 앞뒤 무음을 자르며,
+#   문장 사이의 긴 쉼은 VAD_MAX_PAUSE_SECONDS로 줄입니다. 낮은 기준을 넘는 프레임은 쉼으로 보지 않으므로
+#   작게 말한 부분은 가운데에서 잘리지 않습니다.
+# - 말소리가 VAD_MIN_SPEECH_SECONDS보다 짧으면 STT를 호출하지 않습니다. (Whisper가 무음에서 만들어 내는
+#   "시청해주셔서 감사합니다" 같은 환각을 막습니다.)
+# - 원본의 샘플 형식과 fmt 외 청크(LIST 등)는 그대로 유지합니다. WAV가 아니면 판단하지 않고 그대로 넘깁니다.
+
+import logging
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FRAME_SECONDS = 0.03
+SILENCE_DBFS = -50.0          # 이보다 작은 프레임은 소음 수준과 무관하게 무음으로 봅니다.
+FLAT_DYNAMIC_RANGE_DB = 10.0  # 프레임 에너지 분포가 이보다 좁으면 전체가 말소리이거나 전체가 무음입니다.
+
+TRIMMED = "trimmed"
+UNCHANGED = "unchanged"
+REJECTED_SILENT = "rejected_silent"
+REJECTED_SHORT = "rejected_short"
+UNSUPPORTED = "unsupported"
+
+VAD_CLIPS = metrics.registry.counter(
+    "tripot_vad_clips_total", "VAD를 거친 음성 수 (outcome: trimmed, unchanged, rejected_*, unsupported)", ["outcome"])
+VAD_INPUT_SECONDS = metrics.registry.counter(
+    "tripot_vad_input_audio_seconds_total", "VAD에 들어온 음성 길이 합계(초)")
+VAD_REMOVED_SECONDS = metrics.registry.counter(
+    "tripot_vad_removed_audio_seconds_total", "VAD가 잘라 내거나 거른 음성 길이 합계(초)")
+
+@dataclass
+class VadResult:
+    outcome: str
+    audio: bytes | None        # STT에 보낼 음성 (거른 경우 None)
+    input_seconds: float = 0.0
+    output_seconds: float = 0.0
+    speech_seconds: float = 0.0
+
+    @property
+    def rejected(self) -> bool:
+        return self.audio is None
+
+@dataclass
+class _Wav:
+    fmt_chunk: bytes            # 'fmt ' 청크 전체 (헤더 포함)
+    format_tag: int
+    channels: int
+    sample_rate: int
+    sample_width: int
+    data: bytes
+    extra_chunks: list[bytes]   # data 외의 나머지 청크 (원래 순서)
+
+def _parse_wav(data: bytes) -> _Wav | None:
+    """RIFF/WAVE를 청크 단위로 읽습니다. 지원하지 않는 형식이면 None"""
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    fmt = pcm = None
+    extra = []
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, offset)
+        end = offset + 8 + size
+        if chunk_id == b"fmt ":
+            fmt = data[offset:end]
+        elif chunk_id == b"data":
+            pcm = data[offset + 8:end]
+        else:
+            extra.append(data[offset:end + (size & 1)])
+        offset = end + (size & 1)
+    if fmt is None or pcm is None or len(fmt) < 24:
+        return None
+
+    format_tag, channels, sample_rate, _, block_align, bits = struct.unpack_from("<HHIIHH", fmt, 8)
+    if format_tag == 0xFFFE and len(fmt) >= 8 + 26:
+        format_tag = struct.unpack_from("<H", fmt, 8 + 24)[0]  # WAVE_FORMAT_EXTENSIBLE의 실제 형식
+    sample_width = bits // 8
+    # 정수 PCM(1)은 8/16/24/32비트, 부동소수점(3)은 32/64비트만 지원합니다.
+    supported_widths = {1: (1, 2, 3, 4), 3: (4, 8)}.get(format_tag, ())
+    if sample_width not in supported_widths or channels < 1 or sample_rate <= 0 \
+            or block_align != channels * sample_width:
+        return None
+    usable = len(pcm) - len(pcm) % block_align
+    return _Wav(fmt, format_tag, channels, sample_rate, sample_width, pcm[:usable], extra)
+
+def _to_mono_float(wav: _Wav) -> np.ndarray:
+    """샘플을 [-1, 1] 범위의 모노 float32로 바꿉니다."""
+    raw = np.frombuffer(wav.data, dtype=np.uint8)
+    if wav.format_tag == 3:
+        samples = raw.view("<f4" if wav.sample_width == 4 else "<f8").astype(np.float32)
+    elif wav.sample_width == 1:
+        samples = (raw.astype(np.float32) - 128) / 128
+    elif wav.sample_width == 2:
+        samples = raw.view("<i2").astype(np.float32) / 32768
+    elif wav.sample_width == 3:
+        triplets = raw.reshape(-1, 3).astype(np.int32)
+        values = triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+        samples = (np.where(values >= 1 << 23, values - (1 << 24), values)).astype(np.float32) / (1 << 23)
+    else:
+        samples = raw.view("<i4").astype(np.float32) / (1 << 31)
+    return samples.reshape(-1, wav.channels).mean(axis=1)
+
+def _frame_energy_db(mono: np.ndarray, frame_length: int) -> np.ndarray:
+    frames = mono[: len(mono) // frame_length * frame_length].reshape(-1, frame_length)
+    return 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+
+def _extend_runs(speech: np.ndarray, active: np.ndarray) -> np.ndarray:
+    """낮은 기준을 넘는 프레임이 이어진 구간 중 말소리 프레임을 포함한 구간 전체를 말소리로 봅니다."""
+    active = active | speech
+    run_ids = np.cumsum(np.diff(np.concatenate([[0], active.astype(np.int8)])) == 1) * active
+    voiced_runs = np.zeros(run_ids.max() + 1, dtype=bool)
+    voiced_runs[run_ids[speech]] = True
+    voiced_runs[0] = False
+    return voiced_runs[run_ids]
+
+def _keep_mask(speech: np.ndarray, active: np.ndarray, padding_frames: int, max_pause_frames: int) -> np.ndarray:
+    """
+    말소리 프레임 앞뒤로 여유를 두고, 앞뒤 무음은 버리고, 긴 쉼은 max_pause_frames로 줄인 프레임 마스크.
+    active는 낮은 기준(VAD_CONTINUATION_DB)을 넘는 프레임으로, 말소리에 이어지면 앞뒤를 자르지 않고
+    가운데에서는 쉼으로 보지 않습니다.
+    """
+    window = np.ones(2 * padding_frames + 1, dtype=np.int32)
+    voiced = np.convolve(_extend_runs(speech, active).astype(np.int32), window, mode="same") > 0
+    indices = np.flatnonzero(voiced)
+    first, last = indices[0], indices[-1]
+    keep = voiced | (np.convolve(active.astype(np.int32), window, mode="same") > 0)
+    keep[:first] = False
+    keep[last + 1:] = False
+    # 가운데 쉼은 max_pause_frames까지만 남깁니다.
+    gap_start = None
+    for i in range(first, last + 1):
+        if not keep[i] and gap_start is None:
+            gap_start = i
+        elif keep[i] and gap_start is not None:
+            keep[gap_start:min(i, gap_start + max_pause_frames)] = True
+            gap_start = None
+    return keep
+
+def _build_wav(wav: _Wav, pcm: bytes) -> bytes:
+    pad = b"\x00" if len(pcm) & 1 else b""
+    body = b"WAVE" + wav.fmt_chunk + (b"\x00" if len(wav.fmt_chunk) & 1 else b"") \
+        + struct.pack("<4sI", b"data", len(pcm)) + pcm + pad + b"".join(wav.extra_chunks)
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+def _result(outcome: str, audio: bytes | None, input_seconds: float, output_seconds: float,
+            speech_seconds: float) -> VadResult:
+    VAD_CLIPS.inc(outcome=outcome)
+    VAD_INPUT_SECONDS.inc(input_seconds)
+    VAD_REMOVED_SECONDS.inc(max(0.0, input_seconds - output_seconds))
+    return VadResult(outcome, audio, input_seconds, output_seconds, speech_seconds)
+
+def process(audio: bytes) -> VadResult:
+    """
+    음성 파일 내용을 받아 무음을 잘라 낸 음성을 돌려줍니다. (CPU 작업이므로 asyncio.to_thread로 호출합니다.)
+    말소리가 없거나 너무 짧으면 audio가 None인 결과를 돌려줍니다.
+    """
+    wav = _parse_wav(audio)
+    if wav is None:
+        VAD_CLIPS.inc(outcome=UNSUPPORTED)
+        return VadResult(UNSUPPORTED, audio)
+
+    block_align = wav.channels * wav.sample_width
+    total_samples = len(wav.data) // block_align
+    input_seconds = total_samples / wav.sample_rate
+    frame_length = max(1, int(wav.sample_rate * FRAME_SECONDS))
+    frame_seconds = frame_length / wav.sample_rate
+    if total_samples < frame_length:
+        return _result(REJECTED_SHORT, None, input_seconds, 0.0, 0.0)
+
+    energy = _frame_energy_db(_to_mono_float(wav), frame_length)
+    # 말소리가 녹음의 일부뿐이어도 잡히도록 상위 2% 프레임을 큰 소리 기준으로 씁니다.
+    noise_floor, loud = np.percentile(energy, 10), np.percentile(energy, 98)
+    if loud < SILENCE_DBFS:
+        return _result(REJECTED_SILENT, None, input_seconds, 0.0, 0.0)
+    if loud - noise_floor < FLAT_DYNAMIC_RANGE_DB:
+        # 전체가 고르게 큰 소리입니다. (쉼 없이 말한 짧은 녹음) 자를 곳이 없으므로 그대로 보냅니다.
+        return _result(UNCHANGED, audio, input_seconds, input_seconds, input_seconds)
+
+    speech = energy > max(SILENCE_DBFS, noise_floor + settings.VAD_THRESHOLD_DB)
+    active = energy > max(SILENCE_DBFS, noise_floor + settings.VAD_CONTINUATION_DB)
+    speech_seconds = float(speech.sum()) * frame_seconds
+    if speech_seconds < settings.VAD_MIN_SPEECH_SECONDS:
+        return _result(REJECTED_SHORT, None, input_seconds, 0.0, speech_seconds)
+
+    keep = _keep_mask(
+        speech, active,
+        padding_frames=max(1, round(settings.VAD_PADDING_SECONDS / frame_seconds)),
+        max_pause_frames=max(1, round(settings.VAD_MAX_PAUSE_SECONDS / frame_seconds)),
+    )
+    # 마지막 자투리 샘플(프레임 하나가 안 되는 부분)은 마지막 프레임을 따릅니다.
+    sample_mask = np.repeat(keep, frame_length)
+    sample_mask = np.concatenate([sample_mask, np.full(total_samples - sample_mask.size, keep[-1])])
+    kept_samples = int(sample_mask.sum())
+    if kept_samples == total_samples:
+        return _result(UNCHANGED, audio, input_seconds, input_seconds, speech_seconds)
+
+    blocks = np.frombuffer(wav.data, dtype=np.uint8).reshape(-1, block_align)
+    output_seconds = kept_samples / wav.sample_rate
+    logger.debug(f"VAD: {input_seconds:.2f}초 중 {output_seconds:.2f}초를 남겼습니다. (말소리 {speech_seconds:.2f}초)")
+    return _result(TRIMMED, _build_wav(wav, blocks[sample_mask].tobytes()), input_seconds, output_seconds, speech_seconds)
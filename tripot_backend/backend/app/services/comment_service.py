@@ -1,7 +1,10 @@
+import logging
 from sqlalchemy.orm import Session
 from app.db import models
 from fastapi import HTTPException
 
+logger = logging.getLogger(__name__)
+
 class CommentService:
     @staticmethod
     def create_comment(db: Session, photo_id: int, user_id: int, author_name: str, comment_text: str) -> models.PhotoComment:
@@ -22,7 +25,7 @@ class CommentService:
         db.add(db_comment)
         db.commit()
         db.refresh(db_comment)
-        print(f"✅ 댓글 DB 저장 완료: comment_id={db_comment.id} on photo_id={photo_id}")
+        logger.info(f"댓글 DB 저장 완료: comment_id={db_comment.id} on photo_id={photo_id}")
         return db_comment
 
     @staticmethod
@@ -36,7 +39,7 @@ class CommentService:
             raise HTTPException(status_code=404, detail="사진을 찾을 수 없습니다.")
         
         comments = db.query(models.PhotoComment).filter(models.PhotoComment.photo_id == photo_id).order_by(models.PhotoComment.created_at.asc()).all()
-        print(f"✅ photo_id={photo_id}의 댓글 {len(comments)}개 조회 완료")
+        logger.info(f"photo_id={photo_id}의 댓글 {len(comments)}개 조회 완료")
         return comments
 
     @staticmethod
@@ -58,7 +61,7 @@ class CommentService:
         db_comment.comment_text = new_comment_text
         db.commit()
         db.refresh(db_comment)
-        print(f"✅ 댓글 수정 완료: comment_id={comment_id}")
+        logger.info(f"댓글 수정 완료: comment_id={comment_id}")
         return db_comment
 
     @staticmethod
@@ -79,5 +82,5 @@ class CommentService:
         # 댓글 삭제
         db.delete(db_comment)
         db.commit()
-        print(f"✅ 댓글 삭제 완료: comment_id={comment_id}")
+        logger.info(f"댓글 삭제 완료: comment_id={comment_id}")
         return True
\ No newline at end of file
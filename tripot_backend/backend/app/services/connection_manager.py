@@ -1,26 +1,437 @@
 # app/services/connection_manager.py
 # 웹소켓 연결을 중앙에서 관리하는 독립 모듈
 
+import asyncio
+import logging
 import json
-from fastapi import WebSocket
+import time
+from collections import deque
+from datetime import datetime
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# --- 오프라인 사용자용 보류 알림 설정 ---
+# 연결되어 있지 않은 사용자에게 보낸 알림 중 아래 타입만 보관하며, 값은 보관 시간(초)입니다.
+PENDING_NOTIFICATION_TTLS = {
+    "scheduled_call": 30 * 60,        # 정시 대화 알림은 30분이 지나면 의미가 없습니다.
+    "calendar_update": 24 * 60 * 60,
+    "schedule_update": 24 * 60 * 60,
+}
+# 같은 타입은 최신 알림 하나만 의미가 있으므로 기존 알림을 대체합니다.
+COALESCED_NOTIFICATION_TYPES = {"calendar_update", "schedule_update"}
+MAX_PENDING_NOTIFICATIONS_PER_USER = 20
+
+# --- 연결별 전송 큐 설정 ---
+# 알림(위의 보류 대상 타입)과 하트비트는 우선순위가 낮아, 큐가 가득 차면 먼저 버려지고(알림은 보류 큐로 옮겨 재접속 시 전달)
+# 같은 타입이 이미 대기 중이면 최신 것으로 대체됩니다. 대화 메시지는 버리지 않으며,
+# 대화 메시지만으로 큐가 가득 찬 클라이언트는 멈춘 것으로 보고 연결을 끊습니다.
+LOW_PRIORITY_TYPES = set(PENDING_NOTIFICATION_TTLS) | {"ping"}
+QUEUE_COALESCED_TYPES = COALESCED_NOTIFICATION_TYPES | {"ping"}
+
+# --- 연결 종료 코드 ---
+CLOSE_CODE_GOING_AWAY = 1001        # 서버 종료
+CLOSE_CODE_POLICY = 1008            # 재접속 횟수 제한 초과
+CLOSE_CODE_SLOW_CLIENT = 1013       # Try Again Later (전송 밀림, 서버 연결 수 초과)
+CLOSE_CODE_REPLACED = 4000          # 같은 사용자가 새로 접속해 이전 연결을 닫음
+CLOSE_CODE_IDLE = 4001              # 오래 아무 입력이 없음
+CLOSE_CODE_HEARTBEAT_TIMEOUT = 4002 # 하트비트 응답(pong)이 끊김 (반쯤 열린 연결)
+CLOSE_CODE_DUPLICATE = 4009         # 이미 접속 중이라 새 연결을 거절함
+
+WS_MESSAGES_SENT = metrics.registry.counter(
+    "tripot_ws_messages_sent_total", "웹소켓으로 전송한 메시지 수")
+WS_MESSAGES_DROPPED = metrics.registry.counter(
+    "tripot_ws_messages_dropped_total", "전송 큐에서 버리거나 대체된 메시지 수", ["reason"])
+WS_SLOW_CLIENT_DISCONNECTS = metrics.registry.counter(
+    "tripot_ws_slow_client_disconnects_total", "전송이 밀려 끊은 클라이언트 수", ["reason"])
+WS_SEND_SECONDS = metrics.registry.histogram(
+    "tripot_ws_send_seconds", "메시지 한 개를 소켓에 쓰는 데 걸린 시간(초)")
+WS_CONNECTIONS_REJECTED = metrics.registry.counter(
+    "tripot_ws_connections_rejected_total", "연결 제한으로 거절한 접속 수", ["reason"])
+WS_EVICTIONS = metrics.registry.counter(
+    "tripot_ws_evictions_total", "서버가 먼저 닫은 연결 수", ["reason"])
+
+class Connection:
+    """
+    연결 하나와 그 전송 큐. 전송은 연결마다 하나인 writer 작업만 하므로 보내는 쪽은 기다리지 않습니다.
+    closed_event는 연결이 (서버에 의해서든 클라이언트에 의해서든) 닫히면 설정되어 수신 대기를 깨웁니다.
+    """
+    __slots__ = (
+        "websocket", "user_id", "queue", "sending", "wakeup", "writer", "closed", "closed_event",
+        "close_code", "close_reason", "released", "connected_at", "last_seen", "last_activity", "answers_ping",
+    )
+
+    def __init__(self, websocket: WebSocket, user_id: str):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: deque[dict] = deque()
+        self.sending: dict | None = None  # writer가 지금 보내는 중인 메시지 (큐에서 꺼낸 상태라 넘치거나 합쳐질 때 빠지지 않음)
+        self.wakeup = asyncio.Event()
+        self.writer: asyncio.Task | None = None
+        self.closed = False
+        self.closed_event = asyncio.Event()
+        self.close_code = 1000
+        self.close_reason: str | None = None
+        self.released = asyncio.Event()  # 이 연결의 처리 루프가 disconnect()까지 마쳤는지
+        now = time.monotonic()
+        self.connected_at = now
+        self.last_seen = now       # 어떤 프레임이든 마지막으로 받은 시각 (pong 포함)
+        self.last_activity = now   # 사용자 입력을 마지막으로 받은 시각
+        self.answers_ping = False  # pong으로 응답하는 클라이언트인지 (하트비트를 모르는 구버전 앱은 검사하지 않음)
 
 class ConnectionManager:
     """활성 WebSocket 연결을 관리하는 중앙 관리자 클래스"""
-    def __init__(self):
-        self.active_connections: dict[str, WebSocket] = {}
+    def __init__(self, send_queue_size: int, send_timeout: float, max_connections: int,
+                 max_connects_per_user_per_minute: int, duplicate_policy: str,
+                 heartbeat_interval: float, heartbeat_timeout: float, idle_timeout: float):
+        if duplicate_policy not in ("replace", "reject"):
+            raise ValueError(f"알 수 없는 WS_DUPLICATE_CONNECTION_POLICY입니다: {duplicate_policy}")
+        self.send_queue_size = send_queue_size
+        self.send_timeout = send_timeout
+        self.max_connections = max_connections
+        self.max_connects_per_user_per_minute = max_connects_per_user_per_minute
+        self.duplicate_policy = duplicate_policy
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.idle_timeout = idle_timeout
+        self.is_running = False
+        self._connections: dict[str, Connection] = {}
+        self._connect_attempts: dict[str, deque] = {}  # user_id -> 최근 1분간 접속 시각
+        # user_id -> deque[(만료 시각(monotonic), 메시지)]
+        self.pending_notifications: dict[str, deque] = {}
+
+    @property
+    def active_connections(self) -> dict[str, WebSocket]:
+        return {user_id: connection.websocket for user_id, connection in self._connections.items()}
+
+    async def connect(self, websocket: WebSocket, user_id: str) -> Connection | None:
+        """
+        연결 제한을 확인하고 연결을 수락합니다. 거절하면 소켓을 닫고 None을 반환합니다.
+        같은 사용자가 이미 접속 중이면 WS_DUPLICATE_CONNECTION_POLICY에 따라 이전 연결을 닫거나(replace) 새 연결을 거절합니다(reject).
+        """
+        existing = self._connections.get(user_id)
+        if not self._allow_connect_attempt(user_id):
+            return await self._reject(websocket, user_id, "rate_limited", CLOSE_CODE_POLICY)
+        if existing is not None and self.duplicate_policy == "reject":
+            return await self._reject(websocket, user_id, "duplicate", CLOSE_CODE_DUPLICATE)
+        if existing is None and len(self._connections) >= self.max_connections:
+            return await self._reject(websocket, user_id, "capacity", CLOSE_CODE_SLOW_CLIENT)
 
-    async def connect(self, websocket: WebSocket, user_id: str):
         await websocket.accept()
-        self.active_connections[user_id] = websocket
+        # 이전 연결의 처리 루프가 끝날 때까지 잠시 기다려, 그 세션 상태 저장이 새 세션과 겹치지 않게 합니다.
+        # 기다리는 동안 목록이 비어 다른 연결이 먼저 등록될 수 있으므로, 다시 확인해 그 연결도 닫고 기다립니다.
+        while existing is not None:
+            logger.info(f"[{user_id}] 같은 사용자가 새로 접속해 이전 연결을 닫습니다.")
+            self._evict(existing, "replaced", CLOSE_CODE_REPLACED)
+            try:
+                await asyncio.wait_for(existing.released.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                logger.warning(f"[{user_id}] 이전 연결의 처리 루프가 5초 안에 끝나지 않았습니다.")
+            existing = self._connections.get(user_id)
 
-    def disconnect(self, user_id: str):
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
+        connection = Connection(websocket, user_id)
+        self._connections[user_id] = connection
+        connection.writer = asyncio.create_task(self._writer(connection))
+        self._flush_pending(user_id)
+        return connection
+
+    def disconnect(self, user_id: str, connection: Connection | None = None) -> bool:
+        """
+        연결을 정리합니다. connection을 주면 그 연결이 아직 현재 연결일 때만 목록에서 뺍니다.
+        새 연결로 대체되어 닫힌 경우 False를 반환합니다. (이때는 세션 상태를 새 연결이 이어 갑니다.)
+        """
+        current = self._connections.get(user_id)
+        if connection is None:
+            connection = current
+        if connection is None:
+            return True
+        if current is connection:
+            del self._connections[user_id]
+        if not connection.closed:
+            self._close(connection)
+        connection.released.set()
+        return connection.close_reason != "replaced"
+
+    def is_superseded(self, user_id: str, connection: Connection) -> bool:
+        """같은 사용자의 다른 연결이 이미 현재 연결로 등록되었는지 확인합니다."""
+        current = self._connections.get(user_id)
+        return current is not None and current is not connection
+
+    async def receive_text(self, connection: Connection) -> str:
+        """
+        다음 사용자 입력(텍스트 프레임)을 기다립니다. 하트비트 응답(pong)은 여기서 처리하고 넘깁니다.
+        서버가 연결을 닫으면(중복 접속, 유휴, 하트비트 끊김, 전송 밀림) WebSocketDisconnect를 발생시킵니다.
+        """
+        while True:
+            if connection.closed:
+                raise WebSocketDisconnect(code=connection.close_code)
+            receive = asyncio.ensure_future(connection.websocket.receive_text())
+            closed = asyncio.ensure_future(connection.closed_event.wait())
+            await asyncio.wait((receive, closed), return_when=asyncio.FIRST_COMPLETED)
+            closed.cancel()
+            if not receive.done():
+                receive.cancel()
+                raise WebSocketDisconnect(code=connection.close_code)
+
+            text = receive.result()
+            connection.last_seen = time.monotonic()
+            if text.startswith("{") and _is_pong(text):
+                connection.answers_ping = True
+                continue
+            connection.last_activity = connection.last_seen
+            return text
 
     async def send_json(self, data: dict, user_id: str):
-        if user_id in self.active_connections:
-            websocket = self.active_connections[user_id]
-            await websocket.send_text(json.dumps(data, ensure_ascii=False))
+        """
+        연결된 사용자의 전송 큐에 메시지를 넣고 바로 돌아옵니다. (네트워크 전송을 기다리지 않음)
+        오프라인이면 보관 대상 알림을 보류 큐에 넣습니다.
+        """
+        connection = self._connections.get(user_id)
+        if connection is None or connection.closed:
+            self._enqueue_pending(data, user_id)
+            return
+        self._enqueue(connection, data)
+
+    # --- 연결 제한 ---
+    def _allow_connect_attempt(self, user_id: str) -> bool:
+        """사용자별 최근 1분간 접속 횟수를 제한합니다. (재접속 폭주로 세션을 계속 새로 만드는 것을 막음)"""
+        now = time.monotonic()
+        attempts = self._connect_attempts.setdefault(user_id, deque())
+        while attempts and attempts[0] <= now - 60:
+            attempts.popleft()
+        if len(attempts) >= self.max_connects_per_user_per_minute:
+            return False
+        attempts.append(now)
+        return True
+
+    async def _reject(self, websocket: WebSocket, user_id: str, reason: str, code: int) -> None:
+        logger.warning(f"[{user_id}] 연결을 거절합니다. ({reason}, 현재 연결 {len(self._connections)}개)")
+        WS_CONNECTIONS_REJECTED.inc(reason=reason)
+        # 수락 전에 닫으면 핸드셰이크가 거절(HTTP 403)됩니다.
+        await websocket.close(code=code)
+        return None
+
+    # --- 하트비트와 유휴 연결 정리 ---
+    async def start(self):
+        """하트비트를 보내고, 응답이 끊기거나 오래 입력이 없는 연결을 닫는 백그라운드 작업"""
+        if self.is_running or self.heartbeat_interval <= 0: return
+        self.is_running = True
+        logger.info(f"웹소켓 하트비트 시작 ({self.heartbeat_interval:.0f}초마다, 응답 제한 {self.heartbeat_timeout:.0f}초, "
+                    f"유휴 제한 {self.idle_timeout:.0f}초)")
+        while self.is_running:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                self.check_connections()
+            except Exception as e:
+                logger.error(f"웹소켓 연결 점검 중 오류 발생: {e}")
+
+    def check_connections(self):
+        """연결마다 ping을 보내고, 제한 시간을 넘긴 연결을 닫고, 비어 있는 사용자별 기록을 정리합니다."""
+        now = time.monotonic()
+        for connection in list(self._connections.values()):
+            if connection.answers_ping and now - connection.last_seen > self.heartbeat_timeout:
+                logger.info(f"[{connection.user_id}] {now - connection.last_seen:.0f}초간 하트비트 응답이 없어 연결을 닫습니다.")
+                self._evict(connection, "heartbeat_timeout", CLOSE_CODE_HEARTBEAT_TIMEOUT)
+            elif now - connection.last_activity > self.idle_timeout:
+                logger.info(f"[{connection.user_id}] {now - connection.last_activity:.0f}초간 입력이 없어 연결을 닫습니다.")
+                self._evict(connection, "idle", CLOSE_CODE_IDLE)
+            else:
+                self._enqueue(connection, {"type": "ping", "ts": int(time.time())})
+
+        for user_id in [user_id for user_id, attempts in self._connect_attempts.items()
+                        if not attempts or attempts[-1] <= now - 60]:
+            del self._connect_attempts[user_id]
+        for user_id in list(self.pending_notifications):
+            if not self.pending_count(user_id):
+                del self.pending_notifications[user_id]
+
+    async def stop(self):
+        """하트비트를 멈추고 남은 연결을 모두 닫습니다. (클라이언트는 다른 워커로 다시 접속해 세션을 이어 갑니다.)"""
+        self.is_running = False
+        for connection in list(self._connections.values()):
+            self._evict(connection, "shutdown", CLOSE_CODE_GOING_AWAY)
+
+    def _evict(self, connection: Connection, reason: str, code: int):
+        WS_EVICTIONS.inc(reason=reason)
+        connection.close_reason = reason
+        connection.close_code = code
+        self._drop_connection(connection)
+
+    # --- 전송 큐 ---
+    def _enqueue(self, connection: Connection, data: dict):
+        message_type = data.get("type")
+        queue = connection.queue
+
+        if message_type in QUEUE_COALESCED_TYPES:
+            for queued in [item for item in queue if item.get("type") == message_type]:
+                queue.remove(queued)
+                WS_MESSAGES_DROPPED.inc(reason="coalesced")
+
+        if len(queue) >= self.send_queue_size:
+            # 1) 새 메시지가 알림이면 새 메시지를, 2) 아니면 대기 중인 가장 오래된 알림을 보류 큐로 옮깁니다.
+            if message_type in LOW_PRIORITY_TYPES:
+                self._enqueue_pending(data, connection.user_id)
+                WS_MESSAGES_DROPPED.inc(reason="overflow")
+                return
+            low = next((item for item in queue if item.get("type") in LOW_PRIORITY_TYPES), None)
+            if low is None:
+                # 대화 메시지만으로 큐가 찼다면 클라이언트가 읽지 못하는 상태입니다.
+                logger.warning(f"[{connection.user_id}] 전송 큐가 가득 차 ({len(queue)}개) 연결을 끊습니다.")
+                WS_SLOW_CLIENT_DISCONNECTS.inc(reason="queue_full")
+                self._evict(connection, "slow_client", CLOSE_CODE_SLOW_CLIENT)
+                return
+            queue.remove(low)
+            self._enqueue_pending(low, connection.user_id)
+            WS_MESSAGES_DROPPED.inc(reason="overflow")
+
+        queue.append(data)
+        connection.wakeup.set()
+
+    async def _writer(self, connection: Connection):
+        """큐의 메시지를 순서대로 소켓에 씁니다. 한 메시지가 send_timeout을 넘기면 연결을 끊습니다."""
+        try:
+            while not connection.closed:
+                if not connection.queue:
+                    connection.wakeup.clear()
+                    await connection.wakeup.wait()
+                    continue
+                data = connection.sending = connection.queue.popleft()
+                started = time.perf_counter()
+                try:
+                    await asyncio.wait_for(
+                        connection.websocket.send_text(json.dumps(data, ensure_ascii=False)), self.send_timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"[{connection.user_id}] 메시지 전송이 {self.send_timeout}초를 넘겨 연결을 끊습니다.")
+                    WS_SLOW_CLIENT_DISCONNECTS.inc(reason="send_timeout")
+                    self._evict(connection, "slow_client", CLOSE_CODE_SLOW_CLIENT)
+                    return
+                except Exception as e:
+                    logger.debug(f"[{connection.user_id}] 메시지 전송 실패, 연결을 정리합니다: {e}")
+                    self._drop_connection(connection)
+                    return
+                connection.sending = None
+                WS_SEND_SECONDS.observe(time.perf_counter() - started)
+                WS_MESSAGES_SENT.inc()
+        except asyncio.CancelledError:
+            pass
+
+    def _drop_connection(self, connection: Connection):
+        """멈췄거나 끊긴 연결을 목록에서 빼고 소켓을 닫습니다. 수신 대기 중인 처리 루프는 WebSocketDisconnect로 끝납니다."""
+        if self._connections.get(connection.user_id) is connection:
+            del self._connections[connection.user_id]
+        if not connection.closed:
+            self._close(connection)
+            asyncio.create_task(self._close_socket(connection.websocket, connection.close_code))
+
+    def _close(self, connection: Connection):
+        """전송 큐를 닫습니다. 아직 보내지 못한 알림은 재접속 시 전달되도록 보류 큐로 옮깁니다."""
+        connection.closed = True
+        connection.closed_event.set()
+        # 보내다 끊긴 메시지는 전달되었는지 알 수 없으므로 함께 다시 보관합니다.
+        unsent = ([connection.sending] if connection.sending is not None else []) + list(connection.queue)
+        connection.sending = None
+        for data in unsent:
+            # 재접속 때 묶어 보낸 프레임은 개별 알림으로 풀어서 다시 보관합니다.
+            for item in data.get("items", ()) if data.get("type") == "pending_notifications" else (data,):
+                self._enqueue_pending(item, connection.user_id)
+        connection.queue.clear()
+        connection.wakeup.set()
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+
+    @staticmethod
+    async def _close_socket(websocket: WebSocket, code: int):
+        try:
+            await asyncio.wait_for(websocket.close(code=code), timeout=1)
+        except Exception:
+            pass
+
+    def queue_depths(self) -> list[int]:
+        return [len(connection.queue) for connection in self._connections.values()]
+
+    # --- 오프라인 보류 알림 ---
+    def _enqueue_pending(self, data: dict, user_id: str):
+        """보관 대상 타입의 알림을 사용자별 제한된 큐에 저장합니다."""
+        message_type = data.get("type")
+        ttl = PENDING_NOTIFICATION_TTLS.get(message_type)
+        if ttl is None:
+            return
+
+        queue = self.pending_notifications.setdefault(
+            user_id, deque(maxlen=MAX_PENDING_NOTIFICATIONS_PER_USER)
+        )
+        self._drop_expired(queue)
+        if message_type in COALESCED_NOTIFICATION_TYPES:
+            for item in [item for item in queue if item[1].get("type") == message_type]:
+                queue.remove(item)
+
+        message = dict(data)
+        message.setdefault("queued_at", datetime.now().isoformat())
+        queue.append((time.monotonic() + ttl, message))
+        logger.debug(f"[{user_id}] 오프라인 상태라 '{message_type}' 알림을 보관합니다. (대기 {len(queue)}건)")
+
+    def _flush_pending(self, user_id: str):
+        """재접속한 사용자에게 보관된 알림을 한 번의 프레임으로 전달합니다."""
+        queue = self.pending_notifications.pop(user_id, None)
+        if not queue:
+            return
+
+        self._drop_expired(queue)
+        items = [message for _, message in queue]
+        if not items:
+            return
+
+        # 전송 큐의 맨 앞에 넣습니다. 전달 전에 연결이 끊기면 개별 알림이 다시 보류 큐로 돌아갑니다.
+        connection = self._connections[user_id]
+        connection.queue.appendleft({"type": "pending_notifications", "items": items})
+        connection.wakeup.set()
+        logger.debug(f"[{user_id}] 보관된 알림 {len(items)}건을 전송 큐에 넣었습니다.")
+
+    @staticmethod
+    def _drop_expired(queue: deque):
+        # 타입별 TTL이 달라 만료 순서가 삽입 순서와 다를 수 있으므로 전체를 확인합니다.
+        now = time.monotonic()
+        for item in [item for item in queue if item[0] <= now]:
+            queue.remove(item)
+
+    def pending_count(self, user_id: str) -> int:
+        """사용자에게 전달 대기 중인 알림 수를 반환합니다."""
+        queue = self.pending_notifications.get(user_id)
+        if not queue:
+            return 0
+        self._drop_expired(queue)
+        return len(queue)
+
+def _is_pong(text: str) -> bool:
+    try:
+        return json.loads(text).get("type") == "pong"
+    except (ValueError, AttributeError):
+        return False
 
 # 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager(
+    send_queue_size=settings.WS_SEND_QUEUE_SIZE,
+    send_timeout=settings.WS_SEND_TIMEOUT_SECONDS,
+    max_connections=settings.WS_MAX_CONNECTIONS,
+    max_connects_per_user_per_minute=settings.WS_MAX_CONNECTS_PER_USER_PER_MINUTE,
+    duplicate_policy=settings.WS_DUPLICATE_CONNECTION_POLICY,
+    heartbeat_interval=settings.WS_HEARTBEAT_INTERVAL_SECONDS,
+    heartbeat_timeout=settings.WS_HEARTBEAT_TIMEOUT_SECONDS,
+    idle_timeout=settings.WS_IDLE_TIMEOUT_SECONDS,
+)
+
+metrics.registry.gauge(
+    "tripot_ws_active_connections", "현재 열려 있는 웹소켓 연결 수",
+    callback=lambda: len(manager._connections))
+metrics.registry.gauge(
+    "tripot_ws_pending_notifications", "오프라인 사용자에게 전달 대기 중인 알림 수",
+    callback=lambda: sum(len(queue) for queue in manager.pending_notifications.values()))
+metrics.registry.gauge(
+    "tripot_ws_send_queue_depth", "모든 연결의 전송 대기 메시지 수 합계",
+    callback=lambda: sum(manager.queue_depths()))
+metrics.registry.gauge(
+    "tripot_ws_send_queue_max_depth", "전송 대기 메시지가 가장 많은 연결의 대기 수",
+    callback=lambda: max(manager.queue_depths(), default=0))
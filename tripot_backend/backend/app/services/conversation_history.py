@@ -0,0 +1,134 @@
+# app/services/conversation_history.py
+# 가족과 돌봄 담당자가 보는 어르신 대화 기록 (페이지 조회, NDJSON/CSV 내보내기)
+#
+# - 페이지 조회는 (created_at, id) 키셋 페이지네이션입니다. 응답의 next_cursor를 다음 요청에 넘기면
+#   OFFSET 없이 이어서 읽으므로 몇 페이지째든 조회 비용이 같습니다.
+# - 내보내기는 서버 측 커서로 읽은 행을 바로 한 줄씩 써 보내므로, 1년치 기록도 메모리 사용량이 일정합니다.
+# - 보관 기간이 지나 압축 파일로 옮긴 달(data_archive)도 함께 읽습니다. 보관된 행은 운영 테이블의 행보다 항상 오래되었으므로
+#   시간순이면 보관 파일 다음에 운영 테이블을, 최신순이면 그 반대로 이어 붙입니다.
+
+import base64
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.db import crud
+from app.db.database import SessionLocal
+from app.services import data_archive
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+CSV_COLUMNS = ("id", "created_at", "speaker", "message")
+
+EXPORTED_ROWS = metrics.registry.counter(
+    "tripot_conversation_export_rows_total", "내보낸 대화 행 수", ["format"])
+
+def encode_cursor(created_at: datetime, conversation_id: int, descending: bool) -> str:
+    raw = f"{'d' if descending else 'a'}|{created_at.isoformat()}|{conversation_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, descending: bool) -> tuple[datetime, int]:
+    """커서를 (created_at, id)로 바꿉니다. 형식이 틀렸거나 다른 정렬 방향의 커서면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        direction, created_at, conversation_id = raw.split("|")
+        if direction != ("d" if descending else "a"):
+            raise ValueError("정렬 방향이 다른 커서입니다.")
+        return datetime.fromisoformat(created_at), int(conversation_id)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"잘못된 커서입니다: {e}") from e
+
+def _time_range(start_date: date | None, end_date: date | None) -> tuple[datetime | None, datetime | None]:
+    return (datetime.combine(start_date, time.min) if start_date else None,
+            datetime.combine(end_date + timedelta(days=1), time.min) if end_date else None)
+
+def _archived_page(db: Session, user_id: int, start_date: date | None, end_date: date | None,
+                   after: tuple[datetime, int] | None, limit: int, descending: bool) -> list:
+    """보관 파일에서 커서 다음의 행을 limit개까지 읽습니다. (필요한 달의 파일만 엽니다.)"""
+    start, end = _time_range(start_date, end_date)
+    if after:
+        # 커서 너머의 달은 읽을 필요가 없습니다.
+        if descending:
+            end = min(end, after[0] + timedelta(microseconds=1)) if end else after[0] + timedelta(microseconds=1)
+        else:
+            start = max(start, after[0]) if start else after[0]
+    rows = []
+    for month_rows in data_archive.iter_archived_rows(db, "conversations", user_id, start, end, descending):
+        for row in month_rows:
+            if after and ((row.created_at, row.id) >= after if descending else (row.created_at, row.id) <= after):
+                continue
+            rows.append(row)
+            if len(rows) >= limit:
+                return rows
+    return rows
+
+def get_page(db: Session, user_id: int, start_date: date | None, end_date: date | None,
+             cursor: str | None, limit: int, descending: bool = True) -> dict:
+    """한 페이지의 대화와, 더 있으면 다음 페이지 커서를 반환합니다."""
+    after = decode_cursor(cursor, descending) if cursor else None
+    # 하나 더 읽어 다음 페이지가 있는지 확인합니다. (마지막 페이지에서 빈 요청을 한 번 더 하지 않도록)
+    if descending:
+        rows = crud.get_conversation_page(db, user_id, start_date, end_date, after, limit + 1, descending)
+        if len(rows) <= limit:
+            rows += _archived_page(db, user_id, start_date, end_date, after, limit + 1 - len(rows), descending)
+    else:
+        rows = _archived_page(db, user_id, start_date, end_date, after, limit + 1, descending)
+        if len(rows) <= limit:
+            rows += crud.get_conversation_page(db, user_id, start_date, end_date, after, limit + 1 - len(rows), descending)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id, descending)
+    return {"items": rows, "next_cursor": next_cursor}
+
+def _row(conversation) -> dict:
+    return {
+        "id": conversation.id,
+        "created_at": conversation.created_at.isoformat() if conversation.created_at else None,
+        "speaker": conversation.speaker,
+        "message": conversation.message,
+    }
+
+def export_rows(user_id: int, start_date: date | None, end_date: date | None, export_format: str) -> Iterator[bytes]:
+    """
+    기간 안의 대화를 시간순으로 NDJSON(한 줄에 JSON 하나) 또는 CSV로 한 줄씩 만들어 돌려줍니다.
+    응답을 보내는 동안 쓰는 DB 세션을 직접 열고 닫습니다. (요청 의존성의 세션은 응답 전에 닫힐 수 있습니다.)
+    """
+    db = SessionLocal()
+    count = 0
+
+    def conversations():
+        for month_rows in data_archive.iter_archived_rows(db, "conversations", user_id, *_time_range(start_date, end_date)):
+            yield from month_rows
+        yield from crud.iter_conversations(db, user_id, start_date, end_date)
+
+    try:
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(CSV_COLUMNS)
+            yield ("\ufeff" + buffer.getvalue()).encode("utf-8")  # 엑셀이 한글을 UTF-8로 읽도록 BOM을 붙입니다.
+            for conversation in conversations():
+                buffer.seek(0)
+                buffer.truncate()
+                row = _row(conversation)
+                writer.writerow([row[column] for column in CSV_COLUMNS])
+                count += 1
+                yield buffer.getvalue().encode("utf-8")
+        else:
+            for conversation in conversations():
+                count += 1
+                yield (json.dumps(_row(conversation), ensure_ascii=False) + "\n").encode("utf-8")
+    finally:
+        db.close()
+        EXPORTED_ROWS.inc(count, format=export_format)
+        logger.info(f"대화 기록 {count}건을 {export_format}로 내보냈습니다. (user_id={user_id})")
@@ -0,0 +1,78 @@
+# app/services/daily_question_cache.py
+# 하루에 한 번 바뀌는 '오늘의 질문'을 한국 시간 날짜 기준으로 캐싱하는 모듈
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session
+
+from app.core.time_utils import now_kst, next_kst_midnight
+from app.db import crud
+
+logger = logging.getLogger(__name__)
+
+# 오늘 질문이 아직 없을 때 다시 조회하기까지의 간격 (질문 적재 스크립트가 갱신을 알리지 못한 경우 대비)
+MISSING_QUESTION_RETRY = timedelta(minutes=5)
+# 리포트에서 조회하는 지난 날짜 질문까지 함께 보관할 최대 날짜 수
+MAX_CACHED_DATES = 14
+
+@dataclass(frozen=True)
+class DailyQuestionSnapshot:
+    """DB 세션과 분리된 '오늘의 질문' 스냅샷"""
+    id: int
+    daily_date: date
+    question_text: str
+    # (구) 누적 답변 컬럼은 이전 스크립트가 비우므로 캐싱하지 않습니다. (crud.get_daily_qa_answer_texts가 DB에서 읽음)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+class DailyQuestionCache:
+    """
+    날짜별 질문을 캐싱합니다. 오늘(한국 시간) 질문은 다음 한국 시간 자정에 만료되고,
+    지난 날짜의 질문은 바뀌지 않으므로 갱신 요청 전까지 유지됩니다.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        # daily_date -> (만료 시각 또는 None, 스냅샷 또는 None)
+        self._entries: OrderedDict[date, tuple[datetime | None, DailyQuestionSnapshot | None]] = OrderedDict()
+
+    def get(self, db: Session, target_date: date) -> DailyQuestionSnapshot | None:
+        now = now_kst()
+        with self._lock:
+            entry = self._entries.get(target_date)
+            if entry and (entry[0] is None or now < entry[0]):
+                self._entries.move_to_end(target_date)
+                return entry[1]
+
+        question = crud.get_daily_question(db, target_date)
+        snapshot = DailyQuestionSnapshot(
+            id=question.id, daily_date=question.daily_date, question_text=question.question_text,
+        ) if question else None
+
+        with self._lock:
+            self._entries[target_date] = (self._expires_at(target_date, snapshot, now), snapshot)
+            self._entries.move_to_end(target_date)
+            while len(self._entries) > MAX_CACHED_DATES:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    @staticmethod
+    def _expires_at(target_date: date, snapshot: DailyQuestionSnapshot | None, now: datetime) -> datetime | None:
+        if snapshot is None:
+            return now + MISSING_QUESTION_RETRY
+        if target_date >= now.date():
+            # 오늘(또는 미래) 질문은 한국 시간 자정에 만료시켜 날짜가 바뀌는 순간 새 질문을 읽도록 합니다.
+            return next_kst_midnight(now)
+        return None
+
+    def invalidate(self):
+        """캐시를 비웁니다. (질문 데이터가 새로 적재되었을 때 호출)"""
+        with self._lock:
+            self._entries.clear()
+        logger.debug("'오늘의 질문' 캐시를 비웠습니다.")
+
+# 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
+daily_question_cache = DailyQuestionCache()
@@ -0,0 +1,257 @@
+# app/services/data_archive.py
+# 오래된 대화/퀴즈 결과를 운영 테이블에서 월별 압축 파일(gzip JSONL)로 옮기고, 필요하면 다시 읽는 모듈
+#
+# - 보관 기간(ARCHIVE_RETENTION_MONTHS)이 지난 달의 행을 사용자별 파일
+#   ARCHIVE_DIR/<테이블>/<YYYY-MM>/user_<user_id>.partN.jsonl.gz에 (created_at, id) 순서로 쓰고,
+#   매니페스트(archive_partitions)에 파일마다 행 수, id·시각 범위, 체크섬을 남긴 뒤 운영 테이블에서 지웁니다.
+#   매니페스트 기록과 삭제는 한 트랜잭션이라, 중간에 실패하면 행은 운영 테이블에 그대로 남습니다.
+# - 운영 테이블에는 최근 몇 달만 남으므로 인덱스가 메모리에 머물고, 백업도 그만큼만 커집니다.
+# - 보관된 기간을 조회하면(대화 기록 API 등) 매니페스트로 그 사용자의, 겹치는 달의 파일만 골라 읽습니다.
+#   다른 사용자의 행은 열지 않으므로 페이지 조회 비용은 그 사용자의 한 달치 크기에만 비례합니다.
+#
+# MySQL 파티셔닝 대신 이 방식을 쓰는 이유: 파티션 테이블은 외래 키를 쓸 수 없고(conversations.user_id 등),
+# 모든 유니크 키에 파티션 키가 들어가야 해 기본 키를 (id, created_at)으로 바꿔야 합니다.
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import date, datetime, time
+from types import SimpleNamespace
+from typing import Iterator
+
+from sqlalchemy import func
+
+from app.core import metrics
+from app.core.config import settings
+from app.db import crud, models
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 보관할 수 있는 테이블 (created_at 기준으로 달을 나눕니다.)
+ARCHIVABLE_TABLES = {
+    "conversations": models.Conversation,
+    "quiz_results": models.QuizResult,
+}
+EXPORT_BATCH_SIZE = 1000
+DELETE_BATCH_SIZE = 5000
+
+ARCHIVED_ROWS = metrics.registry.counter(
+    "tripot_archived_rows_total", "운영 테이블에서 보관 파일로 옮긴 행 수", ["table"])
+ARCHIVE_READ_ROWS = metrics.registry.counter(
+    "tripot_archive_read_rows_total", "조회를 위해 보관 파일에서 읽은 행 수", ["table"])
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def archive_cutoff(today: date, retention_months: int | None = None) -> date:
+    """이 날짜(어느 달의 1일)보다 앞선 달이 보관 대상입니다. 이번 달을 포함해 retention_months개월을 남깁니다."""
+    retention_months = settings.ARCHIVE_RETENTION_MONTHS if retention_months is None else retention_months
+    if retention_months < 1:
+        raise ValueError("보관 기간은 이번 달을 포함해 최소 1개월이어야 합니다.")
+    return add_months(month_start(today), -(retention_months - 1))
+
+def _month_range(month: date) -> tuple[datetime, datetime]:
+    return datetime.combine(month, time.min), datetime.combine(add_months(month, 1), time.min)
+
+def _serialize(value):
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+def _partition_path(table_name: str, month: date, user_id: int, part: int) -> str:
+    return os.path.join(table_name, f"{month:%Y-%m}", f"user_{user_id}.part{part}.jsonl.gz")
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def months_to_archive(table_name: str, cutoff: date) -> list[date]:
+    """운영 테이블에 남아 있는 행 중 cutoff 이전 달 목록"""
+    model = ARCHIVABLE_TABLES[table_name]
+    db = SessionLocal()
+    try:
+        oldest = db.query(func.min(model.created_at)).filter(
+            model.created_at < datetime.combine(cutoff, time.min)).scalar()
+    finally:
+        db.close()
+    months = []
+    month = month_start(oldest.date()) if oldest else cutoff
+    while month < cutoff:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+def archive_month(table_name: str, month: date, dry_run: bool = False) -> int:
+    """
+    한 달치 행을 보관 파일로 옮기고 옮긴 행 수를 반환합니다.
+    dry_run=True면 옮길 행 수만 세고 아무것도 바꾸지 않습니다.
+    """
+    model = ARCHIVABLE_TABLES[table_name]
+    start, end = _month_range(month)
+    in_month = (model.created_at >= start, model.created_at < end)
+    columns = [column.name for column in model.__table__.columns]
+
+    db = SessionLocal()
+    try:
+        if dry_run:
+            return db.query(func.count(model.id)).filter(*in_month).scalar()
+
+        part = crud.next_archive_part(db, table_name, month)
+
+        # 1. 서버 측 커서로 (user_id, created_at, id) 순서로 읽으면서 사용자가 바뀔 때마다 새 파일에 씁니다.
+        #    (한 달치를 메모리에 올리지 않음)
+        query = db.query(*(getattr(model, name) for name in columns)).filter(*in_month).order_by(
+            model.user_id.asc(), model.created_at.asc(), model.id.asc()).yield_per(EXPORT_BATCH_SIZE)
+        partitions: list[models.ArchivePartition] = []
+        writer = None
+        try:
+            for row in query:
+                record = dict(zip(columns, row))
+                if writer is None or writer.user_id != record["user_id"]:
+                    if writer is not None:
+                        partitions.append(writer.finish())
+                    writer = _PartitionWriter(table_name, month, record["user_id"], part)
+                writer.write(record)
+            if writer is not None:
+                partitions.append(writer.finish())
+        except Exception:
+            if writer is not None:
+                writer.discard()
+            _remove_files(partitions)
+            raise
+        if not partitions:
+            return 0
+        count = sum(partition.row_count for partition in partitions)
+        min_id = min(partition.min_id for partition in partitions)
+        max_id = max(partition.max_id for partition in partitions)
+
+        # 2. 매니페스트 기록과 삭제를 한 트랜잭션으로 처리합니다. 지운 행 수가 파일과 다르면 되돌립니다.
+        try:
+            db.add_all(partitions)
+            deleted = 0
+            for batch_start in range(min_id, max_id + 1, DELETE_BATCH_SIZE):
+                deleted += db.query(model).filter(
+                    *in_month, model.id >= batch_start, model.id < batch_start + DELETE_BATCH_SIZE,
+                ).delete(synchronize_session=False)
+            if deleted != count:
+                raise RuntimeError(f"파일에 쓴 행({count})과 지울 행({deleted}) 수가 다릅니다. (보관 중 새 행이 들어옴)")
+            db.commit()
+        except Exception:
+            db.rollback()
+            _remove_files(partitions)
+            raise
+    finally:
+        db.close()
+
+    ARCHIVED_ROWS.inc(count, table=table_name)
+    logger.info(f"[{table_name}] {month:%Y-%m} 행 {count}개를 사용자 {len(partitions)}명의 파일로 옮겼습니다.")
+    return count
+
+class _PartitionWriter:
+    """한 사용자의 한 달치 보관 파일을 임시 파일에 쓰고, 다 쓰면 제자리로 옮겨 매니페스트 행을 만듭니다."""
+    def __init__(self, table_name: str, month: date, user_id: int, part: int):
+        self.table_name = table_name
+        self.month = month
+        self.user_id = user_id
+        self.part = part
+        self.relative_path = _partition_path(table_name, month, user_id, part)
+        self.path = os.path.join(settings.ARCHIVE_DIR, self.relative_path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.temp_path = self.path + ".tmp"
+        self.file = gzip.open(self.temp_path, "wt", encoding="utf-8")
+        self.count, self.min_id, self.max_id = 0, None, None
+        self.min_created, self.max_created = None, None
+
+    def write(self, record: dict):
+        self.file.write(json.dumps({k: _serialize(v) for k, v in record.items()}, ensure_ascii=False) + "\n")
+        self.count += 1
+        self.min_id = record["id"] if self.min_id is None else min(self.min_id, record["id"])
+        self.max_id = record["id"] if self.max_id is None else max(self.max_id, record["id"])
+        # (created_at, id) 순서로 쓰므로 첫 행과 마지막 행이 시각 범위입니다.
+        self.min_created = self.min_created or record["created_at"]
+        self.max_created = record["created_at"]
+
+    def finish(self) -> models.ArchivePartition:
+        self.file.close()
+        with open(self.temp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(self.temp_path, self.path)
+        return models.ArchivePartition(
+            table_name=self.table_name, month=self.month, user_id=self.user_id, part=self.part,
+            path=self.relative_path, row_count=self.count, min_id=self.min_id, max_id=self.max_id,
+            min_created_at=self.min_created, max_created_at=self.max_created, sha256=_sha256(self.path),
+        )
+
+    def discard(self):
+        self.file.close()
+        for path in (self.temp_path, self.path):
+            if os.path.exists(path):
+                os.remove(path)
+
+def _remove_files(partitions: list[models.ArchivePartition]):
+    for partition in partitions:
+        path = os.path.join(settings.ARCHIVE_DIR, partition.path)
+        if os.path.exists(path):
+            os.remove(path)
+
+def verify_partitions(table_name: str) -> list[str]:
+    """매니페스트와 보관 파일(존재 여부, 체크섬)을 비교해 문제 목록을 반환합니다."""
+    db = SessionLocal()
+    try:
+        partitions = crud.get_archive_partitions(db, table_name)
+    finally:
+        db.close()
+    problems = []
+    for partition in partitions:
+        path = os.path.join(settings.ARCHIVE_DIR, partition.path)
+        if not os.path.exists(path):
+            problems.append(f"{partition.path}: 파일 없음")
+        elif _sha256(path) != partition.sha256:
+            problems.append(f"{partition.path}: 체크섬 불일치")
+    return problems
+
+# --- 보관된 데이터 읽기 ---
+
+def _parse_record(record: dict) -> SimpleNamespace:
+    record["created_at"] = datetime.fromisoformat(record["created_at"]) if record.get("created_at") else None
+    return SimpleNamespace(**record)
+
+def _read_partition(table_name: str, relative_path: str) -> Iterator[dict]:
+    path = os.path.join(settings.ARCHIVE_DIR, relative_path)
+    if not os.path.exists(path):
+        # 보관된 기록이 조용히 빠진 결과를 주지 않도록 오류로 알립니다.
+        raise FileNotFoundError(f"보관 파일을 찾을 수 없습니다: {relative_path} (ARCHIVE_DIR={settings.ARCHIVE_DIR})")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            ARCHIVE_READ_ROWS.inc(table=table_name)
+            yield json.loads(line)
+
+def iter_archived_rows(db, table_name: str, user_id: int, start: datetime | None = None,
+                       end: datetime | None = None, descending: bool = False) -> Iterator[list[SimpleNamespace]]:
+    """
+    [start, end) 범위의 보관된 사용자 행을 달 단위 묶음으로 돌려줍니다. 묶음 안은 (created_at, id) 순서입니다.
+    매니페스트로 그 사용자의 파일 중 범위와 겹치는 달만 열므로, 메모리에는 한 사용자의 한 달치만 올라갑니다.
+    """
+    partitions = crud.get_archive_partitions(db, table_name, start, end, user_id=user_id)
+    months: dict[date, list] = {}
+    for partition in partitions:
+        months.setdefault(partition.month, []).append(partition.path)
+    for month in sorted(months, reverse=descending):
+        rows = []
+        for relative_path in months[month]:
+            for record in _read_partition(table_name, relative_path):
+                row = _parse_record(record)
+                if (start and row.created_at < start) or (end and row.created_at >= end):
+                    continue
+                rows.append(row)
+        rows.sort(key=lambda r: (r.created_at, r.id), reverse=descending)
+        if rows:
+            yield rows
@@ -0,0 +1,79 @@
+# app/services/local_ai.py
+# 네트워크 없이 AI 응답을 흉내 내는 결정적 함수 모음 (로컬 AI 제공자와 부하 테스트용 대역 서버가 공유)
+#
+# - STT: WAV의 LIST/INFO 'ICMT' 청크에 담긴 문장을 돌려주고, 없으면 음성 내용 해시로 고른 고정 문장
+# - 임베딩: 입력 문자열 해시를 시드로 만든 단위 벡터 (같은 문장이면 항상 같은 벡터)
+# - 대화/요약/리포트: 요청 종류에 맞춘 템플릿 응답
+# 설정(app.core.config)에 의존하지 않으므로 스크립트에서도 그대로 가져다 쓸 수 있습니다.
+
+import hashlib
+import json
+import re
+import struct
+
+import numpy as np
+
+EMBEDDING_DIMENSION = 1536
+
+FALLBACK_TRANSCRIPTS = [
+    "오늘 아침에 산책을 다녀왔어요.",
+    "네, 잘 지내고 있어요.",
+    "손주가 어제 전화를 했어요.",
+    "점심은 된장찌개를 먹었어요.",
+]
+
+def read_wav_comment(data: bytes) -> str | None:
+    """RIFF/WAVE 파일에서 LIST/INFO 'ICMT' 청크의 문자열을 찾습니다."""
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, offset)
+        body = data[offset + 8: offset + 8 + size]
+        if chunk_id == b"LIST" and body[:4] == b"INFO":
+            sub = 4
+            while sub + 8 <= len(body):
+                sub_id, sub_size = struct.unpack_from("<4sI", body, sub)
+                if sub_id == b"ICMT":
+                    return body[sub + 8: sub + 8 + sub_size].rstrip(b"\x00").decode("utf-8", errors="replace")
+                sub += 8 + sub_size + (sub_size & 1)
+        offset += 8 + size + (size & 1)
+    return None
+
+def transcribe(data: bytes) -> str:
+    """음성 파일 내용으로 결정적인 전사 결과를 만듭니다."""
+    text = read_wav_comment(data)
+    if text is None:
+        digest = hashlib.sha256(data).digest()
+        text = FALLBACK_TRANSCRIPTS[digest[0] % len(FALLBACK_TRANSCRIPTS)]
+    return text
+
+def embedding(text: str) -> list[float]:
+    """문자열 해시를 시드로 한 단위 벡터"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSION).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).round(6).tolist()
+
+def completion(messages: list[dict], json_mode: bool = False) -> str:
+    """요청 종류(리포트, 퀴즈 채점, 기억 요약, 일반 대화)에 맞는 템플릿 응답을 만듭니다."""
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    user = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+
+    if json_mode:
+        # 리포트 프롬프트에 들어 있는 출력 형식 예시를 그대로 돌려주어 형태가 맞는 JSON을 만듭니다.
+        try:
+            return json.dumps(json.loads(system[system.index("{"): system.rindex("}") + 1]), ensure_ascii=False)
+        except ValueError:
+            return json.dumps({"summary": "로컬 AI가 만든 요약입니다."}, ensure_ascii=False)
+    if "TRUE" in system and "FALSE" in system:
+        answer = re.search(r"어르신 답변:\s*(.*)", user)
+        correct = re.search(r"정답:\s*(.*)", user)
+        if answer and correct and correct.group(1).strip() in answer.group(1):
+            return "정답이에요! 정말 잘하셨어요! TRUE"
+        return f"아쉽지만 정답은 {correct.group(1).strip() if correct else '다른 답'}이었어요. FALSE"
+    if "핵심 기억 요약" in user:
+        return "사용자는 오늘 있었던 일상에 대해 이야기했습니다."
+
+    utterance = re.search(r'현재 사용자 메시지: "(.*)"', user, re.S)
+    said = (utterance.group(1) if utterance else user).strip()[:30]
+    return f"\"{said}\"라고 하셨군요. 조금 더 이야기해 주시겠어요?"
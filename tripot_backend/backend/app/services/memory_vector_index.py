@@ -0,0 +1,64 @@
+# app/services/memory_vector_index.py
+# Pinecone 인덱스 대신 쓸 수 있는 프로세스 내 벡터 인덱스 (VECTOR_DB_BACKEND="memory")
+#
+# 부하 테스트나 오프라인 개발 환경에서 Pinecone 없이 기억 저장/검색 경로를 그대로 실행하기 위한 것입니다.
+# upsert/query의 호출 방식과 결과 형태를 Pinecone 클라이언트와 맞췄으며, 데이터는 재시작하면 사라집니다.
+
+import threading
+
+import numpy as np
+
+class InMemoryVectorIndex:
+    """user_id별로 벡터를 묶어 보관하는 코사인 유사도 인덱스 (오래된 벡터부터 제거)"""
+    def __init__(self, max_vectors_per_user: int = 1000):
+        self.max_vectors_per_user = max_vectors_per_user
+        self._lock = threading.Lock()
+        # user_id -> {vector id: (정규화된 벡터, metadata)}
+        self._vectors: dict[str | None, dict[str, tuple[np.ndarray, dict]]] = {}
+
+    def upsert(self, vectors: list[dict]):
+        with self._lock:
+            for vector in vectors:
+                metadata = dict(vector.get("metadata") or {})
+                group = self._vectors.setdefault(metadata.get("user_id"), {})
+                group.pop(vector["id"], None)
+                group[vector["id"]] = (self._normalize(vector["values"]), metadata)
+                while len(group) > self.max_vectors_per_user:
+                    group.pop(next(iter(group)))
+        return {"upserted_count": len(vectors)}
+
+    def query(self, vector: list[float], top_k: int = 5, filter: dict | None = None, include_metadata: bool = True) -> dict:
+        """filter는 {'user_id': 값} 또는 {'user_id': {'$eq': 값}} 형식의 단순 일치만 지원합니다."""
+        user_id = (filter or {}).get("user_id")
+        if isinstance(user_id, dict):
+            user_id = user_id.get("$eq")
+
+        with self._lock:
+            if filter:
+                items = list(self._vectors.get(user_id, {}).items())
+            else:
+                items = [item for group in self._vectors.values() for item in group.items()]
+        if not items:
+            return {"matches": []}
+
+        matrix = np.stack([values for _, (values, _) in items])
+        scores = matrix @ self._normalize(vector)
+        best = np.argsort(-scores)[:top_k]
+        return {"matches": [
+            {
+                "id": items[i][0],
+                "score": float(scores[i]),
+                **({"metadata": items[i][1][1]} if include_metadata else {}),
+            }
+            for i in best
+        ]}
+
+    def describe_index_stats(self) -> dict:
+        with self._lock:
+            return {"total_vector_count": sum(len(group) for group in self._vectors.values())}
+
+    @staticmethod
+    def _normalize(values: list[float]) -> np.ndarray:
+        vector = np.asarray(values, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
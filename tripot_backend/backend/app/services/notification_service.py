@@ -0,0 +1,56 @@
+# app/services/notification_service.py
+# 캘린더/스케줄 변경을 어르신 앱에 푸시하고, 롱폴링 대기자를 깨우는 모듈
+
+import logging
+import asyncio
+from datetime import datetime, timezone
+
+from app.services.connection_manager import manager
+
+logger = logging.getLogger(__name__)
+
+# --- 변경 토픽 ---
+CALENDAR = "calendar"
+SCHEDULE = "schedule"
+
+class ChangeNotifier:
+    """사용자별 변경 이벤트를 WebSocket으로 푸시하고 롱폴링 요청을 깨웁니다."""
+    def __init__(self):
+        # (user_id, topic) -> 다음 변경 시 set 되는 asyncio.Event
+        self._waiters: dict[tuple[str, str], asyncio.Event] = {}
+
+    def current_event(self, user_id: str, topic: str) -> asyncio.Event:
+        """다음 변경을 기다릴 수 있는 이벤트를 반환합니다. (DB 확인 전에 먼저 잡아야 변경을 놓치지 않습니다)"""
+        key = (user_id, topic)
+        event = self._waiters.get(key)
+        if event is None:
+            event = self._waiters[key] = asyncio.Event()
+        return event
+
+    async def publish(self, user_id: str, topic: str, payload: dict):
+        """변경 이벤트를 `{topic}_update` 타입으로 푸시하고 대기 중인 롱폴링 요청을 깨웁니다."""
+        event = self._waiters.pop((user_id, topic), None)
+        if event is not None:
+            event.set()
+
+        try:
+            await manager.send_json({"type": f"{topic}_update", **payload}, user_id)
+        except Exception as e:
+            logger.error(f"[{user_id}] '{topic}' 변경 알림 전송 실패: {e}")
+
+    async def wait_for_change(self, event: asyncio.Event, timeout: float) -> bool:
+        """변경이 생기거나 timeout이 지날 때까지 기다립니다. 변경이 있었으면 True를 반환합니다."""
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+def to_naive_utc(value: datetime | None) -> datetime | None:
+    """DB의 updated_at(naive UTC)과 비교할 수 있도록 시간대 정보를 정리합니다."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+# 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
+change_notifier = ChangeNotifier()
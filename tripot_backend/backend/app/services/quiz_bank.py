@@ -0,0 +1,129 @@
+# app/services/quiz_bank.py
+# 프로세스 전체가 공유하는 읽기 전용 퀴즈 은행 (pandas 없이 튜플 기반으로 보관)
+
+import logging
+import random
+import threading
+from array import array
+from collections import OrderedDict, deque
+from typing import NamedTuple
+
+from app.db import crud
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 사용자별로 최근에 낸 문제를 기억해 다시 내지 않을 개수
+RECENT_QUIZZES_PER_USER = 20
+# 최근 문제 기록을 보관할 최대 사용자 수 (오래된 사용자부터 지웁니다)
+MAX_TRACKED_USERS = 10_000
+
+class QuizItem(NamedTuple):
+    id: int
+    topic: str
+    question_text: str
+    answer: str
+
+class _QuizSnapshot:
+    """한 번 적재된 퀴즈 데이터. 갱신 시 통째로 교체되며 내용은 바뀌지 않습니다."""
+    __slots__ = ("ids", "topics", "questions", "answers", "position_by_id", "positions_by_topic")
+
+    def __init__(self, rows: list[tuple[int, str, str, str]]):
+        self.ids = array('q', (row[0] for row in rows))
+        self.topics = tuple(row[1] for row in rows)
+        self.questions = tuple(row[2] for row in rows)
+        self.answers = tuple(str(row[3]) for row in rows)
+        self.position_by_id = {quiz_id: position for position, quiz_id in enumerate(self.ids)}
+
+        positions_by_topic: dict[str, list[int]] = {}
+        for position, topic in enumerate(self.topics):
+            positions_by_topic.setdefault(topic, []).append(position)
+        self.positions_by_topic = {topic: tuple(positions) for topic, positions in positions_by_topic.items()}
+
+    def item(self, position: int) -> QuizItem:
+        return QuizItem(self.ids[position], self.topics[position], self.questions[position], self.answers[position])
+
+class QuizBank:
+    """DB의 퀴즈를 한 번만 읽어 공유하고, 주제별 색인과 O(k) 샘플링을 제공합니다."""
+    def __init__(self):
+        self._snapshot = _QuizSnapshot([])
+        self._loaded = False
+        self._lock = threading.Lock()
+        # user_id -> 최근에 낸 quiz id (deque)
+        self._recent: OrderedDict[str, deque] = OrderedDict()
+
+    # --- 적재 ---
+    def load(self) -> int:
+        """DB에서 퀴즈를 읽어 스냅샷을 교체하고, 적재된 문제 수를 반환합니다."""
+        db = SessionLocal()
+        try:
+            rows = crud.fetch_all_quizzes(db)
+        finally:
+            db.close()
+
+        snapshot = _QuizSnapshot(rows)
+        self._snapshot = snapshot  # 참조 교체는 원자적이라 진행 중인 세션에 영향이 없습니다.
+        self._loaded = True
+        logger.info(f"퀴즈 은행 적재 완료: {len(snapshot.ids)}문제, 주제 {len(snapshot.positions_by_topic)}개")
+        return len(snapshot.ids)
+
+    def ensure_loaded(self):
+        """아직 적재되지 않았으면 적재합니다. 실패해도 다음 호출에서 다시 시도합니다."""
+        if self._loaded:
+            return
+        try:
+            self.load()
+        except Exception as e:
+            logger.error(f"퀴즈 은행 적재 중 오류 발생: {e}")
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    # --- 조회 ---
+    def __len__(self) -> int:
+        return len(self._snapshot.ids)
+
+    def topics(self) -> list[str]:
+        return list(self._snapshot.positions_by_topic)
+
+    def get(self, quiz_id: int) -> QuizItem | None:
+        """quiz id로 문제를 찾습니다. 갱신으로 사라진 문제면 None을 반환합니다."""
+        snapshot = self._snapshot
+        position = snapshot.position_by_id.get(quiz_id)
+        return snapshot.item(position) if position is not None else None
+
+    def sample(self, k: int, user_id: str | None = None, topic: str | None = None) -> list[QuizItem]:
+        """
+        최대 k개의 문제를 무작위로 고릅니다. 사용자가 최근에 푼 문제는 가능한 한 피합니다.
+        전체 문제 수와 무관하게 O(k + 최근 기록 수)로 동작합니다.
+        """
+        snapshot = self._snapshot
+        pool = snapshot.positions_by_topic.get(topic, ()) if topic else range(len(snapshot.ids))
+        if not pool or k <= 0:
+            return []
+
+        recent = set(self._recent.get(user_id, ())) if user_id else set()
+        candidates = random.sample(pool, min(len(pool), k + len(recent)))
+        chosen = [position for position in candidates if snapshot.ids[position] not in recent][:k]
+        if len(chosen) < k:
+            # 문제 수가 적으면 최근 문제라도 채워 넣습니다.
+            chosen += [position for position in candidates if position not in chosen][:k - len(chosen)]
+
+        items = [snapshot.item(position) for position in chosen]
+        if user_id:
+            self._remember(user_id, [item.id for item in items])
+        return items
+
+    def _remember(self, user_id: str, quiz_ids: list[int]):
+        with self._lock:
+            recent = self._recent.get(user_id)
+            if recent is None:
+                recent = self._recent[user_id] = deque(maxlen=RECENT_QUIZZES_PER_USER)
+            self._recent.move_to_end(user_id)
+            recent.extend(quiz_ids)
+            while len(self._recent) > MAX_TRACKED_USERS:
+                self._recent.popitem(last=False)
+
+# 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
+quiz_bank = QuizBank()
@@ -0,0 +1,270 @@
+# app/services/quiz_grader.py
+# LLM을 부르기 전에 퀴즈 답변을 로컬에서 빠르게 채점하는 규칙 기반 채점기
+#
+# 확실히 맞거나 틀린 답변(숫자, 정해진 단어 목록, 따라 말하기 등)만 판정하고,
+# 끝말잇기처럼 정답이 열려 있거나 설명형인 답변은 AMBIGUOUS로 돌려 LLM이 채점하도록 합니다.
+
+import re
+import unicodedata
+from typing import NamedTuple
+
+# --- 판정 결과 ---
+CORRECT = "correct"
+INCORRECT = "incorrect"
+AMBIGUOUS = "ambiguous"
+
+class QuizGrade(NamedTuple):
+    verdict: str
+    reason: str
+
+# --- 채점 기준값 ---
+WORD_MATCH_THRESHOLD = 0.8      # 자모 단위 유사도가 이 이상이면 같은 단어로 봅니다. (STT 오인식 허용)
+SENTENCE_MATCH_THRESHOLD = 0.9  # 따라 말하기 문장의 유사도 기준
+SHORT_ANSWER_MAX_LENGTH = 8     # 용언 어간만으로 비교할 만큼 짧은 답변의 최대 글자 수
+
+# 순서가 중요한 문제를 나타내는 표현
+ORDERED_QUESTION_KEYWORDS = ("순서대로", "거꾸로", "차례대로", "순서")
+# '모르겠다'류 답변은 확실한 오답으로 처리합니다.
+GIVE_UP_KEYWORDS = ("모르", "몰라", "기억이 안", "기억 안", "생각이 안", "생각 안", "글쎄", "패스")
+# 답변 끝에 붙는 조사/어미 (긴 것부터 제거)
+ANSWER_SUFFIXES = ("이에요", "이예요", "입니다", "이요", "예요", "에요", "이죠", "개요", "요", "개", "자루", "번", "명", "이", "죠")
+# 부정 표현 ('작지 않아요', '과일 아니에요'). 정답 단어가 들어 있어도 맞았다고 볼 수 없으므로 LLM에 넘깁니다.
+NEGATION_PATTERN = re.compile(r"아니|아닌|않|말고|(?:^|\s)(?:안|못)(?=\s)")
+# 확신 없는 답변 ('8인가 9인가', '아마 서울')
+HEDGE_PATTERN = re.compile(r"인가|인지|아마")
+# '네/예/응'만 한 대답은 숫자(넷)가 아니라 대답입니다.
+YES_WORDS = ("네", "예", "응")
+
+# --- 한글 자모 분해 ---
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+def to_jamo(text: str) -> str:
+    """완성형 한글을 초성/중성/종성 자모열로 풀어 씁니다. (예: '강' -> 'ㄱㅏㅇ')"""
+    result = []
+    for char in text:
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            result.append(_CHOSEONG[code // 588])
+            result.append(_JUNGSEONG[(code % 588) // 28])
+            if code % 28:
+                result.append(_JONGSEONG[code % 28])
+        else:
+            result.append(char)
+    return "".join(result)
+
+def _levenshtein(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def similarity(a: str, b: str) -> float:
+    """두 문자열의 자모 단위 유사도(0~1)를 반환합니다."""
+    jamo_a, jamo_b = to_jamo(a), to_jamo(b)
+    if not jamo_a and not jamo_b:
+        return 1.0
+    return 1 - _levenshtein(jamo_a, jamo_b) / max(len(jamo_a), len(jamo_b))
+
+# --- 정규화 ---
+_PUNCTUATION = re.compile(r"[^\w]", re.UNICODE)
+
+def normalize(text: str) -> str:
+    """유니코드 정규화 후 소문자로 바꾸고 공백과 문장부호를 모두 제거합니다."""
+    text = unicodedata.normalize("NFC", str(text)).lower()
+    return _PUNCTUATION.sub("", text).replace("_", "")
+
+def _strip_suffix(token: str) -> str:
+    changed = True
+    while changed:
+        changed = False
+        for suffix in ANSWER_SUFFIXES:
+            if token.endswith(suffix) and len(token) > len(suffix):
+                token = token[:-len(suffix)]
+                changed = True
+                break
+    return token
+
+def _tokens(text: str, strip: bool = True) -> list[str]:
+    """답변을 공백/쉼표 등으로 나누고 조사/어미를 떼어 낸 토큰 목록을 반환합니다. (strip=False면 떼지 않음)"""
+    text = unicodedata.normalize("NFC", str(text)).lower()
+    raw_tokens = [normalize(token) for token in re.split(r"[\s,./·、]+|(?:그리고|다음에|다음은|다음)", text)]
+    return [_strip_suffix(token) if strip else token for token in raw_tokens if token]
+
+# --- 수사(숫자 말) 해석 ---
+_SINO_DIGITS = {"영": 0, "공": 0, "일": 1, "이": 2, "삼": 3, "사": 4, "오": 5, "육": 6, "륙": 6, "칠": 7, "팔": 8, "구": 9}
+_SINO_UNITS = {"십": 10, "백": 100}
+_NATIVE_TENS = {"열": 10, "스물": 20, "스무": 20, "서른": 30, "마흔": 40, "쉰": 50}
+_NATIVE_UNITS = {
+    "하나": 1, "한": 1, "둘": 2, "두": 2, "셋": 3, "세": 3, "석": 3, "넷": 4, "네": 4, "넉": 4,
+    "다섯": 5, "여섯": 6, "일곱": 7, "여덟": 8, "아홉": 9,
+}
+# 숫자 말이면서 흔한 다른 말('네'=예, '세'=나이, '사'/'오' 등)인 토큰.
+# 뒤에 단위가 붙었거나('네 개', '세 번') 답변 전체가 그 토큰일 때만 숫자로 봅니다.
+_AMBIGUOUS_NUMERALS = {"한", "두", "세", "석", "네", "넉", "사", "오"}
+_COUNTERS = ("개", "자루", "번", "명", "살", "마리", "시", "권", "장", "잔", "가지", "달", "점", "층")
+
+def _parse_native(token: str) -> int | None:
+    value = 0
+    for word, tens in _NATIVE_TENS.items():
+        if token.startswith(word):
+            value, token = tens, token[len(word):]
+            break
+    if not token:
+        return value or None
+    unit = _NATIVE_UNITS.get(token)
+    return value + unit if unit is not None else None
+
+def _parse_sino(token: str) -> int | None:
+    if not token or any(char not in _SINO_DIGITS and char not in _SINO_UNITS for char in token):
+        return None
+    total, digit = 0, None
+    for char in token:
+        if char in _SINO_UNITS:
+            total += (digit if digit is not None else 1) * _SINO_UNITS[char]
+            digit = None
+        elif digit is not None:
+            return None  # '구이칠'처럼 단위 없이 이어진 숫자는 한 수로 보지 않습니다.
+        else:
+            digit = _SINO_DIGITS[char]
+    return total + (digit or 0)
+
+def _is_counter(token: str) -> bool:
+    return any(token == counter or (token.startswith(counter) and token[len(counter):] in ANSWER_SUFFIXES)
+               for counter in _COUNTERS)
+
+def _counter_follows(raw_token: str, token: str, next_token: str | None) -> bool:
+    """'네개요'처럼 토큰에 단위가 붙었거나, '네 개'처럼 다음 토큰이 단위인지 확인합니다."""
+    return _is_counter(raw_token[len(token):]) or (next_token is not None and _is_counter(next_token))
+
+def parse_numbers(text: str) -> list[int]:
+    """답변에서 아라비아 숫자와 한국어 수사(하나/일/열다섯/십오 등)를 순서대로 추출합니다."""
+    return _scan_numbers(text)[0]
+
+def _scan_numbers(text: str) -> tuple[list[int], bool]:
+    """(추출한 숫자, 숫자인지 알 수 없어 건너뛴 말이 있었는지)를 반환합니다."""
+    numbers = []
+    skipped_ambiguous = False
+    raw_tokens = _tokens(text, strip=False)
+    for index, raw_token in enumerate(raw_tokens):
+        token = _strip_suffix(raw_token)
+        if token in _AMBIGUOUS_NUMERALS and len(raw_tokens) > 1:
+            next_token = raw_tokens[index + 1] if index + 1 < len(raw_tokens) else None
+            if not _counter_follows(raw_token, token, next_token):
+                skipped_ambiguous = True
+                continue
+        digits = re.findall(r"\d+", token)
+        if digits:
+            numbers.extend(int(d) for d in digits)
+            continue
+        value = _parse_native(token)
+        if value is None:
+            value = _parse_sino(token)
+        if value is not None:
+            numbers.append(value)
+        elif token and all(char in _SINO_DIGITS for char in token):
+            # '구이칠'처럼 붙여 말한 숫자 나열
+            numbers.extend(_SINO_DIGITS[char] for char in token)
+    return numbers, skipped_ambiguous
+
+# --- 단어 찾기 ---
+def _find_word(word: str, text: str, start: int = 0) -> int | None:
+    """정규화된 답변에서 단어와 가장 비슷한 위치를 찾습니다. 기준 미달이면 None을 반환합니다."""
+    if not word:
+        return None
+    exact = text.find(word, start)
+    if exact >= 0:
+        return exact
+
+    best_position, best_score = None, 0.0
+    for width in {max(1, len(word) - 1), len(word), len(word) + 1}:
+        for position in range(start, max(start, len(text) - width) + 1):
+            score = similarity(word, text[position:position + width])
+            if score > best_score:
+                best_position, best_score = position, score
+    return best_position if best_score >= WORD_MATCH_THRESHOLD else None
+
+def _is_number(text: str) -> bool:
+    return bool(re.fullmatch(r"\d+", text))
+
+# --- 채점 ---
+def grade_answer(question: str, user_answer: str, correct_answer: str) -> QuizGrade:
+    """
+    답변을 로컬 규칙으로 채점합니다.
+    확신할 수 있을 때만 CORRECT/INCORRECT를 반환하고, 나머지는 AMBIGUOUS로 LLM에 넘깁니다.
+    """
+    answer_text = normalize(user_answer)
+    if not answer_text:
+        return QuizGrade(INCORRECT, "빈 답변")
+
+    expected = str(correct_answer).strip()
+    gave_up = any(keyword in str(user_answer) for keyword in GIVE_UP_KEYWORDS)
+
+    # 0. '네'만 한 대답, 부정하거나 확신 없는 답변은 규칙으로 판정하지 않습니다. (정답에도 그 표현이 있으면 제외)
+    if not gave_up:
+        if answer_text.removesuffix("요") in YES_WORDS:
+            return QuizGrade(AMBIGUOUS, "예/아니오 대답")
+        for pattern, reason in ((NEGATION_PATTERN, "부정 표현"), (HEDGE_PATTERN, "확신 없는 답변")):
+            if pattern.search(str(user_answer)) and not pattern.search(expected):
+                return QuizGrade(AMBIGUOUS, reason)
+
+    # 1. 'A / B / C' 형태: 예시 정답 중 하나와 맞으면 정답, 아니면 열린 문제이므로 LLM에 넘깁니다.
+    if " / " in expected:
+        alternatives = [normalize(alt) for alt in expected.split("/") if normalize(alt)]
+        if any(_find_word(alt, answer_text) is not None for alt in alternatives):
+            return QuizGrade(CORRECT, "예시 정답과 일치")
+        return QuizGrade(INCORRECT if gave_up else AMBIGUOUS, "예시 정답 외 답변")
+
+    items = [normalize(item) for item in expected.split(",") if normalize(item)]
+
+    # 2. 숫자 정답 (단일 또는 나열)
+    if items and all(_is_number(item) for item in items):
+        numbers, skipped_ambiguous = _scan_numbers(user_answer)
+        expected_numbers = [int(item) for item in items]
+        if not numbers:
+            return QuizGrade(INCORRECT if gave_up else AMBIGUOUS, "숫자를 찾지 못함")
+        if skipped_ambiguous:
+            # '삼 일 팔 오'의 '오'처럼 숫자일 수도 있는 말을 빼고 남은 숫자로는 단정할 수 없습니다.
+            return QuizGrade(AMBIGUOUS, "숫자인지 알 수 없는 말 포함")
+        if len(expected_numbers) == 1:
+            # '5 더하기 3은 8'처럼 문제를 되풀이할 수 있으므로 마지막 숫자를 답으로 봅니다.
+            is_correct = numbers[-1] == expected_numbers[0]
+        else:
+            is_correct = numbers[-len(expected_numbers):] == expected_numbers
+        return QuizGrade(CORRECT if is_correct else INCORRECT, "숫자 비교")
+
+    # 3. 단어 나열 (순서가 중요한 문제는 순서까지 확인)
+    if len(items) > 1:
+        ordered = any(keyword in question for keyword in ORDERED_QUESTION_KEYWORDS)
+        positions = [_find_word(item, answer_text) for item in items]
+        if all(position is not None for position in positions):
+            if not ordered or positions == sorted(positions):
+                return QuizGrade(CORRECT, "단어 목록 일치")
+            return QuizGrade(INCORRECT, "순서가 다름")
+        if gave_up or all(position is None for position in positions):
+            return QuizGrade(INCORRECT, "단어 목록 불일치")
+        return QuizGrade(AMBIGUOUS, "일부 단어만 일치")
+
+    if not items:
+        return QuizGrade(AMBIGUOUS, "정답 정보 없음")
+    target = items[0]
+
+    # 4. 따라 말하기/설명형 등 긴 정답
+    if len(target) > SHORT_ANSWER_MAX_LENGTH:
+        if similarity(target, answer_text) >= SENTENCE_MATCH_THRESHOLD:
+            return QuizGrade(CORRECT, "문장 일치")
+        return QuizGrade(INCORRECT if gave_up else AMBIGUOUS, "문장 불일치")
+
+    # 5. 단일 단어 정답 ('서울이요', '작아요' 등 어미가 붙은 답변 허용)
+    if _find_word(target, answer_text) is not None:
+        return QuizGrade(CORRECT, "단어 일치")
+    stem = target[:-1] if target.endswith("다") and len(target) > 1 else None
+    if stem and len(answer_text) <= SHORT_ANSWER_MAX_LENGTH and answer_text.startswith(stem):
+        return QuizGrade(CORRECT, "어간 일치")
+    return QuizGrade(INCORRECT if gave_up else AMBIGUOUS, "단어 불일치")
@@ -0,0 +1,127 @@
+# app/services/report_cache.py
+# 가족 앱의 홈 화면/상세 리포트 응답을 사용자별로 한 번만 만들어 두는 캐시
+#
+# - 첫 조회 때 만든 응답을 (사용자, 종류)로 보관하고, 이후 조회는 조회 한 번으로 끝납니다.
+#   같은 사용자의 응답을 동시에 여러 명이 처음 조회해도 한 번만 만듭니다.
+# - 새 리포트 저장, 퀴즈 결과 저장, '오늘의 질문' 답변이 있으면 해당 항목을 비웁니다.
+# - 리포트는 별도 프로세스(generate_reports.py)가 저장하므로, 항목은 REPORT_CACHE_TTL_SECONDS와
+#   한국 시간 자정(인지 퀴즈 집계 기간과 기본값 날짜가 바뀜) 중 이른 때에 만료됩니다.
+#   바로 반영해야 하면 갱신 API(POST /family/reports/{senior_user_id}/refresh)를 호출합니다.
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.time_utils import now_kst, next_kst_midnight
+
+logger = logging.getLogger(__name__)
+
+HOME = "home"
+DETAIL = "detail"
+
+REPORT_CACHE_REQUESTS = metrics.registry.counter(
+    "tripot_report_cache_requests_total", "리포트 응답 캐시 조회 수 (outcome: hit, miss)", ["kind", "outcome"])
+
+@dataclass
+class _Entry:
+    payload: dict
+    report_date: date | None   # 응답이 담고 있는 리포트 날짜 ('오늘의 질문' 답변 무효화에 사용)
+    expires_at: float          # time.monotonic() 기준
+
+class ReportCache:
+    """(사용자, 종류) -> 완성된 응답. 최대 개수를 넘으면 가장 오래 안 쓴 항목부터 버립니다. (LRU)"""
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        # 무효화 횟수 (사용자별, 전체). 만드는 중에 무효화된 응답은 저장하지 않습니다.
+        self._generations: dict[str, int] = {}
+        self._global_generation = 0
+        self._render_locks: dict[tuple[str, str], threading.Lock] = {}
+
+    def get_or_render(self, user_id_str: str, kind: str, render: Callable[[], tuple[dict, date | None]]) -> dict:
+        """
+        캐시된 응답을 반환하고, 없으면 render()로 만들어 저장합니다.
+        반환한 딕셔너리는 여러 요청이 함께 쓰므로 고치지 않습니다.
+        """
+        key = (user_id_str, kind)
+        payload = self._lookup(key)
+        if payload is not None:
+            REPORT_CACHE_REQUESTS.inc(kind=kind, outcome="hit")
+            return payload
+
+        with self._lock:
+            render_lock = self._render_locks.setdefault(key, threading.Lock())
+        with render_lock:
+            payload = self._lookup(key)  # 기다리는 동안 다른 요청이 만들었으면 그대로 씁니다.
+            if payload is not None:
+                REPORT_CACHE_REQUESTS.inc(kind=kind, outcome="hit")
+                return payload
+            REPORT_CACHE_REQUESTS.inc(kind=kind, outcome="miss")
+            with self._lock:
+                generation = (self._generations.get(user_id_str, 0), self._global_generation)
+            payload, report_date = render()
+            with self._lock:
+                self._render_locks.pop(key, None)
+                if (self._generations.get(user_id_str, 0), self._global_generation) == generation:
+                    self._entries[key] = _Entry(payload, report_date, self._expires_at())
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return payload
+
+    def _lookup(self, key: tuple[str, str]) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry.expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry.payload
+
+    def _expires_at(self) -> float:
+        now = now_kst()
+        until_midnight = (next_kst_midnight(now) - now).total_seconds()
+        return time.monotonic() + min(self.ttl_seconds, until_midnight)
+
+    def invalidate(self, user_id_str: str):
+        """사용자의 모든 응답을 비웁니다. (새 리포트나 퀴즈 결과가 저장되었을 때 호출)"""
+        with self._lock:
+            self._generations[user_id_str] = self._generations.get(user_id_str, 0) + 1
+            for kind in (HOME, DETAIL):
+                self._entries.pop((user_id_str, kind), None)
+        logger.debug(f"[{user_id_str}] 리포트 응답 캐시를 비웠습니다.")
+
+    def invalidate_report_date(self, report_date: date):
+        """그 날짜의 리포트를 담은 상세 응답을 모두 비웁니다. ('오늘의 질문' 답변은 모든 사용자가 함께 봅니다.)"""
+        with self._lock:
+            self._global_generation += 1
+            stale = [key for key, entry in self._entries.items() if key[1] == DETAIL and entry.report_date == report_date]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._global_generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
+report_cache = ReportCache(
+    max_entries=settings.REPORT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.REPORT_CACHE_TTL_SECONDS,
+)
+
+metrics.registry.gauge(
+    "tripot_report_cache_entries", "리포트 응답 캐시 항목 수", callback=lambda: len(report_cache))
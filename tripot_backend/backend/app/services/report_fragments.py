@@ -0,0 +1,148 @@
+# app/services/report_fragments.py
+# 세션 단위 리포트 조각과 일일 리포트 합치기
+#
+# - 세션이 끝나면(세션 정리 작업이 마무리할 때) 그 세션의 대화만으로 report_prompts.json 형식의 조각을 만들어
+#   report_fragments 테이블에 저장합니다. LLM 작업이 하루 동안 나뉘고, 실패해도 그 세션 하나에만 영향을 줍니다.
+# - 밤의 리포트 작업은 그날의 조각을 LLM 없이 규칙대로 합쳐 summaries에 저장합니다. (같은 조각이면 항상 같은 결과)
+# - 조각이 없는 대화(조각 생성 실패, 배포 전 대화 등)는 밤에 그 부분만 조각으로 만들어 함께 합칩니다.
+#   어느 대화가 조각에 담겼는지는 조각에 기록한 conversations id 범위로 판단합니다. (앱 서버와 DB의 시계·시간대가
+#   달라도 어긋나지 않음) 자정을 넘긴 세션은 마지막 대화 날짜의 조각이 되고, 앞날 리포트에서는 빠집니다.
+
+import asyncio
+import logging
+import uuid
+from datetime import date, datetime, timedelta
+
+from app.core import metrics
+from app.db import crud
+from app.db.database import SessionLocal
+from app.services import ai_service
+from app.services.report_merge import merge_fragments
+
+logger = logging.getLogger(__name__)
+
+# 대화 id 범위가 없는 조각(배포 전 세션)은 세션 시각으로 판단합니다. 앱 서버와 DB 서버 시계 차이를 감안한 여유
+SESSION_WINDOW_SLACK = timedelta(minutes=2)
+
+FRAGMENTS_CREATED = metrics.registry.counter(
+    "tripot_report_fragments_total", "세션 리포트 조각 생성 결과 수 (created, skipped, failed, duplicate)", ["outcome"])
+REPORTS_MERGED = metrics.registry.counter(
+    "tripot_daily_reports_total", "일일 리포트 생성 수 (merged: 조각 합치기, full: 하루치 전체 분석)", ["mode"])
+
+def _has_user_turn(conversation_log: list[str]) -> bool:
+    return any(line.startswith("사용자:") for line in conversation_log)
+
+def _save(user_id: str, session_id: str, report_date: date | None, fragment: dict, lines: int,
+          started_at: datetime, ended_at: datetime, first_id: int | None, last_id: int | None) -> tuple[bool, date]:
+    """
+    조각을 저장하고 (저장 여부, 리포트 날짜)를 반환합니다. 대화 id 범위가 있으면 세션 시각과 날짜를
+    대화의 created_at(DB 시계)으로 정해, 밤 작업이 읽는 대화와 같은 기준을 씁니다.
+    """
+    db = SessionLocal()
+    try:
+        if first_id is not None and last_id is not None:
+            times = crud.get_conversation_times(db, [first_id, last_id])
+            started_at, ended_at = times.get(first_id) or started_at, times.get(last_id) or ended_at
+        report_date = report_date or ended_at.date()
+        saved = crud.save_report_fragment(db, user_id, session_id, report_date, fragment, lines,
+                                          started_at, ended_at, first_id, last_id)
+        return saved, report_date
+    finally:
+        db.close()
+
+async def create_fragment(user_id: str, session_id: str, conversation_log: list[str],
+                          started_at: float, ended_at: float, first_conversation_id: int | None = None,
+                          last_conversation_id: int | None = None) -> bool:
+    """세션 대화로 리포트 조각을 만들어 저장합니다. (batch 등급) 저장했으면 True"""
+    if not _has_user_turn(conversation_log):
+        FRAGMENTS_CREATED.inc(outcome="skipped")  # 인사만 하고 끝난 세션
+        return False
+
+    fragment = await ai_service.generate_summary_report("\n".join(conversation_log))
+    if not fragment:
+        FRAGMENTS_CREATED.inc(outcome="failed")
+        logger.warning(f"[{user_id}] 세션 리포트 조각 생성 실패 (밤 작업에서 이 세션 대화를 다시 분석합니다.)")
+        return False
+
+    saved, report_date = await asyncio.to_thread(
+        _save, user_id, session_id, None, fragment, len(conversation_log),
+        datetime.fromtimestamp(started_at), datetime.fromtimestamp(ended_at),
+        first_conversation_id, last_conversation_id)
+    FRAGMENTS_CREATED.inc(outcome="created" if saved else "duplicate")
+    if saved:
+        logger.info(f"[{user_id}] 세션 리포트 조각을 저장했습니다. ({report_date}, 대화 {len(conversation_log)}줄)")
+    return saved
+
+# --- 밤 작업 ---
+
+def _load_day(user_id: str, target_date: date):
+    """
+    그날의 조각, 그날 대화를 담은 모든 조각의 대화 id 범위(다음 날로 넘어간 세션 포함), 그날 대화를 반환합니다.
+    """
+    db = SessionLocal()
+    try:
+        fragments = crud.get_report_fragments(db, user_id, target_date)
+        conversations = crud.get_conversations_by_date(db, user_id, target_date)
+        covered = []
+        if conversations:
+            covered = crud.get_report_fragment_ranges(
+                db, user_id, min(c.id for c in conversations), max(c.id for c in conversations))
+        windows = [(f.session_started_at, f.session_ended_at) for f in fragments if f.first_conversation_id is None]
+        return ([(f.fragment_json, f.conversation_lines, f.session_started_at, f.session_ended_at) for f in fragments],
+                covered, windows, [(c.id, c.speaker, c.message, c.created_at) for c in conversations])
+    finally:
+        db.close()
+
+def _uncovered(conversations: list[tuple], covered: list[tuple[int, int]],
+               windows: list[tuple[datetime, datetime]]) -> list[tuple]:
+    """
+    어느 조각에도 담기지 않은 대화 (조각 생성에 실패한 세션 등). 조각의 대화 id 범위로 판단하고,
+    id 범위가 없는 조각(배포 전 세션)만 세션 시각으로 판단합니다.
+    """
+    return [
+        conversation for conversation in conversations
+        if not any(first <= conversation[0] <= last for first, last in covered)
+        and not (conversation[3] is not None and any(
+            start - SESSION_WINDOW_SLACK <= conversation[3] <= end + SESSION_WINDOW_SLACK for start, end in windows))
+    ]
+
+def _text_lines(conversations: list[tuple]) -> list[str]:
+    return [f"{'사용자' if speaker == 'user' else 'AI'}: {message}" for _, speaker, message, _ in conversations]
+
+async def build_daily_report(user_id: str, target_date: date, full: bool = False) -> dict | None:
+    """
+    하루치 리포트를 만듭니다. 조각이 있으면 합치고, 조각에 담기지 않은 대화만 추가로 분석합니다.
+    full=True거나 조각이 하나도 없으면 예전처럼 하루 대화 전체를 한 번에 분석합니다.
+    """
+    fragments, covered, windows, conversations = await asyncio.to_thread(_load_day, user_id, target_date)
+    # 그날 조각이 없어도 다음 날로 넘어간 세션의 조각에 담긴 대화는 다시 분석하지 않습니다.
+    if full or not (fragments or covered):
+        if not conversations:
+            return None
+        report = await ai_service.generate_summary_report("\n".join(_text_lines(conversations)))
+        if report:
+            REPORTS_MERGED.inc(mode="full")
+        return report
+
+    uncovered = _uncovered(conversations, covered, windows)
+    leftover = _text_lines(uncovered)
+    if _has_user_turn(leftover):
+        logger.info(f"[{user_id}] {target_date} 조각에 담기지 않은 대화 {len(leftover)}줄을 분석합니다.")
+        first = min((c[3] for c in uncovered if c[3] is not None), default=datetime.combine(target_date, datetime.min.time()))
+        last = max((c[3] for c in uncovered if c[3] is not None), default=first)
+        # 세션 ID는 날짜별로 고정해 다시 실행해도 같은 보충 조각을 두 번 저장하지 않습니다.
+        session_id = f"catchup-{uuid.uuid5(uuid.NAMESPACE_URL, f'{user_id}/{target_date}').hex}"
+        fragment = await ai_service.generate_summary_report("\n".join(leftover))
+        if fragment:
+            # 보충 조각은 이 대화들의 id 범위를 담습니다. (범위 안의 나머지 대화는 이미 다른 조각에 담겨 있습니다.)
+            await asyncio.to_thread(_save, user_id, session_id, target_date, fragment, len(leftover), first, last,
+                                    min(c[0] for c in uncovered), max(c[0] for c in uncovered))
+            fragments.append((fragment, len(leftover), first, last))
+            fragments.sort(key=lambda f: f[3])
+        else:
+            logger.warning(f"[{user_id}] {target_date} 보충 분석 실패, 조각만으로 리포트를 만듭니다.")
+
+    if not fragments:
+        return None  # 그날 대화가 모두 다음 날 조각에 담겼습니다.
+    REPORTS_MERGED.inc(mode="merged")
+    return merge_fragments([f[0] for f in fragments], [f[1] for f in fragments])
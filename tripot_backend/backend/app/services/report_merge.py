@@ -0,0 +1,131 @@
+# app/services/report_merge.py
+# report_prompts.json 형식의 부분 리포트 여러 개를 최종 리포트 하나로 합치는 규칙 (LLM 없이, 항상 같은 결과)
+#
+# 세션별 리포트 조각을 하루치로 합칠 때와, 긴 대화를 나눠 분석한 결과를 합칠 때 함께 씁니다.
+# 부분 리포트는 시간순으로 넘기며, 뒤쪽(나중 대화)의 구체적인 내용이 앞쪽보다 우선합니다.
+
+from collections import Counter
+
+MEAL_TIMES = ("아침", "점심", "저녁")
+EMOTION_LABELS = ("긍정적", "부정적", "보통")
+# '알 수 없음'류의 답은 다른 부분의 구체적인 답보다 뒤로 밀립니다.
+UNINFORMATIVE_MARKERS = ("언급 없", "언급이 없", "언급되지 않", "알 수 없", "해당 없음", "정보 없")
+MAX_KEYWORDS = 10
+MAX_ANALYSIS_KEYWORDS = 5
+MAX_TOPICS = 3
+
+def _section(fragment: dict, key: str) -> dict:
+    value = fragment.get(key)
+    return value if isinstance(value, dict) else {}
+
+def _items(value) -> list:
+    return value if isinstance(value, list) else []
+
+def _unique(values) -> list:
+    """순서를 유지하며 빈 값과 중복을 뺍니다."""
+    seen, result = set(), []
+    for value in values:
+        key = value.strip() if isinstance(value, str) else value
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        result.append(key)
+    return result
+
+def _top_keywords(lists: list[list], limit: int) -> list[str]:
+    """여러 부분에 자주 나온 키워드부터, 같으면 먼저 나온 순서로"""
+    counts = Counter()
+    first_seen = {}
+    for keywords in lists:
+        for keyword in _unique(k for k in keywords if isinstance(k, str)):
+            counts[keyword] += 1
+            first_seen.setdefault(keyword, len(first_seen))
+    return sorted(counts, key=lambda k: (-counts[k], first_seen[k]))[:limit]
+
+def _is_informative(text) -> bool:
+    return isinstance(text, str) and bool(text.strip()) and not any(m in text for m in UNINFORMATIVE_MARKERS)
+
+def _latest_informative(values: list) -> str:
+    """가장 나중 부분의 구체적인 답, 없으면 가장 나중 답"""
+    for value in reversed(values):
+        if _is_informative(value):
+            return value.strip()
+    return next((v.strip() for v in reversed(values) if isinstance(v, str) and v.strip()), "")
+
+def _emotion_label(text: str) -> str | None:
+    positions = [(text.find(label), label) for label in EMOTION_LABELS if label in text]
+    return min(positions)[1] if positions else None
+
+def _merge_emotion(entries: list[tuple[str, int]]) -> str:
+    """대화 줄 수로 가중한 다수 평가를 고르고, 그 평가를 받은 가장 나중 부분의 설명을 씁니다."""
+    weights = Counter()
+    for text, lines in entries:
+        label = _emotion_label(text)
+        if label:
+            weights[label] += lines
+    if not weights:
+        return _latest_informative([text for text, _ in entries])
+    best = max(EMOTION_LABELS, key=lambda label: (weights[label], -EMOTION_LABELS.index(label)))
+    return next(text.strip() for text, _ in reversed(entries) if _emotion_label(text) == best)
+
+def _merge_meals(fragments: list[dict]) -> list[dict]:
+    """식사 시간마다 '있음'으로 언급된 가장 나중 부분의 항목을 씁니다."""
+    merged = []
+    for meal in MEAL_TIMES:
+        entries = [e for f in fragments for e in _items(f.get("식사_상태_추정"))
+                   if isinstance(e, dict) and e.get("식사_시간") == meal]
+        mentioned = [e for e in entries if str(e.get("언급_여부", "")).startswith("있음")]
+        chosen = (mentioned or entries or [None])[-1]
+        merged.append(dict(chosen) if chosen else
+                      {"식사_시간": meal, "언급_여부": "없음", "감정": "해당 없음", "세부_내용": ""})
+    return merged
+
+def _merge_items(fragments: list[dict]) -> list[dict]:
+    """같은 물품은 처음 나온 순서에 한 번만, 요약은 가장 나중 부분의 것으로"""
+    items: dict[str, dict] = {}
+    for fragment in fragments:
+        for entry in _items(fragment.get("요청_물품")):
+            name = entry.get("물품", "").strip() if isinstance(entry, dict) else ""
+            if name:
+                items[name] = {**items.get(name, {}), **entry, "물품": name}
+    return list(items.values())
+
+def _merge_topics(fragments: list[dict]) -> list[dict]:
+    """가장 나중 부분의 주제부터 겹치지 않게 최대 MAX_TOPICS개"""
+    topics, seen = [], set()
+    for fragment in reversed(fragments):
+        for entry in _items(fragment.get("자녀를_위한_추천_대화_주제")):
+            topic = entry.get("주제", "").strip() if isinstance(entry, dict) else ""
+            if topic and topic not in seen and len(topics) < MAX_TOPICS:
+                seen.add(topic)
+                topics.append(entry)
+    return topics
+
+def merge_fragments(fragments: list[dict], conversation_lines: list[int] | None = None) -> dict:
+    """
+    부분 리포트(시간순)를 report_prompts.json의 OUTPUT_FORMAT과 같은 구조의 리포트 하나로 합칩니다.
+    conversation_lines는 부분별 대화 줄 수로, 전반적 감정을 고를 때 가중치로 씁니다.
+    """
+    lines = conversation_lines or [1] * len(fragments)
+    daily = [_section(f, "일일_대화_요약") for f in fragments]
+    answers = [_section(d, "매일_묻는_질문_응답") for d in daily]
+    state = [_section(f, "감정_신체_상태") for f in fragments]
+    answer_keys = _unique(key for a in answers for key in a) or ["오늘_기분_상태", "수면_상태", "약_복용_상태"]
+
+    return {
+        "일일_대화_요약": {
+            "요약": " ".join(_unique(d.get("요약") for d in daily if isinstance(d.get("요약"), str))),
+            "강조 키워드": _top_keywords([_items(d.get("강조 키워드")) for d in daily], MAX_KEYWORDS),
+            "구체적_언급": _unique(m for d in daily for m in _items(d.get("구체적_언급")) if isinstance(m, str)),
+            "매일_묻는_질문_응답": {key: _latest_informative([a.get(key) for a in answers]) for key in answer_keys},
+        },
+        "키워드_분석": _top_keywords([_items(f.get("키워드_분석")) for f in fragments], MAX_ANALYSIS_KEYWORDS),
+        "감정_신체_상태": {
+            "전반적_감정": _merge_emotion([(s.get("전반적_감정"), n) for s, n in zip(state, lines)
+                                     if isinstance(s.get("전반적_감정"), str)]),
+            "건강_언급": _unique(m for s in state for m in _items(s.get("건강_언급")) if isinstance(m, str)),
+        },
+        "식사_상태_추정": _merge_meals(fragments),
+        "요청_물품": _merge_items(fragments),
+        "자녀를_위한_추천_대화_주제": _merge_topics(fragments),
+    }
@@ -1,55 +1,78 @@
 # app/services/report_service.py
 
+import logging
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
 import json
-import pandas as pd
 
 from app.db import crud
+from app.core.time_utils import today_kst
+from app.services.daily_question_cache import daily_question_cache
+from app.services.report_cache import report_cache, HOME, DETAIL
+
+logger = logging.getLogger(__name__)
 
 # --- Public Functions ---
 
 def get_home_screen_report(db: Session, user_id_str: str) -> dict:
     """
-    사용자 ID로 최신 리포트를 조회하여 HomeScreen에 맞는 간략한 형태로 반환합니다.
+    사용자 ID로 최신 리포트를 조회하여 HomeScreen에 맞는 간략한 형태로 반환합니다. (캐시된 응답 우선)
+    """
+    return report_cache.get_or_render(user_id_str, HOME, lambda: _render_home_screen_report(db, user_id_str))
+
+def get_full_report(db: Session, user_id_str: str) -> dict:
+    """
+    최신 리포트와 인지 퀴즈 결과를 종합하여 ReportScreen에 맞는 상세 형태로 반환합니다. (캐시된 응답 우선)
     """
+    return report_cache.get_or_render(user_id_str, DETAIL, lambda: _render_full_report(db, user_id_str))
+
+def refresh_reports(db: Session, user_id_str: str) -> dict:
+    """캐시를 비우고 홈/상세 응답을 바로 다시 만듭니다. (리포트를 다시 생성한 뒤 즉시 반영할 때)"""
+    report_cache.invalidate(user_id_str)
+    return {"home": get_home_screen_report(db, user_id_str), "detail": get_full_report(db, user_id_str)}
+
+# --- Helper Functions (Private) ---
+
+def _render_home_screen_report(db: Session, user_id_str: str) -> tuple[dict, date | None]:
     latest_summary = crud.get_latest_summary(db, user_id_str)
     
     if not latest_summary or not latest_summary.summary_json:
-        print(f"❌ 홈스크린 요약 데이터를 찾을 수 없습니다: {user_id_str}")
-        return _get_default_home_summary_data()
+        logger.warning(f"홈스크린 요약 데이터를 찾을 수 없습니다: {user_id_str}")
+        return _get_default_home_summary_data(), None
         
     summary_data = latest_summary.summary_json
     report_date = latest_summary.report_date
 
-    return _transform_summary_to_homescreen(summary_data, report_date)
+    return _transform_summary_to_homescreen(summary_data, report_date), report_date
 
-def get_full_report(db: Session, user_id_str: str) -> dict:
-    """
-    최신 리포트와 인지 퀴즈 결과를 종합하여 ReportScreen에 맞는 상세 형태로 반환합니다.
-    """
+def _render_full_report(db: Session, user_id_str: str) -> tuple[dict, date]:
     # 1. 최신 대화 요약 리포트 가져오기
     latest_summary = crud.get_latest_summary(db, user_id_str)
     
     summary_data = {}
-    report_date = date.today() # 기본값
+    report_date = today_kst() # 기본값
 
     if not latest_summary or not latest_summary.summary_json:
-        print(f"❌ 상세 리포트의 대화 요약 데이터를 찾을 수 없습니다: {user_id_str}")
+        logger.warning(f"상세 리포트의 대화 요약 데이터를 찾을 수 없습니다: {user_id_str}")
         summary_data = _get_default_full_report_data() # 대화 요약 부분만 기본값으로 채움
     else:
-        summary_data = latest_summary.summary_json
+        # ORM 객체의 JSON을 직접 고치지 않도록 복사해서 씁니다. (캐시된 응답과 분리)
+        summary_data = json.loads(json.dumps(latest_summary.summary_json))
         report_date = latest_summary.report_date
 
     # 2. '오늘의 질문' 내용 가져오기
-    daily_qa = crud.get_daily_question(db, report_date)
+    daily_qa = daily_question_cache.get(db, report_date)
     if daily_qa:
         # summary_data에 '오늘의 질문/답변' 필드 추가 또는 업데이트
         if "일일_대화_요약" not in summary_data: summary_data["일일_대화_요약"] = {}
         if "매일_묻는_질문_응답" not in summary_data["일일_대화_요약"]: summary_data["일일_대화_요약"]["매일_묻는_질문_응답"] = {}
         
+        answer_texts = crud.get_daily_qa_answer_texts(db, daily_qa)
+        elderly_answers = answer_texts.get(crud.ELDERLY_ROLE, [])
+
         summary_data["일일_대화_요약"]["매일_묻는_질문_응답"]["오늘_질문"] = daily_qa.question_text
-        summary_data["일일_대화_요약"]["매일_묻는_질문_응답"]["오늘_답변"] = daily_qa.elderly_answer_content or "답변 없음"
+        summary_data["일일_대화_요약"]["매일_묻는_질문_응답"]["오늘_답변"] = "\n".join(elderly_answers) or "답변 없음"
+        summary_data["일일_대화_요약"]["매일_묻는_질문_응답"]["가족_답변"] = answer_texts.get(crud.FAMILY_ROLE, [])
 
     # 3. 최근 7일간의 인지 퀴즈 결과 데이터 가져오고 가공하기
     cognitive_data = _process_cognitive_data(db, user_id_str, days_back=7)
@@ -58,13 +81,11 @@ def get_full_report(db: Session, user_id_str: str) -> dict:
     summary_data["리포트_날짜"] = str(report_date)
     summary_data["인지상태_평가"] = cognitive_data
     
-    return summary_data
-
-# --- Helper Functions (Private) ---
+    return summary_data, report_date
 
 def _process_cognitive_data(db: Session, user_id_str: str, days_back: int) -> dict:
     """DB에서 퀴즈 결과를 가져와 통계를 계산하고 가공합니다."""
-    end_date = date.today()
+    end_date = today_kst()
     start_date = end_date - timedelta(days=days_back)
     
     # crud를 통해 퀴즈 결과와 주제를 함께 가져옴
@@ -73,6 +94,7 @@ def _process_cognitive_data(db: Session, user_id_str: str, days_back: int) -> di
     if not results:
         return _get_default_cognitive_report_data()
 
+    import pandas as pd  # 임포트 비용이 커서 인지 리포트를 만들 때만 불러옵니다.
     df_results = pd.DataFrame(results, columns=['is_correct', 'topic'])
     
     total_quizzes_count = len(df_results)
@@ -124,7 +146,7 @@ def _transform_summary_to_homescreen(summary_data: dict, report_date: date) -> d
             ]
         }
     except Exception as e:
-        print(f"❌ 홈스크린 데이터 변환 중 오류: {e}")
+        logger.error(f"홈스크린 데이터 변환 중 오류: {e}")
         return _get_default_home_summary_data()
 
 # --- Default Data Functions (Private) ---
@@ -133,7 +155,7 @@ def _get_default_home_summary_data() -> dict:
     """데이터가 없을 때 반환할 HomeScreen용 기본 리포트"""
     # (이전 코드의 _get_default_report_data 함수 내용과 동일)
     return {
-        "name": "어르신", "report_date": str(date.today()),
+        "name": "어르신", "report_date": str(today_kst()),
         "status": {"mood": "정보 없음", "condition": "정보 없음", "last_activity": "정보 없음", "needs": "정보 없음"},
         "stats": {"contact": 0, "visit": 0, "Youtubeed": 0},
         "ranking": []
@@ -142,7 +164,7 @@ def _get_default_home_summary_data() -> dict:
 def _get_default_full_report_data() -> dict:
     """데이터가 없을 때 반환할 전체 리포트용 기본 구조"""
     return {
-        "어르신_ID": "정보 없음", "요청_물품": [], "리포트_날짜": str(date.today()),
+        "어르신_ID": "정보 없음", "요청_물품": [], "리포트_날짜": str(today_kst()),
         "키워드_분석": [], "감정_신체_상태": {"건강_언급": [], "전반적_감정": "정보 없음"},
         "식사_상태_추정": [], "일일_대화_요약": {"요약": "대화 요약 정보가 없습니다.", "강조_키워드": []},
         "자녀를_위한_추천_대화_주제": []
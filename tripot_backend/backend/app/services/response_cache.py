@@ -0,0 +1,182 @@
+# app/services/response_cache.py
+# 짧고 정형화된 발화("네", "잘 잤어요" 등)에 대한 AI 응답을 임베딩 유사도로 재사용하는 캐시
+#
+# 설정(RESPONSE_CACHE_ENABLED)으로 켜야 동작합니다.
+# - 키: 발화 임베딩 + 프롬프트 버전(페르소나/모델이 바뀌면 예전 응답은 자동으로 무시됩니다.)
+# - 범위: 기억이 응답에 쓰인 경우 해당 사용자 전용, 아니면 모든 사용자 공용
+# - 한 항목에 여러 응답(variant)을 모아 두고 번갈아 돌려주어 같은 말만 반복하지 않게 합니다.
+
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core import metrics
+from app.core.config import settings
+
+GLOBAL_SCOPE = "*"
+
+class _CacheEntry:
+    __slots__ = ("scope", "embedding", "replies", "created_at", "last_reply")
+
+    def __init__(self, scope: tuple[str, str], embedding: np.ndarray, reply: str):
+        self.scope = scope
+        self.embedding = embedding
+        self.replies = [reply]
+        self.created_at = time.monotonic()
+        self.last_reply: str | None = None
+
+class SemanticResponseCache:
+    """임베딩 코사인 유사도 기반 응답 캐시 (TTL + LRU, 범위별 NumPy 행렬 검색)"""
+    def __init__(self, enabled: bool, similarity_threshold: float, ttl_seconds: float,
+                 max_entries: int, max_utterance_chars: int, variants: int):
+        self.enabled = enabled
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_utterance_chars = max_utterance_chars
+        self.variants = variants
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._next_id = 0
+        # scope -> (entry id 목록, 정규화된 임베딩 행렬). 항목이 바뀌면 해당 범위만 다시 만듭니다.
+        self._matrices: dict[tuple[str, str], tuple[list[int], np.ndarray]] = {}
+        self._stats = {"hits": 0, "misses": 0, "fills": 0, "stores": 0, "evictions": 0, "skipped": 0}
+        self._saved_seconds = 0.0
+        self._avg_miss_seconds = 0.0
+
+    # --- 조회/저장 ---
+    def is_cacheable(self, utterance: str) -> bool:
+        """캐시를 쓸 만큼 짧은 발화인지 확인합니다."""
+        if not self.enabled:
+            return False
+        compact = re.sub(r"[\s\W_]+", "", utterance)
+        cacheable = 0 < len(compact) <= self.max_utterance_chars
+        if not cacheable:
+            with self._lock:
+                self._stats["skipped"] += 1
+        return cacheable
+
+    def lookup(self, user_id: str, embedding: list[float], prompt_version: str) -> str | None:
+        """
+        사용자 전용 범위, 공용 범위 순서로 비슷한 발화를 찾아 저장된 응답 중 하나를 돌려줍니다.
+        응답 변형이 아직 다 모이지 않은 항목은 새 응답을 받아 채우도록 None을 반환합니다.
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._evict_expired()
+            for scope in ((prompt_version, user_id), (prompt_version, GLOBAL_SCOPE)):
+                entry = self._find(scope, vector)
+                if entry is None:
+                    continue
+                if len(entry.replies) < self.variants:
+                    self._stats["fills"] += 1
+                    return None
+                self._stats["hits"] += 1
+                self._saved_seconds += self._avg_miss_seconds
+                return self._pick_reply(entry)
+            self._stats["misses"] += 1
+            return None
+
+    def store(self, user_id: str | None, embedding: list[float], reply: str, prompt_version: str, elapsed_seconds: float):
+        """
+        새 응답을 저장합니다. user_id를 주면 해당 사용자 전용(기억이 반영된 응답)으로, None이면 공용으로 저장합니다.
+        비슷한 발화가 이미 있으면 새 항목 대신 응답 변형으로 추가합니다.
+        """
+        scope = (prompt_version, user_id or GLOBAL_SCOPE)
+        vector = self._normalize(embedding)
+        with self._lock:
+            # 캐시 미스에 걸린 평균 시간 (적중 시 절약된 시간 추정에 사용)
+            self._avg_miss_seconds = elapsed_seconds if not self._avg_miss_seconds else 0.8 * self._avg_miss_seconds + 0.2 * elapsed_seconds
+            self._stats["stores"] += 1
+
+            entry = self._find(scope, vector)
+            if entry is not None:
+                if reply not in entry.replies and len(entry.replies) < self.variants:
+                    entry.replies.append(reply)
+                return
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _CacheEntry(scope, vector, reply)
+            self._matrices.pop(scope, None)
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._matrices.pop(evicted.scope, None)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"] + self._stats["fills"]
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "estimated_seconds_saved": round(self._saved_seconds, 3),
+            }
+
+    # --- 내부 도우미 (잠금을 잡은 상태에서 호출) ---
+    @staticmethod
+    def _normalize(embedding: list[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _find(self, scope: tuple[str, str], vector: np.ndarray) -> _CacheEntry | None:
+        cached = self._matrices.get(scope)
+        if cached is None:
+            ids = [entry_id for entry_id, entry in self._entries.items() if entry.scope == scope]
+            if not ids:
+                return None
+            cached = self._matrices[scope] = (ids, np.stack([self._entries[entry_id].embedding for entry_id in ids]))
+
+        ids, matrix = cached
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        entry_id = ids[best]
+        self._entries.move_to_end(entry_id)
+        return self._entries[entry_id]
+
+    def _pick_reply(self, entry: _CacheEntry) -> str:
+        choices = [reply for reply in entry.replies if reply != entry.last_reply] or entry.replies
+        entry.last_reply = random.choice(choices)
+        return entry.last_reply
+
+    def _evict_expired(self):
+        deadline = time.monotonic() - self.ttl_seconds
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry.created_at < deadline]
+        for entry_id in expired:
+            self._matrices.pop(self._entries.pop(entry_id).scope, None)
+            self._stats["evictions"] += 1
+
+# 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
+response_cache = SemanticResponseCache(
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+    similarity_threshold=settings.RESPONSE_CACHE_SIMILARITY,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_utterance_chars=settings.RESPONSE_CACHE_MAX_UTTERANCE_CHARS,
+    variants=settings.RESPONSE_CACHE_VARIANTS,
+)
+
+# /metrics에 캐시 통계를 함께 노출합니다. 누적 횟수는 카운터, 현재 항목 수는 게이지입니다.
+for _stat in ("hits", "misses", "fills", "stores", "evictions", "skipped", "estimated_seconds_saved"):
+    metrics.registry.counter(
+        f"tripot_response_cache_{_stat}_total", f"짧은 발화 응답 캐시 {_stat} (누적)",
+        callback=lambda stat=_stat: response_cache.stats()[stat],
+    )
+metrics.registry.gauge(
+    "tripot_response_cache_entries", "짧은 발화 응답 캐시 항목 수",
+    callback=lambda: response_cache.stats()["entries"])
@@ -0,0 +1,212 @@
+# app/services/senior_session.py
+# 어르신 대화 세션의 수명 관리 (세션 저장소에 상태를 보관하고, 재접속하면 이어서 진행)
+#
+# - 턴이 끝날 때마다 퀴즈 진행 상태와 대화 로그를 세션 저장소에 저장합니다.
+# - 연결이 끊기면 바로 요약하지 않고 '끊김' 표시만 남깁니다. 유예 시간(SESSION_RESUME_GRACE_SECONDS) 안에
+#   같은 사용자가 다시 접속하면 (다른 워커여도) 퀴즈와 대화 맥락을 그대로 이어 갑니다.
+# - 유예 시간이 지나도 돌아오지 않은 세션만 정리 작업(SessionFinalizer)이 가져가 기억(Pinecone)으로 요약하고,
+#   그 세션의 리포트 조각을 백그라운드에서 만듭니다. (밤의 리포트 작업은 조각을 합치기만 합니다.)
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from app.core import metrics
+from app.core.config import settings
+from app.services import ai_service, report_fragments, vector_db_service
+from app.services.connection_manager import manager
+from app.services.quiz_bank import quiz_bank
+from app.services.quiz_manager import QuizManager
+from app.services.session_store import session_store, MemorySessionStore
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_FILE_PATH = os.path.join(settings.PROMPTS_DIR, 'quiz_prompts.json')
+
+# 끊김 표시 없이 이 시간 넘게 갱신되지 않은 세션은 워커가 비정상 종료된 것으로 보고 정리합니다.
+ORPHANED_SESSION_SECONDS = 2 * 60 * 60
+# 서버 종료 시 만들고 있던 리포트 조각을 기다리는 최대 시간
+FRAGMENT_SHUTDOWN_WAIT_SECONDS = 30
+
+SESSIONS_OPENED = metrics.registry.counter(
+    "tripot_senior_sessions_total", "어르신 대화 세션 시작 수 (new: 새 세션, resumed: 재접속으로 이어 감)", ["outcome"])
+SESSIONS_FINALIZED = metrics.registry.counter(
+    "tripot_senior_sessions_finalized_total", "기억 요약까지 마친 세션 수", ["reason"])
+
+class SeniorSession:
+    """어르신 한 명의 대화 세션 (퀴즈 진행 상태 + 기억 요약용 대화 로그)"""
+    __slots__ = ("user_id", "session_id", "quiz_manager", "conversation_log", "started_at",
+                 "first_conversation_id", "last_conversation_id")
+
+    def __init__(self, user_id: str, conversation_log: list[str] | None = None, started_at: float | None = None,
+                 session_id: str | None = None):
+        self.user_id = user_id
+        self.session_id = session_id or uuid.uuid4().hex  # 재접속으로 이어 가도 같은 세션 (리포트 조각 단위)
+        self.quiz_manager = QuizManager(quiz_bank, PROMPTS_FILE_PATH, ai_service)
+        self.conversation_log: list[str] = conversation_log or []
+        self.started_at = started_at or time.time()
+        # 이 세션이 conversations 테이블에 저장한 행의 id 범위 (리포트 조각이 어느 대화를 담았는지)
+        self.first_conversation_id: int | None = None
+        self.last_conversation_id: int | None = None
+
+    def add_conversation_ids(self, first_id: int, last_id: int):
+        if self.first_conversation_id is None:
+            self.first_conversation_id = first_id
+        self.last_conversation_id = last_id
+
+    def to_state(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "quiz": self.quiz_manager.to_state(),
+            "conversation_log": self.conversation_log,
+            "started_at": self.started_at,
+            "first_conversation_id": self.first_conversation_id,
+            "last_conversation_id": self.last_conversation_id,
+            "updated_at": time.time(),
+            "disconnected_at": None,
+            "finalize_token": None,
+        }
+
+    @classmethod
+    def from_state(cls, user_id: str, state: dict) -> "SeniorSession":
+        session = cls(user_id, list(state.get("conversation_log") or []), state.get("started_at"), state.get("session_id"))
+        session.first_conversation_id = state.get("first_conversation_id")
+        session.last_conversation_id = state.get("last_conversation_id")
+        if state.get("quiz"):
+            session.quiz_manager.restore_state(state["quiz"])
+        return session
+
+async def open_session(user_id: str) -> tuple[SeniorSession, bool]:
+    """
+    저장된 세션이 유예 시간 안에 끊긴 것이면 이어받고, (세션, True)를 반환합니다.
+    유예 시간이 지난 세션이 남아 있으면 먼저 마무리(요약)한 뒤 새 세션을 시작합니다.
+    """
+    state = await asyncio.to_thread(session_store.get, user_id)
+    if state is not None:
+        last_seen = state.get("disconnected_at") or state.get("updated_at") or 0
+        if time.time() - last_seen <= settings.SESSION_RESUME_GRACE_SECONDS:
+            session = SeniorSession.from_state(user_id, state)
+            # 끊김 표시를 지워 다른 워커의 정리 작업이 이 세션을 가져가지 못하게 합니다.
+            await save(session)
+            SESSIONS_OPENED.inc(outcome="resumed")
+            logger.info(f"[{user_id}] 이전 세션을 이어 갑니다. (대화 {len(session.conversation_log)}줄)")
+            return session, True
+        await _finalize(user_id, state.get("finalize_token"), reason="stale_on_connect")
+
+    SESSIONS_OPENED.inc(outcome="new")
+    return SeniorSession(user_id), False
+
+async def save(session: SeniorSession):
+    """현재 상태를 세션 저장소에 저장합니다."""
+    await asyncio.to_thread(session_store.put, session.user_id, session.to_state(), settings.SESSION_TTL_SECONDS)
+
+async def mark_disconnected(session: SeniorSession):
+    """연결이 끊긴 세션에 끊김 표시를 남깁니다. 요약은 유예 시간이 지난 뒤 정리 작업이 합니다."""
+    state = session.to_state()
+    state["disconnected_at"] = time.time()
+    state["finalize_token"] = uuid.uuid4().hex
+    await asyncio.to_thread(session_store.put, session.user_id, state, settings.SESSION_TTL_SECONDS)
+
+_fragment_tasks: set[asyncio.Task] = set()
+
+async def _create_report_fragment(user_id: str, state: dict):
+    try:
+        await report_fragments.create_fragment(
+            user_id, state.get("session_id") or uuid.uuid4().hex, state.get("conversation_log") or [],
+            started_at=state.get("started_at") or time.time(),
+            ended_at=state.get("disconnected_at") or state.get("updated_at") or time.time(),
+            first_conversation_id=state.get("first_conversation_id"),
+            last_conversation_id=state.get("last_conversation_id"),
+        )
+    except Exception as e:
+        logger.error(f"[{user_id}] 세션 리포트 조각 저장 실패: {e}")
+
+def schedule_report_fragment(user_id: str, state: dict):
+    """세션 리포트 조각 생성을 백그라운드로 넘깁니다. (접속 처리나 정리 작업이 LLM 호출을 기다리지 않게)"""
+    if not state.get("conversation_log"):
+        return
+    task = asyncio.create_task(_create_report_fragment(user_id, state))
+    _fragment_tasks.add(task)
+    task.add_done_callback(_fragment_tasks.discard)
+
+async def _finalize(user_id: str, finalize_token: str | None, reason: str) -> bool:
+    """세션을 저장소에서 가져가고(다른 워커와 겹치지 않게 원자적으로) 대화 로그를 기억으로 요약합니다."""
+    state = await asyncio.to_thread(session_store.claim, user_id, finalize_token)
+    if state is None:
+        return False  # 그사이 재접속했거나 다른 워커가 이미 가져갔습니다.
+
+    session_log = state.get("conversation_log") or []
+    if session_log:
+        try:
+            await vector_db_service.create_memory_for_pinecone(user_id, session_log)
+        except Exception as e:
+            logger.error(f"[{user_id}] 세션 기억 저장 실패: {e}")
+        schedule_report_fragment(user_id, state)
+    SESSIONS_FINALIZED.inc(reason=reason)
+    logger.info(f"[{user_id}] 세션을 마무리했습니다. ({reason}, 대화 {len(session_log)}줄)")
+    return True
+
+async def finalize_idle_sessions(force: bool = False) -> int:
+    """
+    유예 시간이 지나도 재접속하지 않은 세션(과 비정상 종료로 남은 세션)을 마무리하고, 마무리한 수를 반환합니다.
+    force=True면 시간과 무관하게 이 워커에 연결되지 않은 모든 세션을 마무리합니다. (메모리 저장소의 서버 종료 시)
+    """
+    now = time.time()
+    finalized = 0
+    for user_id in await asyncio.to_thread(session_store.user_ids):
+        if not force and user_id in manager.active_connections:
+            continue
+        state = await asyncio.to_thread(session_store.get, user_id)
+        if state is None:
+            continue
+        disconnected_at = state.get("disconnected_at")
+        if force:
+            reason = "shutdown"
+        elif disconnected_at is not None and now - disconnected_at >= settings.SESSION_RESUME_GRACE_SECONDS:
+            reason = "grace_expired"
+        elif disconnected_at is None and now - state.get("updated_at", 0) >= ORPHANED_SESSION_SECONDS:
+            reason = "orphaned"
+        else:
+            continue
+        if await _finalize(user_id, state.get("finalize_token"), reason):
+            finalized += 1
+    return finalized
+
+class SessionFinalizer:
+    """유예 시간이 지난 세션을 주기적으로 마무리하는 백그라운드 작업"""
+    def __init__(self):
+        self.is_running = False
+
+    async def start(self):
+        if self.is_running: return
+        self.is_running = True
+        interval = max(5, min(30, settings.SESSION_RESUME_GRACE_SECONDS / 4))
+        logger.info(f"세션 정리 작업 시작 (유예 시간 {settings.SESSION_RESUME_GRACE_SECONDS}초, {interval:.0f}초마다 확인)")
+        while self.is_running:
+            await asyncio.sleep(interval)
+            try:
+                await finalize_idle_sessions()
+            except Exception as e:
+                logger.error(f"세션 정리 중 오류 발생: {e}")
+
+    async def stop(self):
+        """
+        정리 작업을 멈춥니다. 메모리 저장소는 재시작하면 사라지므로 남은 세션을 모두 마무리합니다.
+        만들고 있던 리포트 조각도 잠시 기다립니다. (못 만든 세션은 밤 작업이 다시 분석합니다.)
+        """
+        self.is_running = False
+        if isinstance(session_store, MemorySessionStore):
+            count = await finalize_idle_sessions(force=True)
+            if count:
+                logger.info(f"서버 종료 전에 세션 {count}개를 마무리했습니다.")
+        if _fragment_tasks:
+            await asyncio.wait(list(_fragment_tasks), timeout=FRAGMENT_SHUTDOWN_WAIT_SECONDS)
+
+# 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
+session_finalizer = SessionFinalizer()
+
+metrics.registry.gauge(
+    "tripot_senior_sessions_stored", "세션 저장소에 남아 있는 세션 수 (연결 중 + 재접속 대기 중)",
+    callback=lambda: len(session_store.user_ids()))
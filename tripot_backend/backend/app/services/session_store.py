@@ -0,0 +1,190 @@
+# app/services/session_store.py
+# 어르신 대화 세션 상태(퀴즈 진행 상태, 대화 로그)를 보관하는 저장소
+#
+# SESSION_STORE_BACKEND 설정으로 고릅니다.
+# - "memory": 프로세스 내 딕셔너리 (워커 하나일 때, 재시작하면 사라짐)
+# - "sqlite": SQLite 파일 (같은 호스트의 여러 워커가 공유)
+# - "redis":  Redis 호환 서버 (여러 호스트가 공유, redis 패키지 필요)
+# 상태는 JSON 직렬화 가능한 딕셔너리이며, 모든 항목에는 TTL이 있습니다.
+# claim()은 '연결이 끊긴 뒤 아무도 이어받지 않은' 세션을 정확히 한 번만 가져가기 위한 원자적 조회+삭제입니다.
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class SessionStore:
+    """세션 저장소 인터페이스 (모든 메서드는 블로킹이며 짧게 끝납니다.)"""
+    def get(self, user_id: str) -> dict | None:
+        raise NotImplementedError
+
+    def put(self, user_id: str, state: dict, ttl_seconds: float):
+        raise NotImplementedError
+
+    def delete(self, user_id: str):
+        raise NotImplementedError
+
+    def claim(self, user_id: str, finalize_token: str | None) -> dict | None:
+        """상태의 finalize_token이 주어진 값과 같을 때만 삭제하고 그 상태를 반환합니다."""
+        raise NotImplementedError
+
+    def user_ids(self) -> list[str]:
+        """저장된(만료되지 않은) 세션의 사용자 ID 목록"""
+        raise NotImplementedError
+
+class MemorySessionStore(SessionStore):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: dict[str, tuple[float, str]] = {}  # user_id -> (만료 시각, JSON)
+
+    def _load(self, user_id: str) -> dict | None:
+        item = self._items.get(user_id)
+        if item is None:
+            return None
+        if item[0] <= time.time():
+            del self._items[user_id]
+            return None
+        return json.loads(item[1])
+
+    def get(self, user_id: str) -> dict | None:
+        with self._lock:
+            return self._load(user_id)
+
+    def put(self, user_id: str, state: dict, ttl_seconds: float):
+        # 다른 저장소와 똑같이 동작하도록 메모리에서도 JSON으로 직렬화해 보관합니다.
+        data = json.dumps(state, ensure_ascii=False)
+        with self._lock:
+            self._items[user_id] = (time.time() + ttl_seconds, data)
+
+    def delete(self, user_id: str):
+        with self._lock:
+            self._items.pop(user_id, None)
+
+    def claim(self, user_id: str, finalize_token: str | None) -> dict | None:
+        with self._lock:
+            state = self._load(user_id)
+            if state is None or state.get("finalize_token") != finalize_token:
+                return None
+            del self._items[user_id]
+            return state
+
+    def user_ids(self) -> list[str]:
+        now = time.time()
+        with self._lock:
+            return [user_id for user_id, (expires_at, _) in self._items.items() if expires_at > now]
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 스레드마다 연결을 하나씩 둡니다. (asyncio.to_thread의 워커 스레드에서 호출되며, 처음 쓸 때 파일을 엽니다.)
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS senior_sessions ("
+                "user_id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def get(self, user_id: str) -> dict | None:
+        row = self._connect().execute(
+            "SELECT data FROM senior_sessions WHERE user_id = ? AND expires_at > ?", (user_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, user_id: str, state: dict, ttl_seconds: float):
+        self._connect().execute(
+            "INSERT INTO senior_sessions (user_id, data, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+            (user_id, json.dumps(state, ensure_ascii=False), time.time() + ttl_seconds),
+        )
+
+    def delete(self, user_id: str):
+        self._connect().execute("DELETE FROM senior_sessions WHERE user_id = ?", (user_id,))
+
+    def claim(self, user_id: str, finalize_token: str | None) -> dict | None:
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT data FROM senior_sessions WHERE user_id = ? AND expires_at > ?", (user_id, time.time())
+            ).fetchone()
+            state = json.loads(row[0]) if row else None
+            if state is None or state.get("finalize_token") != finalize_token:
+                connection.execute("COMMIT")
+                return None
+            connection.execute("DELETE FROM senior_sessions WHERE user_id = ?", (user_id,))
+            connection.execute("COMMIT")
+            return state
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def user_ids(self) -> list[str]:
+        connection = self._connect()
+        connection.execute("DELETE FROM senior_sessions WHERE expires_at <= ?", (time.time(),))
+        return [row[0] for row in connection.execute("SELECT user_id FROM senior_sessions")]
+
+# finalize_token이 같을 때만 지우고 값을 돌려주는 스크립트 (Redis 서버에서 원자적으로 실행)
+_REDIS_CLAIM_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if not value then return nil end
+local token = cjson.decode(value)['finalize_token']
+if token == nil or token == cjson.null then token = '' end
+if token ~= ARGV[1] then return nil end
+redis.call('DEL', KEYS[1])
+return value
+"""
+
+class RedisSessionStore(SessionStore):
+    def __init__(self, url: str, prefix: str = "tripot:senior_session:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("SESSION_STORE_BACKEND=redis를 쓰려면 redis 패키지를 설치해야 합니다.") from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._claim = self._client.register_script(_REDIS_CLAIM_SCRIPT)
+
+    def get(self, user_id: str) -> dict | None:
+        value = self._client.get(self.prefix + user_id)
+        return json.loads(value) if value else None
+
+    def put(self, user_id: str, state: dict, ttl_seconds: float):
+        self._client.set(self.prefix + user_id, json.dumps(state, ensure_ascii=False), ex=max(1, int(ttl_seconds)))
+
+    def delete(self, user_id: str):
+        self._client.delete(self.prefix + user_id)
+
+    def claim(self, user_id: str, finalize_token: str | None) -> dict | None:
+        value = self._claim(keys=[self.prefix + user_id], args=[finalize_token or ""])
+        return json.loads(value) if value else None
+
+    def user_ids(self) -> list[str]:
+        return [key[len(self.prefix):] for key in self._client.scan_iter(match=self.prefix + "*", count=500)]
+
+def create_session_store() -> SessionStore:
+    """설정(SESSION_STORE_BACKEND)에 맞는 세션 저장소를 만듭니다."""
+    backend = settings.SESSION_STORE_BACKEND
+    if backend == "sqlite":
+        logger.info(f"세션 상태를 SQLite({settings.SESSION_STORE_SQLITE_PATH})에 보관합니다.")
+        return SQLiteSessionStore(settings.SESSION_STORE_SQLITE_PATH)
+    if backend == "redis":
+        logger.info("세션 상태를 Redis에 보관합니다.")
+        return RedisSessionStore(settings.SESSION_STORE_REDIS_URL)
+    if backend != "memory":
+        raise ValueError(f"알 수 없는 SESSION_STORE_BACKEND입니다: {backend}")
+    return MemorySessionStore()
+
+# 다른 모든 파일에서 이 인스턴스를 공유하여 사용합니다.
+session_store = create_session_store()
@@ -0,0 +1,163 @@
+# app/services/token_budget.py
+# LLM 프롬프트의 토큰 수를 세고, 섹션 우선순위에 따라 입력 예산에 맞게 줄이는 모듈
+#
+# 섹션은 필수(페르소나, 규칙, 현재 발화 등)와 줄일 수 있는 것(기억, 예시, 대화 기록)으로 나뉩니다.
+# 예산을 넘으면 우선순위가 낮은 섹션부터 항목을 덜어 내고, 섹션별 사용 토큰을 로그로 남깁니다.
+
+import logging
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken이 없으면 글자 수 기반 추정치를 사용합니다.
+    tiktoken = None
+
+ENCODING_NAME = "o200k_base"  # gpt-4o 계열 토크나이저
+
+_encoding = None
+_encoding_checked = False
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    """토크나이저를 한 번만 불러옵니다. (인코딩 파일을 받을 수 없는 환경이면 추정치로 대체)"""
+    global _encoding, _encoding_checked
+    if _encoding_checked:
+        return _encoding
+    with _encoding_lock:
+        if not _encoding_checked:
+            if tiktoken is not None:
+                try:
+                    _encoding = tiktoken.get_encoding(ENCODING_NAME)
+                except Exception as e:
+                    logger.warning(f"tiktoken 인코딩 로드 실패, 추정치로 토큰을 계산합니다: {e}")
+            _encoding_checked = True
+    return _encoding
+
+_HANGUL = re.compile(r"[가-힣]")
+
+def count_tokens(text: str) -> int:
+    """텍스트의 토큰 수를 반환합니다."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # 추정치: 한글은 대략 음절당 1토큰, 그 밖의 문자는 4글자당 1토큰
+    hangul = len(_HANGUL.findall(text))
+    return math.ceil(hangul * 1.1 + (len(text) - hangul) / 4)
+
+def truncate_to_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """텍스트를 최대 토큰 수에 맞게 자릅니다. keep='tail'이면 뒷부분을 남깁니다."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        kept = tokens[:max_tokens] if keep == "head" else tokens[-max_tokens:]
+        return encoding.decode(kept)
+    # 추정치 기반일 때는 글자 수 비율로 자른 뒤 예산 안에 들어올 때까지 줄입니다.
+    length = max(1, int(len(text) * max_tokens / count_tokens(text)))
+    while length > 0:
+        candidate = text[:length] if keep == "head" else text[-length:]
+        if count_tokens(candidate) <= max_tokens:
+            return candidate
+        length = int(length * 0.9)
+    return ""
+
+@dataclass
+class PromptSection:
+    """
+    프롬프트의 한 섹션.
+    - priority: 숫자가 클수록 먼저 줄입니다. (required=True인 섹션은 줄이지 않습니다.)
+    - keep: 항목을 덜어 낼 때 남길 쪽. 'head'는 앞쪽(중요도 순 정렬된 목록), 'tail'은 뒤쪽(최근 대화)
+    """
+    name: str
+    items: list[str]
+    priority: int = 0
+    required: bool = False
+    separator: str = "\n"
+    keep: str = "head"
+    omitted_marker: str | None = None  # 덜어 낸 항목이 있을 때 남길 안내 문구 ('{count}' 사용 가능)
+    compress: Callable[[list[str]], list[str]] | None = None  # 항목을 덜어 내기 전에 먼저 적용할 압축 함수
+    omitted: int = field(default=0, init=False)
+
+    @property
+    def text(self) -> str:
+        parts = list(self.items)
+        if self.omitted and self.omitted_marker:
+            marker = self.omitted_marker.format(count=self.omitted)
+            parts = [marker] + parts if self.keep == "tail" else parts + [marker]
+        return self.separator.join(parts)
+
+def fit_sections(sections: list[PromptSection], budget: int, label: str) -> dict[str, str]:
+    """
+    섹션들의 합계 토큰이 예산 안에 들어오도록 우선순위가 낮은 섹션부터 항목을 덜어 내고,
+    섹션 이름 -> 최종 텍스트 딕셔너리를 반환합니다.
+    """
+    token_counts = {section.name: count_tokens(section.text) for section in sections}
+    total = sum(token_counts.values())
+    original_total = total
+
+    trimmable = sorted((s for s in sections if not s.required), key=lambda s: s.priority, reverse=True)
+    for section in trimmable:
+        if total > budget and section.compress and section.items:
+            section.items = section.compress(section.items)
+            new_count = count_tokens(section.text)
+            total += new_count - token_counts[section.name]
+            token_counts[section.name] = new_count
+        while total > budget and section.items:
+            # 넘친 만큼의 항목을 한 번에 덜어 내고, 마지막 하나가 남았는데도 넘치면 그 항목을 잘라 냅니다.
+            if len(section.items) > 1:
+                overflow, freed, removed = total - budget, 0, 0
+                candidates = reversed(section.items) if section.keep == "head" else iter(section.items)
+                for item in candidates:
+                    if freed >= overflow or removed == len(section.items) - 1:
+                        break
+                    freed += count_tokens(item) + 1  # 구분자 포함
+                    removed += 1
+                if section.keep == "head":
+                    del section.items[-removed:]
+                else:
+                    del section.items[:removed]
+                section.omitted += removed
+            else:
+                allowed = count_tokens(section.items[0]) - (total - budget)
+                truncated = truncate_to_tokens(section.items[0], allowed, keep=section.keep)
+                if truncated:
+                    section.items[0] = truncated
+                else:
+                    section.items.pop()
+                    section.omitted += 1
+            new_count = count_tokens(section.text)
+            total += new_count - token_counts[section.name]
+            token_counts[section.name] = new_count
+        if total <= budget:
+            break
+
+    log = logger.warning if total > budget else logger.info
+    log(
+        f"[{label}] 입력 토큰 {total}/{budget}" + (" (필수 섹션만으로 예산 초과)" if total > budget else ""),
+        extra={"prompt": label, "tokens": total, "tokens_before_trim": original_total,
+               "token_budget": budget, "section_tokens": token_counts},
+    )
+    return {section.name: section.text for section in sections}
+
+def compress_ai_turns(lines: list[str], max_tokens_per_turn: int = 40) -> list[str]:
+    """
+    'AI: ...' 형식의 대화 줄을 최대 토큰 수까지만 남깁니다.
+    요약/리포트에서는 어르신의 발화가 핵심이므로 AI 발화를 먼저 줄입니다.
+    """
+    compressed = []
+    for line in lines:
+        if line.startswith("AI:") and count_tokens(line) > max_tokens_per_turn:
+            line = truncate_to_tokens(line, max_tokens_per_turn).rstrip() + "…"
+        compressed.append(line)
+    return compressed
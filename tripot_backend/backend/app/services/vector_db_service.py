@@ -1,54 +1,83 @@
 # app/services/vector_db_service.py (새 이름으로 저장)
 
+import logging
 import uuid
 import time
-import asyncio
-from pinecone import Pinecone, ServerlessSpec
 
+from app.core import resilience
 from app.core.config import settings
 from . import ai_service # 개선된 ai_service를 임포트
+from . import token_budget
+from .ai_admission import MEMORY
 
-# Pinecone 클라이언트 초기화 및 인덱스 연결
-try:
+logger = logging.getLogger(__name__)
+
+# 벡터 인덱스는 임포트 시점이 아니라 서버 startup에서 init_index()로 연결합니다. (연결 전에는 None)
+index = None
+
+# 벡터 DB가 연속으로 실패하면 잠시 기억 검색을 건너뛰고 기억 없이 대화합니다.
+breaker = resilience.CircuitBreaker(
+    "vector_db", settings.VECTOR_BREAKER_FAILURE_THRESHOLD, settings.VECTOR_BREAKER_RESET_SECONDS)
+
+def init_index():
+    """
+    벡터 인덱스에 연결합니다. (VECTOR_DB_BACKEND="memory"면 프로세스 내 인덱스 사용)
+    실패하면 예외를 그대로 던지며, startup의 준비 상태 관리자가 백오프로 다시 시도합니다.
+    """
+    global index
+    if settings.VECTOR_DB_BACKEND == "memory":
+        from .memory_vector_index import InMemoryVectorIndex
+        index = InMemoryVectorIndex()
+        logger.info("프로세스 내 벡터 인덱스를 사용합니다. (재시작하면 기억이 사라집니다.)")
+        return
+
+    from pinecone import Pinecone, ServerlessSpec  # 임포트 비용이 커서 실제로 연결할 때 불러옵니다.
     pc = Pinecone(api_key=settings.PINECONE_API_KEY)
-    
+
     if settings.PINECONE_INDEX_NAME not in pc.list_indexes().names():
-        print(f"Pinecone 인덱스 '{settings.PINECONE_INDEX_NAME}'가 없으므로 새로 생성합니다.")
+        logger.info(f"Pinecone 인덱스 '{settings.PINECONE_INDEX_NAME}'가 없으므로 새로 생성합니다.")
         pc.create_index(
             name=settings.PINECONE_INDEX_NAME, 
             dimension=1536,
             metric="cosine", 
             spec=ServerlessSpec(cloud="aws", region="us-east-1")
         )
-    
+
     index = pc.Index(settings.PINECONE_INDEX_NAME)
-    print(f"✅ Pinecone '{settings.PINECONE_INDEX_NAME}' 인덱스에 성공적으로 연결되었습니다.")
-except Exception as e:
-    print(f"❌ Pinecone 초기화 중 오류 발생: {e}")
-    index = None
+    logger.info(f"Pinecone '{settings.PINECONE_INDEX_NAME}' 인덱스에 성공적으로 연결되었습니다.")
+
 
+def memory_search_available() -> bool:
+    """기억 검색을 시도할 수 있는지 (인덱스가 연결되어 있고 서킷 브레이커가 닫혀 있음)"""
+    return index is not None and not breaker.is_open()
 
 async def create_memory_for_pinecone(user_id: str, current_session_log: list[str]):
     """세션 대화 내용을 바탕으로 Pinecone에 기억을 저장합니다."""
     if not index:
-        print("Pinecone 인덱스가 없어 기억을 저장할 수 없습니다.")
+        logger.warning("Pinecone 인덱스가 없어 기억을 저장할 수 없습니다.")
         return
 
     if not current_session_log: return
-    print(f"🧠 [{user_id}] 님의 세션 기억 생성을 시작합니다.")
+    logger.debug(f"[{user_id}] 님의 세션 기억 생성을 시작합니다.")
 
     memory_text = ""
     memory_type = ""
 
     if len(current_session_log) < 4:
         # 짧은 대화는 원문 그대로 저장
-        print("-> 짧은 대화로 판단, 'utterance' 타입으로 저장합니다.")
+        logger.debug("짧은 대화로 판단, 'utterance' 타입으로 저장합니다.")
         memory_text = "\n".join(current_session_log)
         memory_type = 'utterance'
     else:
         # 긴 대화는 요약해서 저장 (동료분의 개선된 프롬프트 방식 적용)
-        print("-> 긴 대화로 판단, 'summary' 타입으로 요약 생성합니다.")
-        conversation_history = "\n".join(current_session_log)
+        logger.debug("긴 대화로 판단, 'summary' 타입으로 요약 생성합니다.")
+        # 세션이 길면 AI 발화를 먼저 줄이고, 그래도 넘치면 앞선 대화부터 생략합니다.
+        conversation_history = token_budget.fit_sections([
+            token_budget.PromptSection(
+                "history", list(current_session_log), priority=1, keep="tail",
+                omitted_marker="(앞선 대화 {count}줄 생략)", compress=token_budget.compress_ai_turns,
+            ),
+        ], budget=settings.MEMORY_SUMMARY_TOKEN_BUDGET, label="memory_summary")["history"]
         
         summary_system_message = """
         당신은 사용자 대화 기록을 분석하여 핵심적인 기억을 추출하고 요약하는 AI입니다.
@@ -67,12 +96,13 @@ async def create_memory_for_pinecone(user_id: str, current_session_log: list[str
         memory_text = await ai_service.get_ai_chat_completion(
             messages=messages_for_summary, # 개선된 함수에 messages 리스트 전달
             max_tokens=200,
-            temperature=0.3
+            temperature=0.3,
+            priority=MEMORY,
         )
         memory_type = 'summary'
 
-    print(f"📝 생성된 기억 (타입: {memory_type}): {memory_text}")
-    embedding = await ai_service.get_embedding(memory_text)
+    logger.debug(f"생성된 기억 (타입: {memory_type}): {memory_text}")
+    embedding = await ai_service.get_embedding(memory_text, priority=MEMORY)
     
     vector_to_upsert = {
         'id': str(uuid.uuid4()), 
@@ -84,27 +114,45 @@ async def create_memory_for_pinecone(user_id: str, current_session_log: list[str
             'memory_type': memory_type
         }
     }
-    await asyncio.to_thread(index.upsert, vectors=[vector_to_upsert])
-    print(f"✅ [{user_id}] 님의 새로운 기억이 Pinecone에 저장되었습니다.")
+    # id가 고정되어 있어 다시 보내도 같은 결과이므로 재시도합니다.
+    await resilience.call(
+        index.upsert, vectors=[vector_to_upsert], service="pinecone", operation="upsert",
+        timeout=settings.VECTOR_UPSERT_TIMEOUT_SECONDS, retries=settings.EXTERNAL_CALL_MAX_RETRIES, breaker=breaker,
+    )
+    logger.info(f"[{user_id}] 님의 새로운 기억이 Pinecone에 저장되었습니다.")
 
 
-async def search_memories(user_id: str, query_message: str, top_k: int = 5) -> str:
-    """과거 기억을 검색하고, 관련도와 최신성을 고려하여 최종 기억 목록을 반환합니다."""
+async def search_memories(user_id: str, query_message: str, top_k: int = 5, query_embedding: list[float] | None = None) -> list[str]:
+    """
+    과거 기억을 검색하고, 관련도와 최신성을 고려하여 최종 기억 목록(점수 높은 순)을 반환합니다.
+    호출 측에서 이미 계산한 임베딩(query_embedding)이 있으면 다시 계산하지 않습니다.
+    벡터 DB가 실패하거나 서킷 브레이커가 열려 있으면 빈 목록을 반환합니다. (기억 없이 대화를 이어 감)
+    """
     if not index:
-        print("Pinecone 인덱스가 없어 기억을 검색할 수 없습니다.")
-        return ""
+        logger.debug("Pinecone 인덱스가 없어 기억을 검색할 수 없습니다.")
+        return []
         
-    query_embedding = await ai_service.get_embedding(query_message)
-    results = await asyncio.to_thread(
-        index.query, 
-        vector=query_embedding, 
-        top_k=top_k, 
-        filter={'user_id': user_id}, 
-        include_metadata=True
-    )
+    if query_embedding is None:
+        query_embedding = await ai_service.get_embedding(query_message)
+    try:
+        results = await resilience.call(
+            index.query,
+            vector=query_embedding,
+            top_k=top_k,
+            filter={'user_id': user_id},
+            include_metadata=True,
+            service="pinecone", operation="query", timeout=settings.VECTOR_QUERY_TIMEOUT_SECONDS,
+            retries=1, hedge=settings.HEDGE_REQUESTS_ENABLED, breaker=breaker,
+        )
+    except resilience.CircuitOpenError:
+        logger.debug(f"[{user_id}] 벡터 DB 서킷 브레이커가 열려 있어 기억 검색을 건너뜁니다.")
+        return []
+    except Exception as e:
+        logger.warning(f"[{user_id}] 기억 검색 실패, 기억 없이 대화합니다: {e!r}")
+        return []
     
     if not results['matches']:
-        return ""
+        return []
 
     now = int(time.time())
     ranked_memories = []
@@ -122,5 +170,5 @@ async def search_memories(user_id: str, query_message: str, top_k: int = 5) -> s
     ranked_memories.sort(key=lambda x: x['score'], reverse=True)
     top_memories = [item['text'] for item in ranked_memories[:3]]
     
-    print(f"🔍 [{user_id}] 님의 과거 기억 {len(top_memories)}개를 검색했습니다.")
-    return "\n".join(top_memories)
\ No newline at end of file
+    logger.debug(f"[{user_id}] 님의 과거 기억 {len(top_memories)}개를 검색했습니다.")
+    return top_memories
\ No newline at end of file
@@ -0,0 +1,66 @@
+# scripts/archive_old_data.py
+# 보관 기간이 지난 대화/퀴즈 결과를 월별 압축 파일로 옮겨 운영 테이블을 작게 유지하는 스크립트
+# 사용법: python scripts/archive_old_data.py [--retention-months N] [--table conversations ...] [--dry-run] [--verify]
+# (매달 한 번 실행합니다. 여러 번 실행해도 안전하며, 이미 옮긴 달은 건너뜁니다.)
+
+import argparse
+import sys
+from pathlib import Path
+
+# --- 스크립트가 'app' 모듈을 찾을 수 있도록 경로 설정 ---
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+# ---------------------------------------------------------
+
+from app.core.config import settings
+from app.core.time_utils import today_kst
+from app.db.database import init_db
+from app.services import data_archive
+
+def main(tables: list[str], retention_months: int, dry_run: bool, verify: bool):
+    # 매니페스트 테이블이 없으면 먼저 만듭니다.
+    init_db()
+
+    if verify:
+        for table_name in tables:
+            problems = data_archive.verify_partitions(table_name)
+            print(f"🔎 [{table_name}] " + ("보관 파일 이상 없음" if not problems else f"문제 {len(problems)}건"))
+            for problem in problems:
+                print(f"   ❌ {problem}")
+        return
+
+    cutoff = data_archive.archive_cutoff(today_kst(), retention_months)
+    print(f"--- 📦 {cutoff:%Y-%m} 이전 데이터를 {settings.ARCHIVE_DIR}로 옮깁니다. {'(dry-run)' if dry_run else ''} ---")
+
+    for table_name in tables:
+        months = data_archive.months_to_archive(table_name, cutoff)
+        if not months:
+            print(f"✅ [{table_name}] 옮길 데이터가 없습니다.")
+            continue
+        total = 0
+        for month in months:
+            try:
+                count = data_archive.archive_month(table_name, month, dry_run=dry_run)
+            except Exception as e:
+                print(f"❌ [{table_name}] {month:%Y-%m} 보관 실패 (운영 테이블은 그대로입니다): {e}")
+                continue
+            if count:
+                print(f"   [{table_name}] {month:%Y-%m}: {count}행 {'옮길 예정' if dry_run else '옮김'}")
+            total += count
+        print(f"🎉 [{table_name}] 총 {total}행{'을 옮길 예정입니다' if dry_run else '을 옮겼습니다'}.")
+
+    print("\n--- ✅ 모든 작업 완료 ---")
+
+if __name__ == "__main__":
+    # app 모듈이 남기는 로그도 함께 출력합니다.
+    from app.core.logging_config import setup_logging
+    setup_logging()
+    parser = argparse.ArgumentParser(description="보관 기간이 지난 데이터를 월별 압축 파일로 옮깁니다.")
+    parser.add_argument("--retention-months", type=int, default=settings.ARCHIVE_RETENTION_MONTHS,
+                        help="이번 달을 포함해 운영 테이블에 남길 개월 수")
+    parser.add_argument("--table", action="append", choices=list(data_archive.ARCHIVABLE_TABLES),
+                        help="옮길 테이블 (생략 시 전부)")
+    parser.add_argument("--dry-run", action="store_true", help="옮길 행 수만 보여 줍니다.")
+    parser.add_argument("--verify", action="store_true", help="보관 파일이 매니페스트와 일치하는지 확인합니다.")
+    args = parser.parse_args()
+    main(args.table or list(data_archive.ARCHIVABLE_TABLES), args.retention_months, args.dry_run, args.verify)
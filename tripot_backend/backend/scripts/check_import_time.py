@@ -0,0 +1,57 @@
+# scripts/check_import_time.py
+# app.main의 임포트 시간을 재고, 예산을 넘으면 실패하는 스크립트 (콜드 스타트 회귀 점검용)
+# 사용법: python scripts/check_import_time.py [--budget-ms 1500] [--runs 3] [--top 15]
+#
+# 새 파이썬 프로세스에서 `python -X importtime -c "import app.main"`을 실행해 측정하므로,
+# 임포트 시점에 외부 연결이나 무거운 데이터 적재가 다시 생기면 여기서 드러납니다.
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+
+def measure(module: str) -> dict[str, tuple[int, int]]:
+    """모듈 이름 -> (자체 시간, 누적 시간) (마이크로초)"""
+    env = dict(os.environ, PYTHONPATH=str(project_root))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"'{module}' 임포트 실패:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        timings[name] = (int(self_us), int(cumulative_us))
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="app.main 임포트 시간 예산 점검")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="허용하는 누적 임포트 시간(ms)")
+    parser.add_argument("--runs", type=int, default=3, help="측정 횟수 (가장 빠른 값을 사용)")
+    parser.add_argument("--top", type=int, default=15, help="자체 시간이 큰 모듈을 몇 개 보여줄지")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda timings: timings[args.module][1])
+    total_ms = best[args.module][1] / 1000
+
+    print(f"'{args.module}' 임포트 시간: {total_ms:.0f}ms (예산 {args.budget_ms:.0f}ms, {args.runs}회 중 최솟값)")
+    print(f"자체 시간이 큰 모듈 상위 {args.top}개:")
+    for name, (self_us, cumulative_us) in sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f}ms  (누적 {cumulative_us / 1000:8.1f}ms)  {name}")
+
+    if total_ms > args.budget_ms:
+        print(f"❌ 임포트 시간이 예산을 {total_ms - args.budget_ms:.0f}ms 초과했습니다.")
+        sys.exit(1)
+    print("✅ 예산 이내입니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# scripts/fake_openai_server.py
+# 부하 테스트용 OpenAI 호환 대역 서버 (네트워크/과금 없이 백엔드 자체의 처리량을 재기 위한 것)
+#
+# 사용법:
+#   python scripts/fake_openai_server.py --port 9100 --stt-latency-ms 400 --chat-latency-ms 900
+#   백엔드는 OPENAI_BASE_URL=http://127.0.0.1:9100/v1, VECTOR_DB_BACKEND=memory 로 실행합니다.
+#
+# 응답 내용은 app/services/local_ai.py의 결정적 함수로 만듭니다. (STT는 WAV의 'ICMT' 청크 문장을 돌려줌)
+# AI_PROVIDER=local과 달리 실제 OpenAI 클라이언트와 HTTP 경로를 그대로 거치므로, 연결 풀과 재시도까지 포함해 잽니다.
+# 엔드포인트별 지연(+지터)과 실패율을 인자로 조절할 수 있습니다.
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Request, UploadFile, File
+from fastapi.responses import JSONResponse
+
+# --- 스크립트가 'app' 모듈을 찾을 수 있도록 경로 설정 ---
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+# ---------------------------------------------------------
+
+from app.services import local_ai  # 로컬 AI 제공자와 같은 결정적 응답을 사용합니다.
+
+def create_app(latency_ms: dict[str, float], jitter: float, failure_rate: float) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+    rng = random.Random()
+    counts = {"transcription": 0, "embedding": 0, "chat": 0, "failed": 0}
+
+    async def simulate(kind: str):
+        """설정된 지연을 흉내 내고, 실패율에 따라 503 응답을 돌려줍니다."""
+        counts[kind] += 1
+        base = latency_ms.get(kind, 0.0) / 1000
+        if base:
+            await asyncio.sleep(max(0.0, base * (1 + rng.uniform(-jitter, jitter))))
+        if failure_rate and rng.random() < failure_rate:
+            counts["failed"] += 1
+            return JSONResponse(status_code=503, content={
+                "error": {"message": "injected failure", "type": "server_error", "code": None}})
+        return None
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(file: UploadFile = File(...)):
+        data = await file.read()
+        if (failure := await simulate("transcription")) is not None:
+            return failure
+        return {"text": local_ai.transcribe(data)}
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        if (failure := await simulate("embedding")) is not None:
+            return failure
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        return {
+            "object": "list",
+            "model": body.get("model", "text-embedding-3-small"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": local_ai.embedding(str(text))}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if (failure := await simulate("chat")) is not None:
+            return failure
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        content = local_ai.completion(body.get("messages", []), json_mode)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return counts
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="부하 테스트용 OpenAI 호환 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--stt-latency-ms", type=float, default=400)
+    parser.add_argument("--embedding-latency-ms", type=float, default=60)
+    parser.add_argument("--chat-latency-ms", type=float, default=900)
+    parser.add_argument("--jitter", type=float, default=0.2, help="지연에 곱할 무작위 변동 폭 (0.2면 ±20%%)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="503으로 실패시킬 요청 비율")
+    args = parser.parse_args()
+
+    app = create_app(
+        {"transcription": args.stt_latency_ms, "embedding": args.embedding_latency_ms, "chat": args.chat_latency_ms},
+        jitter=args.jitter, failure_rate=args.failure_rate,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
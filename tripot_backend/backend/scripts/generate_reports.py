@@ -1,5 +1,7 @@
 # scripts/generate_reports.py
 
+import argparse
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -13,12 +15,14 @@ sys.path.append(str(project_root))
 # ---------------------------------------------------------
 
 # 이제 app 내부의 모듈을 안전하게 임포트할 수 있습니다.
-from app.services import ai_service
+from app.services import report_fragments
 from app.db import report_utils
 
-def main():
+async def main(full: bool = False):
     """
     어제 대화 기록이 있는 모든 사용자에 대해 일일 리포트를 생성하고 DB에 저장합니다.
+    세션이 끝날 때 만들어 둔 리포트 조각이 있으면 합치기만 하고, 조각에 담기지 않은 대화만 AI로 분석합니다.
+    full=True면 조각을 쓰지 않고 하루 대화 전체를 한 번에 분석합니다.
     """
     yesterday = date.today() - timedelta(days=1)
     print(f"--- 📅 {yesterday} 리포트 생성 작업 시작 ---")
@@ -35,24 +39,16 @@ def main():
     for user_id in user_ids:
         print(f"\n--- 🔄 사용자 [{user_id}] 처리 시작 ---")
         
-        # 2-1. 사용자의 어제 대화 내용 가져오기
-        conversation_text = report_utils.fetch_daily_conversations(user_id, yesterday)
-        if not conversation_text:
-            print(f"💬 사용자 [{user_id}]의 대화 내용이 없습니다. 건너뜁니다.")
-            continue
-        
-        print(f"📝 대화 내용 로드 완료 (길이: {len(conversation_text)})")
-        
-        # 2-2. AI를 통해 리포트 생성
-        # ai_service에 이미 만들어 둔 함수를 재사용합니다.
-        report_json = ai_service.generate_summary_report(conversation_text)
+        # 2-1. 세션 리포트 조각을 합치거나, 조각이 없으면 어제 대화 전체를 AI로 분석
+        # (AI 호출은 batch 등급 승인 제어를 거칩니다.)
+        report_json = await report_fragments.build_daily_report(user_id, yesterday, full=full)
         if not report_json:
-            print(f"❌ AI 리포트 생성 실패. 다음 사용자로 넘어갑니다.")
+            print(f"❌ 리포트 생성 실패 또는 대화 내용 없음. 다음 사용자로 넘어갑니다.")
             continue
 
-        print(f"🤖 AI 리포트 생성 완료")
+        print(f"🤖 리포트 생성 완료")
 
-        # 2-3. 생성된 리포트를 DB에 저장
+        # 2-2. 생성된 리포트를 DB에 저장
         # report_utils에 만들어 둔 함수를 재사용합니다.
         success = report_utils.save_summary_to_db(user_id, yesterday, report_json)
         if success:
@@ -64,4 +60,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # app 모듈이 남기는 로그도 함께 출력합니다.
+    from app.core.logging_config import setup_logging
+    setup_logging()
+    parser = argparse.ArgumentParser(description="어제의 일일 리포트를 생성합니다.")
+    parser.add_argument("--full", action="store_true", help="세션 리포트 조각을 쓰지 않고 하루 대화 전체를 분석합니다.")
+    args = parser.parse_args()
+    asyncio.run(main(full=args.full))
\ No newline at end of file
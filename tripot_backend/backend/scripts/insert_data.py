@@ -4,6 +4,7 @@
 import os
 import csv
 import sys
+import urllib.request
 from pathlib import Path
 from dotenv import load_dotenv
 import mysql.connector
@@ -97,6 +98,21 @@ def insert_daily_question_data(connection, csv_file_path):
     finally:
         cursor.close()
 
+def refresh_server_caches(paths: list[str]):
+    """
+    실행 중인 백엔드 서버에 새 데이터가 적재되었음을 알려 캐시를 갱신합니다.
+    서버가 꺼져 있으면 건너뜁니다. (다음 서버 시작 또는 한국 시간 자정에 자동으로 반영됩니다)
+    """
+    api_url = os.getenv('TRIPOT_API_URL', 'http://localhost:8000/api/v1').rstrip('/')
+    for path in paths:
+        url = f"{api_url}{path}"
+        try:
+            request = urllib.request.Request(url, method='POST')
+            with urllib.request.urlopen(request, timeout=5) as response:
+                print(f"🔄 서버 캐시 갱신 완료: {url} ({response.status})")
+        except Exception as e:
+            print(f"⚠️ 서버 캐시 갱신 요청 실패 ({url}): {e}")
+
 def main():
     """스크립트의 메인 실행 함수입니다."""
     # 1. 파일 경로 설정
@@ -115,6 +131,9 @@ def main():
         conn.close()
         print("\n🚪 데이터베이스 연결을 닫았습니다.")
 
+        # 4. 실행 중인 서버의 캐시 갱신
+        refresh_server_caches(['/senior/quiz-bank/refresh', '/daily-qa/cache/refresh'])
+
 if __name__ == "__main__":
     setup_path()
     main()
@@ -0,0 +1,362 @@
+# scripts/loadtest_senior_ws.py
+# 어르신 대화 웹소켓(/api/v1/senior/ws/{user_id}) 부하 테스트 스크립트
+#
+# N개의 세션을 동시에 열고, 생각 시간(think time)을 두며 음성 프레임을 보내 일반 대화와 퀴즈 경로를 모두 실행합니다.
+# 접속 시간, 첫 AI 메시지까지의 시간, 턴 종류별 p50/p95/p99, 오류율과 서버 자원 사용량(/metrics)을 보고합니다.
+#
+# 오프라인 실행 (릴리스 전 회귀 점검):
+#   1) python scripts/fake_openai_server.py --port 9100
+#   2) OPENAI_BASE_URL=http://127.0.0.1:9100/v1 VECTOR_DB_BACKEND=memory uvicorn app.main:app --port 8000
+#   3) python scripts/loadtest_senior_ws.py --sessions 50 --turns 10 --think-time 3 --max-p95-ms 3000
+# 대역 서버 없이 AI_PROVIDER=local(LOCAL_AI_*_LATENCY_MS로 지연 주입)로 백엔드를 띄워도 됩니다.
+#
+# 합성 음성은 톤 신호 WAV에 발화 문장을 LIST/INFO 'ICMT' 청크로 넣어 보내며, 대역 서버의 STT가 이 문장을 돌려줍니다.
+# --audio-dir로 녹음 파일(*.wav)을 주면 그 파일을 순서대로 보냅니다. (같은 이름의 .txt가 있으면 그 문장을 넣어 보냄)
+# 기준(--max-error-rate, --max-p95-ms)을 넘으면 종료 코드 1을 반환합니다.
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import math
+import random
+import struct
+import sys
+import time
+import urllib.request
+import wave
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import websockets
+
+CHAT_UTTERANCES = [
+    "네",
+    "잘 잤어요",
+    "오늘 아침에 공원에 산책을 다녀왔어요.",
+    "점심은 딸이 사 온 김밥을 먹었어요.",
+    "요즘 무릎이 좀 아파서 병원에 다녀왔어요.",
+    "어제 손주가 전화해서 한참 이야기했어요. 대학교에 합격했대요.",
+    "옛날에 시장에서 장사하던 생각이 나네요.",
+    "날씨가 추워져서 밖에 나가기가 싫어요.",
+]
+QUIZ_START_UTTERANCE = "퀴즈 시작해줘"
+QUIZ_ANSWERS = ["사과", "잘 모르겠어요", "서울", "3", "월요일 화요일 수요일"]
+
+# 서버가 오류 대신 돌려주는 안내 문구 (응답은 왔지만 정상 처리되지 않은 턴으로 셉니다.)
+DEGRADED_MARKERS = ("죄송합니다", "잘 못 들었어요")
+
+SAMPLE_RATE = 16000
+
+# --- 합성 음성 ---
+
+def synthesize_wav(text: str, seconds_per_char: float = 0.12) -> bytes:
+    """발화 길이에 비례하는 톤 신호 WAV를 만들고, 발화 문장을 ICMT 청크에 넣습니다."""
+    duration = min(8.0, max(0.6, len(text) * seconds_per_char))
+    t = np.arange(int(SAMPLE_RATE * duration)) / SAMPLE_RATE
+    envelope = 0.5 + 0.5 * np.sin(2 * math.pi * 3 * t)  # 음절처럼 세기가 오르내리게
+    signal = 0.3 * envelope * np.sin(2 * math.pi * 220 * t) + 0.01 * np.random.standard_normal(t.size)
+    pcm = (np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes()
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return add_wav_comment(buffer.getvalue(), text)
+
+def add_wav_comment(wav_bytes: bytes, text: str) -> bytes:
+    """WAV 뒤에 LIST/INFO 'ICMT' 청크를 붙이고 RIFF 크기를 고칩니다."""
+    comment = text.encode("utf-8") + b"\x00"
+    if len(comment) % 2:
+        comment += b"\x00"
+    info = b"INFO" + struct.pack("<4sI", b"ICMT", len(comment)) + comment
+    chunk = struct.pack("<4sI", b"LIST", len(info)) + info
+    data = wav_bytes + chunk
+    return data[:4] + struct.pack("<I", len(data) - 8) + data[8:]
+
+class AudioSource:
+    """발화 문장 -> base64 음성 프레임. 녹음 파일이 있으면 그 파일을 순서대로 사용합니다."""
+    def __init__(self, audio_dir: str | None):
+        self.recordings: list[tuple[bytes, str | None]] = []
+        if audio_dir:
+            for path in sorted(Path(audio_dir).glob("*.wav")):
+                transcript = path.with_suffix(".txt")
+                text = transcript.read_text(encoding="utf-8").strip() if transcript.exists() else None
+                self.recordings.append((path.read_bytes(), text))
+            if not self.recordings:
+                raise SystemExit(f"{audio_dir}에 .wav 파일이 없습니다.")
+        self._cache: dict[str, str] = {}
+        self._next = 0
+
+    def frame(self, text: str, use_recording: bool) -> str:
+        if use_recording and self.recordings:
+            data, transcript = self.recordings[self._next % len(self.recordings)]
+            self._next += 1
+            return base64.b64encode(add_wav_comment(data, transcript) if transcript else data).decode("ascii")
+        if text not in self._cache:
+            self._cache[text] = base64.b64encode(synthesize_wav(text)).decode("ascii")
+        return self._cache[text]
+
+# --- 측정 ---
+
+@dataclass
+class Results:
+    connect_seconds: list[float] = field(default_factory=list)
+    first_frame_seconds: list[float] = field(default_factory=list)
+    turn_seconds: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+    sessions_started: int = 0
+    sessions_completed: int = 0
+    turns_sent: int = 0
+    turns_degraded: int = 0
+
+    def error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+def percentile(values: list[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else float("nan")
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean_ms": round(float(np.mean(values)) * 1000, 1) if values else None,
+        "p50_ms": round(percentile(values, 50) * 1000, 1) if values else None,
+        "p95_ms": round(percentile(values, 95) * 1000, 1) if values else None,
+        "p99_ms": round(percentile(values, 99) * 1000, 1) if values else None,
+        "max_ms": round(max(values) * 1000, 1) if values else None,
+    }
+
+# --- 세션 시나리오 ---
+
+async def wait_for_ai_message(ws, timeout: float) -> str:
+    """ai_message 프레임이 올 때까지 기다립니다. (user_message 등 다른 프레임은 건너뜀)"""
+    deadline = time.perf_counter() + timeout
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise asyncio.TimeoutError
+        message = json.loads(await asyncio.wait_for(ws.recv(), remaining))
+        if message.get("type") == "ai_message":
+            return message.get("content", "")
+
+async def run_turn(ws, args, audio: AudioSource, results: Results, kind: str, text: str) -> str:
+    results.turns_sent += 1
+    started = time.perf_counter()
+    await ws.send(audio.frame(text, use_recording=bool(audio.recordings) and kind == "chat"))
+    reply = await wait_for_ai_message(ws, args.turn_timeout)
+    results.turn_seconds.setdefault(kind, []).append(time.perf_counter() - started)
+    if any(marker in reply for marker in DEGRADED_MARKERS):
+        results.turns_degraded += 1
+    return reply
+
+async def think(args, rng: random.Random):
+    if args.think_time > 0:
+        await asyncio.sleep(args.think_time * rng.uniform(0.5, 1.5))
+
+async def run_session(index: int, args, audio: AudioSource, results: Results):
+    rng = random.Random(args.seed * 100_003 + index)
+    await asyncio.sleep(args.ramp_up * index / max(1, args.sessions))
+    user_id = f"{args.user_prefix}-{index:05d}"
+    url = f"{args.url.rstrip('/')}/api/v1/senior/ws/{user_id}"
+
+    results.sessions_started += 1
+    started = time.perf_counter()
+    try:
+        async with websockets.connect(url, open_timeout=args.turn_timeout, max_size=None) as ws:
+            results.connect_seconds.append(time.perf_counter() - started)
+            await wait_for_ai_message(ws, args.turn_timeout)
+            results.first_frame_seconds.append(time.perf_counter() - started)
+
+            turns = 0
+            while turns < args.turns:
+                await think(args, rng)
+                if rng.random() < args.quiz_ratio and turns + 2 <= args.turns:
+                    await run_turn(ws, args, audio, results, "quiz_start", QUIZ_START_UTTERANCE)
+                    await think(args, rng)
+                    await run_turn(ws, args, audio, results, "quiz_answer", rng.choice(QUIZ_ANSWERS))
+                    turns += 2
+                else:
+                    await run_turn(ws, args, audio, results, "chat", rng.choice(CHAT_UTTERANCES))
+                    turns += 1
+        results.sessions_completed += 1
+    except asyncio.TimeoutError:
+        results.error("timeout")
+    except websockets.exceptions.InvalidStatus:
+        results.error("handshake_rejected")
+    except websockets.exceptions.ConnectionClosed:
+        results.error("connection_closed")
+    except OSError:
+        results.error("connect_failed")
+
+# --- 서버 자원 사용량 ---
+
+def scrape_metrics(base_url: str) -> dict[str, float]:
+    """/metrics에서 라벨 없는 값과 단계별 처리 시간 합계/횟수를 읽습니다."""
+    with urllib.request.urlopen(f"{base_url.rstrip('/')}/metrics", timeout=5) as response:
+        text = response.read().decode("utf-8")
+    values = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name, _, value = line.rpartition(" ")
+        try:
+            values[name] = float(value)
+        except ValueError:
+            continue
+    return values
+
+async def sample_resources(http_url: str, samples: list[dict], stop: asyncio.Event, interval: float):
+    while not stop.is_set():
+        try:
+            samples.append(await asyncio.to_thread(scrape_metrics, http_url))
+        except Exception:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+def resource_report(samples: list[dict], wall_seconds: float) -> dict:
+    if len(samples) < 2:
+        return {"available": False}
+    first, last = samples[0], samples[-1]
+    rss = [s.get("process_resident_memory_bytes", 0) for s in samples]
+    cpu = last.get("process_cpu_seconds_total", 0) - first.get("process_cpu_seconds_total", 0)
+
+    stages = {}
+    for key, value in last.items():
+        if key.startswith("tripot_turn_stage_seconds_sum{"):
+            stage = key[key.index('"') + 1: key.rindex('"')]
+            count_key = key.replace("_sum{", "_count{")
+            count = last.get(count_key, 0) - first.get(count_key, 0)
+            if count:
+                stages[stage] = round((value - first.get(key, 0)) / count * 1000, 1)
+    return {
+        "available": True,
+        "rss_start_mb": round(rss[0] / 2**20, 1),
+        "rss_peak_mb": round(max(rss) / 2**20, 1),
+        "rss_end_mb": round(rss[-1] / 2**20, 1),
+        "cpu_seconds": round(cpu, 2),
+        "cpu_utilization": round(cpu / wall_seconds, 3) if wall_seconds else None,
+        "open_fds_peak": max(s.get("process_open_fds", 0) for s in samples),
+        "server_stage_mean_ms": stages,
+    }
+
+# --- 실행 ---
+
+async def run(args) -> dict:
+    audio = AudioSource(args.audio_dir)
+    results = Results()
+    http_url = args.metrics_url or args.url.replace("ws://", "http://").replace("wss://", "https://")
+
+    samples: list[dict] = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_resources(http_url, samples, stop, args.sample_interval))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_session(i, args, audio, results) for i in range(args.sessions)))
+    wall = time.perf_counter() - started
+    stop.set()
+    await sampler
+    try:
+        samples.append(await asyncio.to_thread(scrape_metrics, http_url))
+    except Exception:
+        pass
+
+    all_turns = [value for values in results.turn_seconds.values() for value in values]
+    failed_sessions = sum(results.errors.values())
+    return {
+        "config": {key: value for key, value in vars(args).items() if key != "json_out"},
+        "wall_seconds": round(wall, 2),
+        "sessions": {
+            "started": results.sessions_started,
+            "completed": results.sessions_completed,
+            "errors": results.errors,
+            "error_rate": round(failed_sessions / results.sessions_started, 4) if results.sessions_started else 0.0,
+        },
+        "connect": summarize(results.connect_seconds),
+        "first_ai_frame": summarize(results.first_frame_seconds),
+        "turns": {
+            "sent": results.turns_sent,
+            "completed": len(all_turns),
+            "degraded": results.turns_degraded,
+            "degraded_rate": round(results.turns_degraded / len(all_turns), 4) if all_turns else 0.0,
+            "throughput_per_second": round(len(all_turns) / wall, 2) if wall else None,
+            "all": summarize(all_turns),
+            **{kind: summarize(values) for kind, values in sorted(results.turn_seconds.items())},
+        },
+        "server": resource_report(samples, wall),
+    }
+
+def print_report(report: dict):
+    def line(label: str, stats: dict):
+        if not stats["count"]:
+            print(f"  {label:<17} -")
+            return
+        print(f"  {label:<17} n={stats['count']:<6} p50={stats['p50_ms']:>8}ms  p95={stats['p95_ms']:>8}ms  "
+              f"p99={stats['p99_ms']:>8}ms  max={stats['max_ms']:>8}ms")
+
+    sessions, turns, server = report["sessions"], report["turns"], report["server"]
+    print(f"\n=== 부하 테스트 결과 ({report['wall_seconds']}초) ===")
+    print(f"세션: {sessions['completed']}/{sessions['started']} 완료, 오류율 {sessions['error_rate']:.2%} {sessions['errors'] or ''}")
+    print(f"턴: {turns['completed']}/{turns['sent']} 응답, 안내 문구 응답 {turns['degraded_rate']:.2%}, "
+          f"초당 {turns['throughput_per_second']}턴")
+    line("connect", report["connect"])
+    line("first_ai_frame", report["first_ai_frame"])
+    for kind in ("all", "chat", "quiz_start", "quiz_answer"):
+        if kind in turns:
+            line(f"turn:{kind}", turns[kind])
+    if server.get("available"):
+        print(f"서버: RSS {server['rss_start_mb']} -> {server['rss_end_mb']}MB (최대 {server['rss_peak_mb']}MB), "
+              f"CPU {server['cpu_seconds']}초 (사용률 {server['cpu_utilization']}), 최대 fd {server['open_fds_peak']:.0f}")
+        if server["server_stage_mean_ms"]:
+            print("서버 단계별 평균(ms): " + ", ".join(f"{k}={v}" for k, v in sorted(server["server_stage_mean_ms"].items())))
+    else:
+        print("서버: /metrics를 읽지 못해 자원 사용량을 알 수 없습니다.")
+
+def check_thresholds(report: dict, args) -> list[str]:
+    failures = []
+    if report["sessions"]["error_rate"] > args.max_error_rate:
+        failures.append(f"세션 오류율 {report['sessions']['error_rate']:.2%} > {args.max_error_rate:.2%}")
+    if report["turns"]["degraded_rate"] > args.max_error_rate:
+        failures.append(f"안내 문구 응답 비율 {report['turns']['degraded_rate']:.2%} > {args.max_error_rate:.2%}")
+    p95 = report["turns"]["all"]["p95_ms"]
+    if args.max_p95_ms and (p95 is None or p95 > args.max_p95_ms):
+        failures.append(f"턴 p95 {p95}ms > {args.max_p95_ms}ms")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="어르신 대화 웹소켓 부하 테스트")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000", help="백엔드 웹소켓 주소")
+    parser.add_argument("--metrics-url", default=None, help="/metrics를 읽을 HTTP 주소 (기본: --url에서 유도)")
+    parser.add_argument("--sessions", type=int, default=20, help="동시 세션 수")
+    parser.add_argument("--turns", type=int, default=10, help="세션당 보낼 턴 수")
+    parser.add_argument("--think-time", type=float, default=2.0, help="턴 사이 평균 대기 시간(초, ±50%% 무작위)")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="모든 세션을 여는 데 걸리는 시간(초)")
+    parser.add_argument("--quiz-ratio", type=float, default=0.2, help="퀴즈(시작+답변)로 진행할 턴의 비율")
+    parser.add_argument("--turn-timeout", type=float, default=30.0, help="응답을 기다리는 최대 시간(초)")
+    parser.add_argument("--audio-dir", default=None, help="녹음된 *.wav 파일 디렉터리 (일반 대화 턴에 사용)")
+    parser.add_argument("--user-prefix", default="loadtest")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="/metrics 수집 간격(초)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--max-p95-ms", type=float, default=0.0, help="턴 p95 허용치(ms, 0이면 검사 안 함)")
+    parser.add_argument("--json-out", default=None, help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    failures = check_thresholds(report, args)
+    for failure in failures:
+        print(f"기준 초과: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
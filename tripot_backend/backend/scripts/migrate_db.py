@@ -0,0 +1,85 @@
+# scripts/migrate_db.py
+# 스키마 변경에 따른 일회성 데이터 이전 작업을 실행하는 스크립트
+# 사용법: python scripts/migrate_db.py [단계 이름 ...]  (생략 시 모든 단계 실행, 여러 번 실행해도 안전합니다)
+
+import sys
+from pathlib import Path
+
+# --- 스크립트가 'app' 모듈을 찾을 수 있도록 경로 설정 ---
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+# ---------------------------------------------------------
+
+from app.db import crud, models
+from app.db.database import SessionLocal, engine, init_db
+
+def migrate_calendar_events(db):
+    """users.calendar_data(JSON 통째 저장)를 calendar_events 테이블로 옮깁니다."""
+    users = db.query(models.User).filter(models.User.calendar_data.isnot(None)).all()
+    print(f"👥 캘린더 JSON이 남아 있는 사용자: {len(users)}명")
+
+    total = 0
+    for user in users:
+        try:
+            total += crud.migrate_calendar_blob(db, user)
+        except Exception as e:
+            db.rollback()
+            print(f"❌ [{user.user_id_str}] 캘린더 이전 실패: {e}")
+    print(f"🎉 총 {total}개의 일정을 옮겼습니다.")
+
+def migrate_daily_qa_answers(db):
+    """daily_qa의 누적 답변 텍스트 컬럼을 daily_qa_answers 행으로 옮깁니다."""
+    questions = db.query(models.DailyQA).filter(
+        models.DailyQA.family_answer_content.isnot(None) | models.DailyQA.elderly_answer_content.isnot(None)
+    ).all()
+    print(f"❓ 누적 답변이 남아 있는 질문: {len(questions)}개")
+
+    total = 0
+    for question in questions:
+        try:
+            total += crud.migrate_daily_qa_answer_log(db, question)
+        except Exception as e:
+            db.rollback()
+            print(f"❌ [{question.daily_date}] 답변 이전 실패: {e}")
+    print(f"🎉 총 {total}개의 답변을 옮겼습니다.")
+
+def create_conversation_history_index(db):
+    """대화 기록 키셋 페이지네이션용 (user_id, created_at, id) 인덱스를 기존 conversations 테이블에 만듭니다."""
+    # create_all은 이미 있는 테이블에 인덱스를 추가하지 않으므로 따로 만듭니다. (대화가 많으면 시간이 걸립니다.)
+    for index in models.Conversation.__table__.indexes:
+        if index.name == "ix_conversations_user_created_id":
+            index.create(bind=engine, checkfirst=True)
+            print(f"🎉 [{index.name}] 인덱스가 준비되었습니다.")
+
+# 실행 순서대로 등록합니다.
+MIGRATIONS = {
+    "calendar_events": migrate_calendar_events,
+    "daily_qa_answers": migrate_daily_qa_answers,
+    "conversation_history_index": create_conversation_history_index,
+}
+
+def main(selected: list[str]):
+    unknown = [name for name in selected if name not in MIGRATIONS]
+    if unknown:
+        print(f"❌ 알 수 없는 단계: {', '.join(unknown)} (가능한 단계: {', '.join(MIGRATIONS)})")
+        return
+
+    # 새 테이블이 없으면 먼저 만듭니다.
+    init_db()
+
+    db = SessionLocal()
+    try:
+        for name, migration in MIGRATIONS.items():
+            if selected and name not in selected:
+                continue
+            print(f"\n--- 🔄 [{name}] 시작 ---")
+            migration(db)
+    finally:
+        db.close()
+    print("\n--- ✅ 모든 작업 완료 ---")
+
+if __name__ == "__main__":
+    # app 모듈이 남기는 로그도 함께 출력합니다.
+    from app.core.logging_config import setup_logging
+    setup_logging()
+    main(sys.argv[1:])
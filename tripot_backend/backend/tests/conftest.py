@@ -0,0 +1,8 @@
+# tests/conftest.py
+# 테스트가 'app' 모듈을 찾을 수 있도록 경로를 설정합니다. (backend 폴더에서 python -m pytest로 실행)
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
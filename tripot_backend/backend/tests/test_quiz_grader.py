@@ -0,0 +1,71 @@
+# tests/test_quiz_grader.py
+# 규칙 기반 퀴즈 채점기 테스트
+# 규칙이 확실하지 않은 답변을 CORRECT/INCORRECT로 단정하지 않고 AMBIGUOUS로 LLM에 넘기는지 확인합니다.
+
+import pytest
+
+from app.services.quiz_grader import AMBIGUOUS, CORRECT, INCORRECT, grade_answer, parse_numbers
+
+QUESTION = "다음 문제에 답해 주세요."
+
+@pytest.mark.parametrize("text, expected", [
+    ("8이요", [8]),
+    ("팔", [8]),
+    ("열다섯", [15]),
+    ("구이칠", [9, 2, 7]),
+    ("네 개", [4]),
+    ("네개요", [4]),
+    ("세 번이요", [3]),
+    ("사", [4]),
+    ("오요", [5]),
+    ("네, 맞아요", []),
+    ("세상에 그걸 어떻게 알아", []),
+    ("오 그거 사과예요", []),
+])
+def test_parse_numbers(text, expected):
+    assert parse_numbers(text) == expected
+
+@pytest.mark.parametrize("user_answer, correct_answer, verdict", [
+    ("8", "8", CORRECT),
+    ("5 더하기 3은 8이요", "8", CORRECT),
+    ("일곱", "8", INCORRECT),
+    ("네 개요", "4", CORRECT),
+    ("사", "4", CORRECT),
+    ("모르겠어요", "8", INCORRECT),
+    ("서울이요", "서울", CORRECT),
+    ("작아요", "작다", CORRECT),
+    ("사과, 배, 포도", "사과, 배, 포도", CORRECT),
+])
+def test_confident_verdicts(user_answer, correct_answer, verdict):
+    assert grade_answer(QUESTION, user_answer, correct_answer).verdict == verdict
+
+@pytest.mark.parametrize("user_answer, correct_answer", [
+    # '네'는 숫자 4가 아니라 '예'라는 대답일 수 있습니다.
+    ("네", "4"),
+    ("네요", "4"),
+    ("네, 맞아요", "4"),
+    # 부정 표현
+    ("작지 않아요", "작다"),
+    ("작다가 아니라 크다", "작다"),
+    ("과일 아니에요", "과일"),
+    ("8 아니에요", "8"),
+    ("사과 말고 배", "사과"),
+    ("안 커요", "크다"),
+    # 확신 없는 답변
+    ("이게 8인가 9인가", "8"),
+    ("아마 서울", "서울"),
+    ("서울인지 부산인지", "서울"),
+    # 숫자일 수도 있는 말('사', '오')을 빼고 남은 숫자로 채점하지 않습니다.
+    ("삼 일 팔 오", "3, 1, 8, 5"),
+    ("팔 나누기 이는 사", "4"),
+    ("칠 빼기 이는 오", "5"),
+])
+def test_unsure_answers_go_to_llm(user_answer, correct_answer):
+    assert grade_answer(QUESTION, user_answer, correct_answer).verdict == AMBIGUOUS
+
+def test_negation_in_expected_answer_is_not_ambiguous():
+    assert grade_answer(QUESTION, "아니요", "아니요").verdict == CORRECT
+
+def test_give_up_is_still_incorrect():
+    # '기억이 안 나요'에는 '안'이 있지만 포기한 답변이므로 오답입니다.
+    assert grade_answer(QUESTION, "기억이 안 나요", "서울").verdict == INCORRECT